@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Measure how many concurrent conversations the agent sustains.
+
+Runs --conversations simulated conversations at once, each --turns turns
+long, through the production agent set-up (pooled model client, tool result
+cache, history processors) and agent.run_stream, against the local mock of
+the OpenAI API in mock_openai.py. The mock's time to first token, token
+rate, tool-call script and injected failures are set with the options
+below; with --mock-url an already running mock (or any OpenAI-compatible
+server) is used instead.
+
+Reports turns per second, output tokens per second, and p50/p95/p99 of
+time to first token and whole-turn latency. TTFT is measured to the first
+chunk of stream_text(), as the UI sees it.
+
+Usage:
+    uv run python benchmarks/bench_concurrent_load.py [--conversations 100]
+        [--turns 3] [--ttft-ms 300] [--tokens-per-second 60]
+        [--tool find_services_by_keyword:'{"keywords": ["AI"]}']
+        [--error-rate 0.02] [--abort-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from mock_openai import MockOpenAIServer, add_mock_arguments, config_from_args
+
+from notch_chatbot.agent import (
+    create_model_client,
+    create_notch_agent,
+    create_pooled_model,
+)
+from notch_chatbot.cache import ToolResultCache
+from notch_chatbot.history import HistoryCompactor, ToolReturnPruner
+from notch_chatbot.knowledge_base import load_knowledge_base
+
+_QUESTIONS = [
+    "What kind of AI work have you done?",
+    "Do you have experience in fintech?",
+    "How would you approach a legacy system modernization?",
+    "Can you build an MVP for a healthcare startup?",
+    "Tell me about a manufacturing case study",
+    "How big would your team be for a large project?",
+]
+
+
+@dataclass
+class LoadResults:
+    """Per-turn measurements of a run."""
+
+    ttft: list[float] = field(default_factory=list)
+    latency: list[float] = field(default_factory=list)
+    output_tokens: int = 0
+    failures: Counter[str] = field(default_factory=Counter)
+
+
+async def _conversation(agent, kb, turns, think, rng, results: LoadResults) -> None:
+    history = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        first = None
+        try:
+            async with agent.run_stream(
+                rng.choice(_QUESTIONS), deps=kb, message_history=history
+            ) as response:
+                async for _ in response.stream_text(delta=True):
+                    if first is None:
+                        first = time.perf_counter() - start
+                history = response.all_messages()
+                results.output_tokens += response.usage().output_tokens
+        except Exception as e:
+            results.failures[type(e).__name__] += 1
+        else:
+            results.ttft.append(first if first is not None else 0.0)
+            results.latency.append(time.perf_counter() - start)
+        await asyncio.sleep(think)
+
+
+async def _run(agent, kb, args) -> tuple[LoadResults, float]:
+    results = LoadResults()
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for _ in range(args.conversations):
+            group.create_task(
+                _conversation(agent, kb, args.turns, args.think_ms / 1000, rng, results)
+            )
+            # Spread the arrivals over the ramp-up
+            await asyncio.sleep(args.ramp_s / args.conversations)
+    return results, time.perf_counter() - start
+
+
+def _percentiles(values: list[float]) -> tuple[float, float, float, float]:
+    """p50, p95, p99 and max, in milliseconds."""
+    if len(values) < 2:
+        value = values[0] * 1000 if values else 0.0
+        return value, value, value, value
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000, max(values) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument(
+        "--think-ms", type=float, default=0.0, help="pause between a user's turns"
+    )
+    parser.add_argument(
+        "--ramp-s", type=float, default=0.0, help="seconds to start all conversations"
+    )
+    parser.add_argument("--mock-url", help="use a running server instead of the mock")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.mock_url:
+        os.environ["OPENAI_BASE_URL"] = args.mock_url
+    else:
+        server = MockOpenAIServer(config_from_args(args))
+        os.environ["OPENAI_BASE_URL"] = server.start()
+    os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+    kb = load_knowledge_base()
+    agent = create_notch_agent(
+        kb,
+        tool_cache=ToolResultCache(),
+        history_compactor=HistoryCompactor.from_env(),
+        tool_return_pruner=ToolReturnPruner(),
+        model=create_pooled_model(create_model_client()),
+    )
+
+    rounds = len(args.tool_script)
+    print(
+        f"{args.conversations} conversations x {args.turns} turns; mock TTFT "
+        f"{args.ttft_ms:.0f} ms, {args.tokens_per_second:.0f} tokens/s, "
+        f"{rounds} tool round{'s' if rounds != 1 else ''}, "
+        f"{args.error_rate:.0%} errors, {args.abort_rate:.0%} aborts\n"
+    )
+    results, elapsed = asyncio.run(_run(agent, kb, args))
+
+    completed = len(results.latency)
+    failed = results.failures.total()
+    print(f"turns        {completed} ok, {failed} failed in {elapsed:.1f}s")
+    print(
+        f"throughput   {completed / elapsed:.1f} turns/s, "
+        f"{results.output_tokens / elapsed:.0f} output tokens/s\n"
+    )
+    print(f"{'':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, values in (("TTFT", results.ttft), ("turn", results.latency)):
+        p50, p95, p99, slowest = _percentiles(values)
+        print(f"{name:<12} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {slowest:>9.1f}")
+    if results.failures:
+        print(
+            "\nfailures     "
+            + ", ".join(f"{name} x{n}" for name, n in results.failures.most_common())
+        )
+    if server is not None:
+        stats = server.mock.stats
+        print(
+            f"\nmock         {stats.requests} requests, {stats.tool_calls} tool "
+            f"calls, peak {stats.peak_streams} concurrent streams, "
+            f"{stats.errors_injected} errors and {stats.aborts_injected} aborts "
+            "injected"
+        )
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
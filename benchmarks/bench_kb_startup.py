@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark knowledge base startup: cold JSON validation vs snapshot load.
+
+Usage:
+    uv run python benchmarks/bench_kb_startup.py [--sizes 0 1000 10000]
+
+Size 0 means the shipped data/ directory; other sizes use synthetic
+catalogues with that many services, case studies and use cases.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from catalogue import DATA_DIR, write_catalogue
+
+from notch_chatbot.knowledge_base import SNAPSHOT_FILENAME, load_knowledge_base
+
+
+def _time(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench(data_dir: Path, repeat: int) -> tuple[float, float, int]:
+    """Return (cold ms, snapshot ms, snapshot bytes) for a data directory."""
+    cold = _time(lambda: load_knowledge_base(data_dir, use_snapshot=False), repeat)
+
+    # First snapshot-enabled load writes the snapshot; later loads read it
+    load_knowledge_base(data_dir)
+    warm = _time(lambda: load_knowledge_base(data_dir), repeat)
+    size = (data_dir / SNAPSHOT_FILENAME).stat().st_size
+    return cold, warm, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'catalogue':>12} {'cold ms':>10} {'snapshot ms':>12} {'speedup':>8} {'KiB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            if size == 0:
+                # Copy so the benchmark never touches the real snapshot
+                data_dir = Path(tmp) / "shipped"
+                data_dir.mkdir()
+                for path in DATA_DIR.glob("*.json"):
+                    (data_dir / path.name).write_bytes(path.read_bytes())
+                label = "shipped"
+            else:
+                data_dir = write_catalogue(Path(tmp) / str(size), size)
+                label = f"{size:,}"
+
+            cold, warm, nbytes = bench(data_dir, args.repeat)
+            print(
+                f"{label:>12} {cold:>10.1f} {warm:>12.1f} "
+                f"{cold / warm:>7.1f}x {nbytes / 1024:>8.0f}"
+            )
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Benchmark every knowledge base tool, and loading, on scaled catalogues.
+
+For each catalogue size (synthetic catalogues from catalogue.py with that
+many services, case studies and use cases) this measures:
+
+- load_knowledge_base, cold (JSON validation and index build) and from
+  the snapshot
+- every tool in agent.KNOWLEDGE_BASE_TOOLS, called as the agent calls it,
+  with arguments that hit real records
+
+Latency is the median and p95 of repeated calls (repeated until --min-time
+seconds have passed; a load slower than that runs once). Memory is the
+peak traced allocation of one more call, and "result" the size of the
+tool's return value as JSON, roughly what it adds to the prompt.
+
+Results can be saved as a baseline and later runs compared against it;
+the comparison exits with status 1 when anything got slower or bigger by
+more than --threshold, so it can gate CI.
+
+The 100k catalogue takes a few minutes and about 6 GB of memory (mostly
+tracing the loads); leave it out of --sizes on smaller machines.
+
+Usage:
+    uv run python benchmarks/bench_kb_tools.py [--sizes 10 1000 10000 100000]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from catalogue import write_catalogue
+from pydantic_core import to_json
+
+from notch_chatbot import tools
+from notch_chatbot.agent import KNOWLEDGE_BASE_TOOLS
+from notch_chatbot.knowledge_base import load_knowledge_base
+from notch_chatbot.models import KnowledgeBase
+
+# Differences smaller than these are noise, whatever the ratio
+_TIME_FLOOR = 2e-6
+_MEMORY_FLOOR = 4096
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Latency and memory of one benchmarked call.
+
+    Attributes:
+        median: Median seconds per call
+        p95: 95th percentile seconds per call
+        runs: Number of timed calls
+        peak_bytes: Peak traced allocation during one call
+        result_bytes: Size of the return value as JSON, for tools
+    """
+
+    median: float
+    p95: float
+    runs: int
+    peak_bytes: int
+    result_bytes: int | None = None
+
+
+def _tool_calls(kb: KnowledgeBase) -> dict[str, Callable[[], object]]:
+    """A representative call of every knowledge base tool."""
+    ctx = SimpleNamespace(deps=kb)
+    services, case_studies, use_cases = kb.services, kb.case_studies, kb.use_cases
+
+    def spread(records) -> list[str]:
+        return [records[0].id, records[len(records) // 2].id, records[-1].id]
+
+    calls = {
+        "find_services_by_keyword": lambda: tools.find_services_by_keyword(
+            ctx, ["ai", "cloud", "mobile"]
+        ),
+        "find_services_by_category": lambda: tools.find_services_by_category(
+            ctx, services[0].category
+        ),
+        "find_case_studies_by_industry": lambda: tools.find_case_studies_by_industry(
+            ctx, case_studies[0].industry
+        ),
+        "find_case_studies_by_service": lambda: tools.find_case_studies_by_service(
+            ctx, services[0].id
+        ),
+        "find_similar_case_studies": lambda: tools.find_similar_case_studies(
+            ctx, ["manufacturing", "iot", "predictive", "maintenance"]
+        ),
+        "get_all_case_studies": lambda: tools.get_all_case_studies(ctx),
+        "get_case_study_details": lambda: tools.get_case_study_details(
+            ctx, spread(case_studies)
+        ),
+        "find_use_cases_by_domain": lambda: tools.find_use_cases_by_domain(
+            ctx, use_cases[0].domain
+        ),
+        "find_use_cases_by_keyword": lambda: tools.find_use_cases_by_keyword(
+            ctx, ["automation", "forecasting"]
+        ),
+        "get_expertise_description": lambda: tools.get_expertise_description(
+            ctx, next(iter(kb.expertise_domains))
+        ),
+        "list_all_services": lambda: tools.list_all_services(ctx),
+        "get_service_details": lambda: tools.get_service_details(ctx, spread(services)),
+        "list_available_industries": lambda: tools.list_available_industries(ctx),
+    }
+    missing = {tool.__name__ for tool in KNOWLEDGE_BASE_TOOLS} - calls.keys()
+    if missing:
+        raise SystemExit(f"No benchmark call for: {', '.join(sorted(missing))}")
+    return calls
+
+
+def _peak_memory(fn: Callable[[], object]) -> int:
+    """Peak bytes allocated by fn() beyond what was live before it."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+
+def measure(
+    fn: Callable[[], object], min_time: float, result: bool = True
+) -> Measurement:
+    """Time fn() until min_time seconds have passed, then trace one call."""
+    # Warm up, and size the result; then let it go, as a loaded knowledge
+    # base at 100k records takes gigabytes
+    value = fn()
+    result_bytes = len(to_json(value)) if result else None
+    del value
+    samples = []
+    total = 0.0
+    while total < min_time:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    p95 = (
+        statistics.quantiles(samples, n=20, method="inclusive")[18]
+        if len(samples) > 1
+        else samples[0]
+    )
+    return Measurement(
+        median=statistics.median(samples),
+        p95=p95,
+        runs=len(samples),
+        peak_bytes=_peak_memory(fn),
+        result_bytes=result_bytes,
+    )
+
+
+def bench_size(size: int, min_time: float, tmp: Path) -> dict[str, Measurement]:
+    """Measure loading and every tool on a catalogue of `size` records."""
+    data_dir = write_catalogue(tmp / str(size), size)
+    results = {
+        "load_knowledge_base (cold)": measure(
+            lambda: load_knowledge_base(data_dir, use_snapshot=False),
+            min_time,
+            result=False,
+        )
+    }
+    # The warm-up call writes the snapshot that the timed calls read
+    results["load_knowledge_base (snapshot)"] = measure(
+        lambda: load_knowledge_base(data_dir), min_time, result=False
+    )
+    kb = load_knowledge_base(data_dir)
+    for name, call in _tool_calls(kb).items():
+        results[name] = measure(call, min_time)
+    return results
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def _format_bytes(n: int | None) -> str:
+    if n is None:
+        return "-"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KiB"
+    return f"{n / 1024 / 1024:.1f} MiB"
+
+
+def report(size: int, results: dict[str, Measurement]) -> None:
+    """Print the measurements of one catalogue size."""
+    print(f"\n{size:,} records of each kind")
+    print(
+        f"{'':<32} {'median':>10} {'p95':>10} {'runs':>7} {'peak':>10} {'result':>10}"
+    )
+    for name, m in results.items():
+        print(
+            f"{name:<32} {_format_time(m.median):>10} {_format_time(m.p95):>10} "
+            f"{m.runs:>7} {_format_bytes(m.peak_bytes):>10} "
+            f"{_format_bytes(m.result_bytes):>10}"
+        )
+    sys.stdout.flush()
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print changes against a saved baseline.
+
+    Args:
+        baseline: Saved results, as written by --save
+        current: This run's results, in the same form
+        threshold: Relative change counted as a regression
+
+    Returns:
+        Number of regressions
+    """
+    print(
+        f"\nCompared with {baseline['created']} "
+        f"(Python {baseline['python']}, {baseline['machine']})"
+    )
+    print(f"{'':<40} {'median':>21} {'change':>8} {'peak':>21} {'change':>8}")
+    regressions = 0
+    for size, results in current["results"].items():
+        for name, now in results.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if before is None:
+                continue
+            flags = []
+            changes = []
+            for key, floor, fmt in (
+                ("median", _TIME_FLOOR, _format_time),
+                ("peak_bytes", _MEMORY_FLOOR, _format_bytes),
+            ):
+                old, new = before[key], now[key]
+                change = (new - old) / old if old else 0.0
+                changes.append(f"{fmt(old):>10} {fmt(new):>10} {change:>+8.0%}")
+                if change > threshold and new - old > floor:
+                    flags.append("slower" if key == "median" else "bigger")
+            regressions += bool(flags)
+            label = f"{name} @ {int(size):,}"
+            print(f"{label:<40} {' '.join(changes)}  {' '.join(flags)}".rstrip())
+    print(
+        f"\n{regressions} regression{'s' if regressions != 1 else ''} "
+        f"beyond {threshold:.0%}"
+    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000]
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="seconds of timed calls each"
+    )
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="regression threshold (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    current = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results = bench_size(size, args.min_time, Path(tmp))
+            report(size, results)
+            current["results"][str(size)] = {
+                name: asdict(m) for name, m in results.items()
+            }
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.save}")
+    if baseline is not None and compare(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
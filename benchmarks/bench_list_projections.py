@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Measure prompt tokens saved by summary projections of the listing tools.
+
+Compares the JSON the model receives from list_all_services and
+get_all_case_studies (one summary page) against the previous behaviour of
+returning every full Service/CaseStudy record.
+
+Usage:
+    uv run python benchmarks/bench_list_projections.py
+
+Tokens are estimated offline with notch_chatbot.tokens.estimate_tokens
+(about 4 characters per token).
+"""
+
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from notch_chatbot.knowledge_base import load_knowledge_base
+from notch_chatbot.tokens import estimate_tokens
+from notch_chatbot.tools import get_all_case_studies, list_all_services
+
+
+def _json(value) -> str:
+    """Serialize a tool result the way pydantic-ai sends it to the model."""
+    return TypeAdapter(object).dump_json(value).decode()
+
+
+def main() -> None:
+    kb = load_knowledge_base()
+    ctx = SimpleNamespace(deps=kb)
+
+    rows = [
+        ("list_all_services", kb.services, list_all_services(ctx)),
+        ("get_all_case_studies", kb.case_studies, get_all_case_studies(ctx)),
+    ]
+
+    print("Estimated tokens per call on the shipped data/\n")
+    print(f"{'tool':<22} {'full':>7} {'summary':>8} {'saved':>7} {'saved %':>8}")
+    for name, full, summary in rows:
+        full_tokens = estimate_tokens(_json(full))
+        summary_tokens = estimate_tokens(_json(summary))
+        saved = full_tokens - summary_tokens
+        print(
+            f"{name:<22} {full_tokens:>7} {summary_tokens:>8} {saved:>7} "
+            f"{saved / full_tokens:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Measure chat time-to-first-token while many proposals render at once.
+
+Chat sessions stream agent turns (a local function model that answers after
+--model-ms, standing in for the OpenAI API) on one event loop while
+--offers proposals are created on the same loop. The offer step stops after
+the PDF is rendered, as SENDGRID_API_KEY is unset, so nothing is sent.
+
+- inline: _generate_proposal_pdf called on the event loop, as before
+- thread: rendered on a RenderPool thread pool
+- process: rendered on a RenderPool process pool
+
+Usage:
+    uv run python benchmarks/bench_pdf_offload.py [--offers 40] [--sessions 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot import tools
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.knowledge_base import load_knowledge_base
+from notch_chatbot.rendering import RenderPool
+
+_WORDS = ["Notch", " builds", " custom", " software", " and", " AI", " systems."]
+
+
+class _InlinePool:
+    """Renders on the calling event loop, like create_and_send_offer did."""
+
+    async def run(self, func, *args):
+        return func(*args)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _model(latency: float) -> FunctionModel:
+    async def stream(messages, info: AgentInfo):
+        await asyncio.sleep(latency)
+        for word in _WORDS:
+            yield word
+
+    return FunctionModel(stream_function=stream)
+
+
+async def _time_to_first_token(agent, kb, start: float) -> float:
+    """Time from the message arriving (start) to the first streamed token."""
+    async with agent.run_stream("What do you do?", deps=kb) as response:
+        async for _ in response.stream_text(delta=True):
+            return (time.perf_counter() - start) * 1000
+    raise AssertionError("no tokens streamed")
+
+
+async def _offer(number: int) -> None:
+    result = await tools.create_and_send_offer(
+        client_name=f"Client {number}",
+        client_email=f"client{number}@example.com",
+        project_description="Inventory management platform with AI forecasting",
+        services_list="Custom Software Development, AI Engineering, Cloud",
+        project_scope="large",
+    )
+    assert "SENDGRID_API_KEY not configured" in result, result
+
+
+async def _run(agent, kb, offers: int, sessions: int, spacing: float):
+    start = time.perf_counter()
+    offers_done = asyncio.gather(*(_offer(n) for n in range(offers)))
+    session_tasks = []
+    for _ in range(sessions):
+        session = _time_to_first_token(agent, kb, time.perf_counter())
+        session_tasks.append(asyncio.create_task(session))
+        await asyncio.sleep(spacing)
+    await offers_done
+    render_ms = (time.perf_counter() - start) * 1000
+    return await asyncio.gather(*session_tasks), render_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=40)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--model-ms", type=float, default=200.0)
+    parser.add_argument("--spacing-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    os.environ.pop("SENDGRID_API_KEY", None)
+    kb = load_knowledge_base()
+    agent = create_notch_agent(kb, model=_model(args.model_ms / 1000))
+
+    print(
+        f"{args.offers} proposals rendering, {args.sessions} chat sessions, "
+        f"{args.model_ms:.0f} ms model latency, {args.workers} workers\n"
+    )
+    print(
+        f"{'mode':<8} {'p50 ttft':>9} {'p95 ttft':>9} {'max ttft':>9} {'render ms':>10}"
+    )
+
+    pools = {
+        "inline": _InlinePool(),
+        "thread": RenderPool("thread", workers=args.workers),
+        "process": RenderPool("process", workers=args.workers),
+    }
+    for name, pool in pools.items():
+        tools.pdf_render_pool = pool
+        # Warm up: start the workers (and import the app in worker processes)
+        asyncio.run(_offer(-1))
+        ttfts, render_ms = asyncio.run(
+            _run(agent, kb, args.offers, args.sessions, args.spacing_ms / 1000)
+        )
+        ttfts.sort()
+        p95 = ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))]
+        print(
+            f"{name:<8} {statistics.median(ttfts):>9.1f} {p95:>9.1f} "
+            f"{ttfts[-1]:>9.1f} {render_ms:>10.0f}"
+        )
+        pool.shutdown()
+
+    print(
+        "\nttft: chat time-to-first-token in ms (the floor is the model latency)"
+        "\nrender ms: until all proposals are rendered"
+    )
+
+
+if __name__ == "__main__":
+    main()
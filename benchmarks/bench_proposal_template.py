@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Measure proposal PDF throughput and memory, before and after the template.
+
+- before: every section laid out with multi_cell on each render, as
+  tools._generate_proposal_pdf used to do (reproduced below)
+- after: ProposalTemplate, with the static sections wrapped once
+
+Reports proposals per second and the peak Python allocation of one render
+(tracemalloc), and checks that both produce the same document.
+
+Usage:
+    uv run python benchmarks/bench_proposal_template.py [--renders 200]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+import warnings
+from datetime import date, datetime
+
+from fpdf import FPDF
+
+from notch_chatbot.proposal import ProposalTemplate
+
+CLIENT = (
+    "Jane Smith",
+    "jane@example.com",
+    "Inventory management platform with demand forecasting, supplier "
+    "integrations and a mobile app for warehouse staff.",
+    "Custom Software Development, AI Engineering, Mobile App Development",
+    "large",
+)
+
+
+def _legacy_render(
+    client_name: str,
+    client_email: str,
+    project_description: str,
+    services_list: str,
+    project_scope: str,
+) -> bytes:
+    """The multi_cell implementation the template replaced."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    # Header with Notch branding
+    pdf.set_font("Arial", "B", 24)
+    pdf.set_text_color(0, 102, 204)  # Blue color for branding
+    pdf.cell(0, 10, "NOTCH", ln=True, align="C")
+    pdf.set_font("Arial", "I", 10)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 5, "Software Development & AI Solutions", ln=True, align="C")
+    pdf.ln(10)
+
+    # Date
+    pdf.set_font("Arial", "", 10)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 5, f"Date: {datetime.now().strftime('%B %d, %Y')}", ln=True)
+    pdf.ln(5)
+
+    # Client information
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 7, "Proposal For:", ln=True)
+    pdf.set_font("Arial", "", 11)
+    pdf.cell(0, 6, f"{client_name}", ln=True)
+    pdf.cell(0, 6, f"{client_email}", ln=True)
+    pdf.ln(10)
+
+    # Project overview
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 8, "Project Overview", ln=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(0, 6, project_description)
+    pdf.ln(5)
+
+    # Recommended services
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 8, "Recommended Services", ln=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(0, 6, services_list)
+    pdf.ln(5)
+
+    # Team composition
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 8, "Team Composition", ln=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(
+        0,
+        6,
+        "Your project will be handled by a dedicated team including:\n"
+        "- Project Manager\n"
+        "- Senior Software Engineers\n"
+        "- UI/UX Designer\n"
+        "- QA Specialist\n"
+        "- DevOps Engineer (as needed)",
+    )
+    pdf.ln(5)
+
+    # Pricing estimate
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 8, "Investment Estimate", ln=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+
+    # Determine pricing based on scope
+    pricing_info = {
+        "small": "Starting from $15,000 - $35,000",
+        "medium": "Typical range: $35,000 - $100,000 depending on scope",
+        "large": "Starting from $100,000+ depending on requirements",
+    }
+
+    pricing_text = pricing_info.get(project_scope.lower(), pricing_info["medium"])
+    pdf.multi_cell(
+        0,
+        6,
+        f"{pricing_text}\n\n"
+        "Final pricing will be determined based on detailed requirements, "
+        "timeline, and project complexity. We'll provide a detailed breakdown "
+        "after our initial consultation call.",
+    )
+    pdf.ln(5)
+
+    # Next steps
+    pdf.set_font("Arial", "B", 14)
+    pdf.set_text_color(0, 102, 204)
+    pdf.cell(0, 8, "Next Steps", ln=True)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(
+        0,
+        6,
+        "1. Review this proposal\n"
+        "2. Schedule a consultation call to discuss details\n"
+        "3. Receive detailed project plan and final quote\n"
+        "4. Project kickoff and development",
+    )
+    pdf.ln(10)
+
+    # Disclaimer
+    pdf.set_font("Arial", "I", 9)
+    pdf.set_text_color(100, 100, 100)
+    pdf.multi_cell(
+        0,
+        5,
+        "IMPORTANT: This proposal is for orientational purposes only and does not "
+        "constitute a binding offer. Final terms, pricing, and deliverables will be "
+        "confirmed in a formal contract following detailed requirements analysis.",
+    )
+    pdf.ln(5)
+
+    # Footer
+    pdf.set_y(-30)
+    pdf.set_font("Arial", "", 9)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 5, "Notch Software Development", ln=True, align="C")
+    pdf.cell(0, 5, "www.wearenotch.com", ln=True, align="C")
+    return bytes(pdf.output())
+
+
+def _template_render(template: ProposalTemplate):
+    return lambda *client: template.render(*client, proposal_date=date.today())
+
+
+def _throughput(render, renders: int) -> float:
+    render(*CLIENT)
+    start = time.perf_counter()
+    for _ in range(renders):
+        render(*CLIENT)
+    return renders / (time.perf_counter() - start)
+
+
+def _peak_kib(render) -> float:
+    tracemalloc.start()
+    render(*CLIENT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _without_creation_date(pdf: bytes) -> bytes:
+    return re.sub(rb"/CreationDate \(.*?\)", b"", pdf)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=200)
+    args = parser.parse_args()
+    # The legacy code uses the "Arial" alias and ln=True, which fpdf2 warns about
+    warnings.simplefilter("ignore")
+
+    start = time.perf_counter()
+    template = ProposalTemplate()
+    layout_ms = (time.perf_counter() - start) * 1000
+    modes = {"before": _legacy_render, "after": _template_render(template)}
+
+    same = _without_creation_date(modes["before"](*CLIENT)) == _without_creation_date(
+        modes["after"](*CLIENT)
+    )
+    print(f"{args.renders} renders; template layout {layout_ms:.1f} ms (once)")
+    print(f"identical output: {same}\n")
+    print(f"{'mode':<8} {'proposals/s':>12} {'ms each':>8} {'peak KiB':>9}")
+    for name, render in modes.items():
+        rate = _throughput(render, args.renders)
+        print(f"{name:<8} {rate:>12.1f} {1000 / rate:>8.2f} {_peak_kib(render):>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Measure per-turn latency of the Streamlit agent loop, before and after
+the shared event loop.
+
+Both modes stream real agent turns against a local stub of the OpenAI chat
+completions API:
+
+- before: asyncio.run() per turn (a new event loop each time) with
+  pydantic-ai's default model client, as streamlit_app.py used to do
+- after: every turn on one AsyncRunner loop with the pooled model client
+
+The stub delays each new TCP connection by --connect-ms to stand in for
+the TCP + TLS handshake to api.openai.com, which a reused pooled connection
+skips. Pass --connect-ms 0 to measure the loop overhead alone.
+
+Usage:
+    uv run python benchmarks/bench_turn_latency.py [--turns 20] [--connect-ms 150]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from notch_chatbot.agent import (
+    create_model_client,
+    create_notch_agent,
+    create_pooled_model,
+)
+from notch_chatbot.knowledge_base import load_knowledge_base
+from notch_chatbot.runner import AsyncRunner
+
+_WORDS = ["Notch", " builds", " custom", " software", " and", " AI", " systems."]
+
+
+def _chunk(delta: dict, finish_reason: str | None = None) -> bytes:
+    payload = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+def _stream_body() -> bytes:
+    parts = [_chunk({"role": "assistant", "content": ""})]
+    parts += [_chunk({"content": word}) for word in _WORDS]
+    parts += [_chunk({}, "stop"), b"data: [DONE]\n\n"]
+    return b"".join(parts)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Streams a fixed chat completion; keeps connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle's
+    # algorithm adds ~40 ms to every request on a reused connection
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+    connections = 0
+
+    def setup(self) -> None:
+        type(self).connections += 1
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = _stream_body()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+async def _turn(agent, kb):
+    async with agent.run_stream("What do you do?", deps=kb) as response:
+        async for chunk in response.stream_text(delta=True):
+            yield chunk
+
+
+def _collect(chunks) -> str:
+    """Drain an async chunk stream, as the Streamlit script used to."""
+
+    async def drain():
+        return "".join([chunk async for chunk in chunks])
+
+    return asyncio.run(drain())
+
+
+def _measure(turns: int, run_turn) -> list[float]:
+    latencies = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        text = run_turn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert text == "".join(_WORDS), text
+    return latencies
+
+
+def _report(name: str, latencies: list[float], connections: int) -> None:
+    print(
+        f"{name:<8} {statistics.mean(latencies):>8.1f} "
+        f"{statistics.median(latencies):>8.1f} {max(latencies):>8.1f} "
+        f"{connections:>12}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--connect-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    _StubHandler.connect_delay = args.connect_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+    kb = load_knowledge_base()
+    print(
+        f"{args.turns} turns, {args.connect_ms:.0f} ms simulated handshake per "
+        "new connection\n"
+    )
+    print(f"{'mode':<8} {'mean ms':>8} {'p50 ms':>8} {'max ms':>8} {'connections':>12}")
+
+    before_agent = create_notch_agent(kb)
+    _StubHandler.connections = 0
+    latencies = _measure(args.turns, lambda: _collect(_turn(before_agent, kb)))
+    _report("before", latencies, _StubHandler.connections)
+
+    runner = AsyncRunner()
+    after_agent = create_notch_agent(
+        kb, model=create_pooled_model(create_model_client())
+    )
+    _StubHandler.connections = 0
+    latencies = _measure(
+        args.turns, lambda: "".join(runner.stream(_turn(after_agent, kb)))
+    )
+    _report("after", latencies, _StubHandler.connections)
+
+    runner.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
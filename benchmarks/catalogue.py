@@ -0,0 +1,85 @@
+"""Synthetic knowledge base catalogues for benchmarks.
+
+Scales the shipped data/ records up to any size by cloning them with unique
+IDs and a few extra words drawn from the shipped vocabulary, so search
+indexes see a realistic mix of common and rare terms.
+"""
+
+import json
+import random
+import re
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Text fields that get extra vocabulary, per data file
+_TEXT_FIELDS = {
+    "services.json": "description",
+    "case_studies.json": "challenge",
+    "use_cases.json": "problem",
+}
+
+
+def _load(name: str) -> list | dict:
+    return json.loads((DATA_DIR / name).read_text(encoding="utf-8"))
+
+
+def build_catalogue(size: int, seed: int = 0) -> dict[str, list | dict]:
+    """Build a catalogue with `size` services, case studies and use cases.
+
+    Args:
+        size: Number of records of each kind
+        seed: Random seed, so repeated runs produce identical catalogues
+
+    Returns:
+        File name to JSON-serializable contents, like the data/ directory
+    """
+    rng = random.Random(seed)
+    shipped = {name: _load(name) for name in _TEXT_FIELDS}
+    vocabulary = sorted(
+        {
+            word
+            for records in shipped.values()
+            for record in records
+            for word in re.findall(r"[a-z]{4,}", json.dumps(record).lower())
+        }
+    )
+
+    catalogue: dict[str, list | dict] = {}
+    for name, records in shipped.items():
+        scaled = []
+        for i in range(size):
+            record = dict(records[i % len(records)])
+            record["id"] = f"{record['id']}-{i}"
+            field = _TEXT_FIELDS[name]
+            extra = " ".join(rng.choices(vocabulary, k=8))
+            record[field] = f"{record[field]} {extra}"
+            scaled.append(record)
+        catalogue[name] = scaled
+
+    # Case studies and use cases refer to service IDs that must exist
+    service_ids = [s["id"] for s in catalogue["services.json"]]
+    for cs in catalogue["case_studies.json"]:
+        cs["services_used"] = rng.sample(service_ids, k=min(2, len(service_ids)))
+    for uc in catalogue["use_cases.json"]:
+        uc["related_services"] = rng.sample(service_ids, k=min(2, len(service_ids)))
+
+    catalogue["expertise.json"] = _load("expertise.json")
+    return catalogue
+
+
+def write_catalogue(directory: Path, size: int, seed: int = 0) -> Path:
+    """Write a synthetic catalogue as a data directory.
+
+    Args:
+        directory: Directory to create the JSON files in
+        size: Number of records of each kind
+        seed: Random seed
+
+    Returns:
+        The directory, ready to pass to load_knowledge_base()
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, content in build_catalogue(size, seed).items():
+        (directory / name).write_text(json.dumps(content), encoding="utf-8")
+    return directory
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Local stand-in for the OpenAI chat completions API, for load tests.
+
+Streams answers with a configurable time to first token and token rate,
+follows a script of tool calls before answering, and injects failures:
+error statuses before the stream starts and connections cut mid-stream.
+It understands just enough of the API for pydantic-ai's OpenAI model.
+
+Run it on its own to point the chatbot (or notch-server) at it:
+
+    uv run python benchmarks/mock_openai.py --port 8001 --ttft-ms 400
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=mock uv run notch-server
+
+or start it in-process with MockOpenAIServer, as bench_concurrent_load.py does.
+
+Usage:
+    uv run python benchmarks/mock_openai.py [--port 8001] [--ttft-ms 300]
+        [--tokens-per-second 60] [--tool find_services_by_keyword:'{"keywords": ["AI"]}']
+        [--error-rate 0.01] [--abort-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+_VOCABULARY = (
+    "Notch builds custom software AI systems and MVPs for clients in fintech "
+    "healthcare manufacturing and retail with teams that ship quickly"
+).split()
+
+
+@dataclass
+class MockConfig:
+    """How the mock answers.
+
+    Attributes:
+        ttft: Seconds before the first token of a streamed response
+        ttft_jitter: Uniform random extra seconds on top of ttft
+        tokens_per_second: Streaming rate after the first token; 0 sends
+                           the whole answer at once
+        answer_tokens: Words in each text answer
+        tool_script: Tool calls made before answering, one list per model
+                     request of a turn, as (tool name, arguments) pairs
+        error_rate: Fraction of requests refused with error_status
+        error_status: Status of injected errors (500 and 429 are retried
+                      by the OpenAI client)
+        abort_rate: Fraction of streams cut off halfway through
+        seed: Random seed for jitter and injected failures
+    """
+
+    ttft: float = 0.3
+    ttft_jitter: float = 0.0
+    tokens_per_second: float = 60.0
+    answer_tokens: int = 40
+    tool_script: list[list[tuple[str, dict]]] = field(default_factory=list)
+    error_rate: float = 0.0
+    error_status: int = 500
+    abort_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class MockStats:
+    """What the mock has served."""
+
+    requests: int = 0
+    tool_calls: int = 0
+    errors_injected: int = 0
+    aborts_injected: int = 0
+    active_streams: int = 0
+    peak_streams: int = 0
+
+
+class _InjectedAbort(Exception):
+    """Raised mid-stream so the server drops the connection."""
+
+
+def _chunk(delta: dict, finish_reason: str | None = None, **extra) -> bytes:
+    payload = {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        **extra,
+    }
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+def _script_step(messages: list[dict]) -> int:
+    """How many tool-call rounds the current turn has had."""
+    step = 0
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            break
+        if message.get("role") == "assistant" and message.get("tool_calls"):
+            step += 1
+    return step
+
+
+class MockOpenAI:
+    """ASGI app answering /v1/chat/completions as configured."""
+
+    def __init__(self, config: MockConfig) -> None:
+        self.config = config
+        self.stats = MockStats()
+        self._rng = random.Random(config.seed)
+        self.app = Starlette(
+            routes=[
+                Route("/v1/chat/completions", self.chat_completions, methods=["POST"])
+            ]
+        )
+
+    def _tool_calls(self, messages: list[dict]) -> list[dict]:
+        step = _script_step(messages)
+        if step >= len(self.config.tool_script):
+            return []
+        return [
+            {
+                "index": index,
+                "id": f"call_{step}_{index}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            for index, (name, arguments) in enumerate(self.config.tool_script[step])
+        ]
+
+    def _answer(self) -> list[str]:
+        words = self._rng.choices(_VOCABULARY, k=self.config.answer_tokens)
+        return [words[0]] + [f" {word}" for word in words[1:]]
+
+    async def chat_completions(self, request: Request) -> Response:
+        body = await request.json()
+        self.stats.requests += 1
+        if self._rng.random() < self.config.error_rate:
+            self.stats.errors_injected += 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+                status_code=self.config.error_status,
+            )
+        tool_calls = self._tool_calls(body.get("messages", []))
+        self.stats.tool_calls += len(tool_calls)
+        tokens = [] if tool_calls else self._answer()
+        abort = self._rng.random() < self.config.abort_rate
+        ttft = self.config.ttft + self._rng.uniform(0, self.config.ttft_jitter)
+        if body.get("stream"):
+            return StreamingResponse(
+                self._stream(tool_calls, tokens, ttft, abort),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(ttft)
+        message = {"role": "assistant", "content": "".join(tokens) or None}
+        if tool_calls:
+            message["tool_calls"] = [
+                {key: value for key, value in call.items() if key != "index"}
+                for call in tool_calls
+            ]
+        return JSONResponse(
+            {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": "tool_calls" if tool_calls else "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": len(tokens),
+                },
+            }
+        )
+
+    async def _stream(
+        self, tool_calls: list[dict], tokens: list[str], ttft: float, abort: bool
+    ):
+        stats = self.stats
+        stats.active_streams += 1
+        stats.peak_streams = max(stats.peak_streams, stats.active_streams)
+        try:
+            await asyncio.sleep(ttft)
+            yield _chunk({"role": "assistant", "content": ""})
+            if tool_calls:
+                if abort:
+                    stats.aborts_injected += 1
+                    raise _InjectedAbort
+                yield _chunk({"tool_calls": tool_calls})
+            interval = (
+                1 / self.config.tokens_per_second
+                if self.config.tokens_per_second
+                else 0
+            )
+            for position, token in enumerate(tokens):
+                if abort and position == len(tokens) // 2:
+                    stats.aborts_injected += 1
+                    raise _InjectedAbort
+                if position and interval:
+                    await asyncio.sleep(interval)
+                yield _chunk({"content": token})
+            yield _chunk({}, "tool_calls" if tool_calls else "stop")
+            yield _chunk(
+                {},
+                usage={
+                    "prompt_tokens": 0,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": len(tokens),
+                },
+            )
+            yield b"data: [DONE]\n\n"
+        finally:
+            stats.active_streams -= 1
+
+
+class MockOpenAIServer:
+    """Runs a MockOpenAI on its own event loop in a background thread.
+
+    Keeping the mock off the load generator's loop means its sleeps and
+    writes don't queue behind agent runs being measured.
+    """
+
+    def __init__(self, config: MockConfig, port: int = 0) -> None:
+        self.mock = MockOpenAI(config)
+        self._server = uvicorn.Server(
+            uvicorn.Config(
+                self.mock.app,
+                host="127.0.0.1",
+                port=port,
+                # Injected aborts would otherwise log a traceback each
+                log_level="critical",
+                lifespan="off",
+                backlog=4096,
+            )
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> str:
+        """Start serving.
+
+        Returns:
+            Base URL to use as OPENAI_BASE_URL
+        """
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    def stop(self) -> None:
+        """Stop serving and wait for the thread."""
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def _tool_step(value: str) -> list[tuple[str, dict]]:
+    """Parse --tool NAME[:JSON_ARGS][,NAME[:JSON_ARGS]...] into one script step."""
+    step = []
+    for call in value.split(","):
+        name, _, arguments = call.partition(":")
+        step.append((name.strip(), json.loads(arguments) if arguments else {}))
+    return step
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that configure the mock."""
+    group = parser.add_argument_group("mock OpenAI server")
+    group.add_argument(
+        "--ttft-ms", type=float, default=300.0, help="time to first token"
+    )
+    group.add_argument(
+        "--ttft-jitter-ms", type=float, default=0.0, help="uniform extra TTFT"
+    )
+    group.add_argument(
+        "--tokens-per-second", type=float, default=60.0, help="0 for no pacing"
+    )
+    group.add_argument("--answer-tokens", type=int, default=40, help="words per answer")
+    group.add_argument(
+        "--tool",
+        dest="tool_script",
+        type=_tool_step,
+        action="append",
+        default=[],
+        help="tool calls of one model request before the answer, as "
+        "NAME[:JSON_ARGS] separated by commas; repeat for more rounds",
+    )
+    group.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of requests refused"
+    )
+    group.add_argument(
+        "--error-status", type=int, default=500, help="status of refused requests"
+    )
+    group.add_argument(
+        "--abort-rate", type=float, default=0.0, help="fraction of streams cut off"
+    )
+    group.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    """MockConfig from the options added by add_mock_arguments()."""
+    return MockConfig(
+        ttft=args.ttft_ms / 1000,
+        ttft_jitter=args.ttft_jitter_ms / 1000,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        tool_script=args.tool_script,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        abort_rate=args.abort_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock = MockOpenAI(config_from_args(args))
+    print(f"Serving on http://127.0.0.1:{args.port}/v1")
+    uvicorn.run(mock.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
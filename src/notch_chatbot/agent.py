@@ -1,7 +1,14 @@
 """Main Notch chatbot agent implementation."""
 
+import httpx
 from pydantic_ai import Agent
+from pydantic_ai.models import Model
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
 
+from .cache import ToolResultCache, cached_tool
+from .history import HistoryCompactor, ToolReturnPruner
+from .http_client import DrainingTransport
 from .models import KnowledgeBase
 from .tools import (
     create_and_send_offer,
@@ -12,12 +19,22 @@ from .tools import (
     find_services_by_keyword,
     find_similar_case_studies,
     find_use_cases_by_domain,
+    find_use_cases_by_keyword,
     get_all_case_studies,
+    get_case_study_details,
     get_expertise_description,
+    get_service_details,
     list_all_services,
     list_available_industries,
 )
 
+# Chat model used by the agent
+MODEL_NAME = "gpt-4o"
+
+# Pool for the shared model client; OpenAI's own timeouts
+MODEL_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+MODEL_CLIENT_TIMEOUT = httpx.Timeout(600, connect=5)
+
 # System prompt for the Notch chatbot
 SYSTEM_PROMPT = """You are a helpful and knowledgeable chatbot assistant for Notch, a software development agency specializing in custom software, AI systems, and enterprise solutions.
 
@@ -109,6 +126,7 @@ SYSTEM_PROMPT = """You are a helpful and knowledgeable chatbot assistant for Not
 - If the tools return no results, be honest immediately: "We don't currently have case studies/use cases in that specific domain in our knowledge base, but let me tell you what we can do..."
 - Only use phrases like "let me check" or "let me find" when you're ACTIVELY calling a tool in the same response
 - Better approach: Call the tool first, THEN respond based on what you actually found
+- Listing tools (list_all_services, get_all_case_studies) return compact summaries; call get_service_details or get_case_study_details with specific IDs only when you need the full details
 
 ## Converging Toward Action - CRITICAL
 Your goal is to naturally guide conversations toward concrete next steps:
@@ -299,32 +317,85 @@ Remember: Be helpful first, consultative second, and never pushy. Build trust th
 **THE BREVITY RULE APPLIES TO EVERY SINGLE RESPONSE IN THE CONVERSATION - NOT JUST THE FIRST FEW MESSAGES.**"""
 
 
-def create_notch_agent(knowledge_base: KnowledgeBase) -> Agent:
+# Pure functions of the knowledge base and their arguments; safe to cache
+KNOWLEDGE_BASE_TOOLS = (
+    find_services_by_keyword,
+    find_services_by_category,
+    find_case_studies_by_industry,
+    find_case_studies_by_service,
+    find_similar_case_studies,
+    get_all_case_studies,
+    get_case_study_details,
+    find_use_cases_by_domain,
+    find_use_cases_by_keyword,
+    get_expertise_description,
+    list_all_services,
+    get_service_details,
+    list_available_industries,
+)
+
+
+def create_model_client() -> httpx.AsyncClient:
+    """Create a connection-pooled HTTP client for the OpenAI API.
+
+    The pool is bound to the event loop of its first request, so the client
+    should only be used from one long-lived loop (see runner.AsyncRunner).
+    """
+    transport = DrainingTransport(httpx.AsyncHTTPTransport(limits=MODEL_CLIENT_LIMITS))
+    return httpx.AsyncClient(transport=transport, timeout=MODEL_CLIENT_TIMEOUT)
+
+
+def create_pooled_model(http_client: httpx.AsyncClient) -> OpenAIChatModel:
+    """Create the chat model on top of a shared HTTP client.
+
+    Args:
+        http_client: Client from create_model_client(), reused by every run
+
+    Returns:
+        OpenAI chat model that sends all requests through http_client
+    """
+    return OpenAIChatModel(MODEL_NAME, provider=OpenAIProvider(http_client=http_client))
+
+
+def create_notch_agent(
+    knowledge_base: KnowledgeBase,
+    tool_cache: ToolResultCache | None = None,
+    history_compactor: HistoryCompactor | None = None,
+    tool_return_pruner: ToolReturnPruner | None = None,
+    model: Model | str = f"openai:{MODEL_NAME}",
+) -> Agent:
     """Create and configure the Notch chatbot agent.
 
     Args:
         knowledge_base: Loaded knowledge base with services, case studies, etc.
+        tool_cache: Optional cache shared across sessions for knowledge base
+                    tool results
+        history_compactor: Optional history processor that keeps the
+                           conversation under a token budget
+        tool_return_pruner: Optional history processor that shrinks stale
+                            tool results; runs before the compactor
+        model: Model to run, e.g. from create_pooled_model(); defaults to
+               gpt-4o with pydantic-ai's default HTTP client
 
     Returns:
         Configured Pydantic AI agent
     """
+    # Pruning first means the compactor budgets the already-shrunk history
+    history_processors = [
+        processor
+        for processor in (tool_return_pruner, history_compactor)
+        if processor is not None
+    ]
     agent = Agent(
-        "openai:gpt-4o",
+        model,
         deps_type=KnowledgeBase,
         system_prompt=SYSTEM_PROMPT,
+        history_processors=history_processors,
     )
 
     # Register all tools
-    agent.tool(find_services_by_keyword)
-    agent.tool(find_services_by_category)
-    agent.tool(find_case_studies_by_industry)
-    agent.tool(find_case_studies_by_service)
-    agent.tool(find_similar_case_studies)
-    agent.tool(get_all_case_studies)
-    agent.tool(find_use_cases_by_domain)
-    agent.tool(get_expertise_description)
-    agent.tool(list_all_services)
-    agent.tool(list_available_industries)
+    for tool in KNOWLEDGE_BASE_TOOLS:
+        agent.tool(cached_tool(tool_cache, tool) if tool_cache else tool)
     agent.tool_plain(fetch_latest_blog_posts)
     agent.tool_plain(create_and_send_offer)
 
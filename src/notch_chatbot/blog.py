@@ -0,0 +1,224 @@
+"""Notch blog index: parsing and a stale-while-revalidate cache."""
+
+import asyncio
+import logging
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from .http_client import tool_http_client
+from .models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOG_TTL = 15 * 60
+
+# After a failed refresh, wait this long before trying again
+_RETRY_AFTER = 60.0
+
+# Path segments of listing pages that link from the index but aren't posts
+_NON_POST_SEGMENTS = {"category", "categories", "tag", "tags", "author", "page"}
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _BlogIndexParser(HTMLParser):
+    """Collects post links (and their card's date and excerpt) from the index.
+
+    A post is any link to a page below the index URL. When links sit in an
+    <article> (or <li>) card, the card's <time> and first paragraph become
+    the post's date and summary. A card linking the same post twice (image
+    and title) yields one post, titled by the longest link text.
+    """
+
+    _CARD_TAGS = {"article", "li"}
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self._base_url = base_url
+        self._index_path = urlsplit(base_url).path.rstrip("/")
+        self.posts: dict[str, BlogPost] = {}
+        self._card_depth = 0
+        self._card_posts: list[str] = []
+        self._card_time: str | None = None
+        self._card_summary: str | None = None
+        self._link_url: str | None = None
+        self._link_text: list[str] = []
+        self._in_time = False
+        self._time_text: list[str] = []
+        self._in_paragraph = False
+        self._paragraph_text: list[str] = []
+
+    def _post_url(self, href: str) -> str | None:
+        url = urljoin(self._base_url, href).split("#")[0]
+        parts = urlsplit(url)
+        if parts.netloc != urlsplit(self._base_url).netloc or parts.query:
+            return None
+        path = parts.path.rstrip("/")
+        if not path.startswith(self._index_path + "/"):
+            return None
+        segments = path[len(self._index_path) + 1 :].split("/")
+        if _NON_POST_SEGMENTS & set(segments):
+            return None
+        return url
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        if tag in self._CARD_TAGS:
+            if self._card_depth == 0:
+                self._card_posts = []
+                self._card_time = None
+                self._card_summary = None
+            self._card_depth += 1
+        elif tag == "a" and attributes.get("href"):
+            self._link_url = self._post_url(attributes["href"])
+            self._link_text = []
+        elif tag == "time":
+            self._in_time = True
+            self._time_text = []
+            if attributes.get("datetime"):
+                self._card_time = attributes["datetime"]
+        elif tag == "p" and self._card_depth and self._card_summary is None:
+            self._in_paragraph = True
+            self._paragraph_text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._link_url:
+            self._link_text.append(data)
+        if self._in_time:
+            self._time_text.append(data)
+        if self._in_paragraph:
+            self._paragraph_text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a" and self._link_url:
+            self._add_link(self._link_url, _clean("".join(self._link_text)))
+            self._link_url = None
+        elif tag == "time" and self._in_time:
+            self._in_time = False
+            if self._card_time is None:
+                self._card_time = _clean("".join(self._time_text)) or None
+        elif tag == "p" and self._in_paragraph:
+            self._in_paragraph = False
+            self._card_summary = _clean("".join(self._paragraph_text)) or None
+        elif tag in self._CARD_TAGS and self._card_depth:
+            self._card_depth -= 1
+            if self._card_depth == 0:
+                self._close_card()
+
+    def _add_link(self, url: str, text: str) -> None:
+        post = self.posts.get(url)
+        if post is None:
+            self.posts[url] = BlogPost(title=text, url=url)
+        elif len(text) > len(post.title):
+            post.title = text
+        if self._card_depth:
+            self._card_posts.append(url)
+
+    def _close_card(self) -> None:
+        for url in self._card_posts:
+            post = self.posts[url]
+            post.published = post.published or self._card_time
+            post.summary = post.summary or self._card_summary
+
+
+def parse_blog_index(html: str, base_url: str) -> list[BlogPost]:
+    """Extract the posts listed on a blog index page.
+
+    Args:
+        html: HTML of the index page
+        base_url: URL the page was fetched from; relative links resolve
+                  against it and only links below it count as posts
+
+    Returns:
+        Posts in page order (newest first on a typical index), without
+        untitled links
+    """
+    parser = _BlogIndexParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return [post for post in parser.posts.values() if post.title]
+
+
+class BlogFeed:
+    """Cached view of the blog index, refreshed in the background.
+
+    The first call waits for a fetch. After that, cached posts are returned
+    immediately; once they are older than the TTL, a conditional request
+    (If-None-Match / If-Modified-Since) revalidates them in the background,
+    so a chat turn never waits on the blog. A failed refresh keeps serving
+    the posts it has.
+    """
+
+    def __init__(self, url: str, ttl: float = DEFAULT_BLOG_TTL) -> None:
+        """Create an empty feed.
+
+        Args:
+            url: Blog index URL
+            ttl: Seconds before cached posts are revalidated
+        """
+        self.url = url
+        self.ttl = ttl
+        self._posts: list[BlogPost] | None = None
+        self._fetched_at = 0.0
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    def _is_fresh(self) -> bool:
+        return time.monotonic() - self._fetched_at < self.ttl
+
+    async def get_posts(self) -> list[BlogPost]:
+        """Return the cached posts, fetching them first if there are none.
+
+        Raises:
+            httpx.HTTPError: If the first fetch fails
+        """
+        if self._posts is None:
+            await self.refresh()
+        elif not self._is_fresh():
+            self._refresh_in_background()
+        return self._posts or []
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Blog refresh failed, serving cached posts: {e}")
+            # Back off instead of retrying on every call
+            self._fetched_at = time.monotonic() - self.ttl + _RETRY_AFTER
+
+    async def refresh(self) -> None:
+        """Revalidate the cached posts with a conditional request.
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        headers = {}
+        if self._posts is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+        async with tool_http_client() as client:
+            response = await client.get(
+                self.url, headers=headers, follow_redirects=True
+            )
+
+        if response.status_code == 304:
+            logger.debug("Blog index not modified")
+        else:
+            response.raise_for_status()
+            self._posts = parse_blog_index(response.text, str(response.url))
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            logger.info(f"Fetched {len(self._posts)} posts from {self.url}")
+        self._fetched_at = time.monotonic()
@@ -0,0 +1,365 @@
+"""Bulk proposal sending: render and email refreshed offers to a list of leads."""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, EmailStr, ValidationError
+
+from . import tools
+from .dedup import offer_key
+from .http_client import app_http_client
+from .mail import transport_from_env
+from .outbox import DeliveryError
+from .rendering import RenderPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEND_CONCURRENCY = 8
+DEFAULT_SEND_RATE = 10.0
+DEFAULT_WINDOW = 64
+DEFAULT_SEND_ATTEMPTS = 3
+
+SENT = "sent"
+FAILED = "failed"
+
+
+class Lead(BaseModel):
+    """One prospect to send a proposal to (a CSV row or JSONL object)."""
+
+    client_name: str
+    client_email: EmailStr
+    project_description: str
+    services_list: str
+    project_scope: str = "medium"
+
+    @property
+    def key(self) -> str:
+        """Identity of the offer, as used for deduplication."""
+        return offer_key(
+            self.client_email,
+            self.project_description,
+            self.services_list,
+            self.project_scope,
+        )
+
+
+def load_leads(path: Path | str) -> list[Lead]:
+    """Read leads from a .csv file (with a header row) or a .jsonl file.
+
+    Raises:
+        ValueError: If the format is unknown or a lead is invalid; the
+                    message names the offending line
+    """
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix == ".csv":
+            # Data starts on line 2, after the header
+            rows = enumerate(csv.DictReader(f), start=2)
+        elif path.suffix in (".jsonl", ".ndjson"):
+            rows = (
+                (number, json.loads(line))
+                for number, line in enumerate(f, start=1)
+                if line.strip()
+            )
+        else:
+            raise ValueError(f"Unsupported lead file {path.name}: use .csv or .jsonl")
+
+        leads = []
+        for number, row in rows:
+            try:
+                leads.append(Lead.model_validate(row))
+            except ValidationError as e:
+                raise ValueError(f"{path.name} line {number}: {e}") from e
+    return leads
+
+
+@dataclass(frozen=True)
+class LeadResult:
+    """Outcome of one lead, as written to the results file."""
+
+    key: str
+    client_email: str
+    status: str
+    detail: str
+    finished_at: float
+
+
+class ResultLog:
+    """Per-lead results in an append-only JSONL file.
+
+    Every result is written (and flushed) as soon as the lead finishes, so
+    an interrupted run loses at most the leads in flight. A rerun with the
+    same file skips leads that already have a result.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Open the log, loading results of earlier runs.
+
+        Args:
+            path: Results file; created if missing
+        """
+        self.path = Path(path)
+        self.results: dict[str, LeadResult] = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    result = LeadResult(**json.loads(line))
+                    self.results[result.key] = result
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def is_done(self, lead: Lead, retry_failed: bool = False) -> bool:
+        """Whether an earlier run already handled the lead."""
+        result = self.results.get(lead.key)
+        if result is None:
+            return False
+        return not (retry_failed and result.status == FAILED)
+
+    def record(self, result: LeadResult) -> None:
+        """Append a result."""
+        self.results[result.key] = result
+        self._file.write(json.dumps(asdict(result)) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class RateLimiter:
+    """Spaces calls out to at most rate per second."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next call is allowed."""
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass(frozen=True)
+class BulkReport:
+    """Totals of one bulk run.
+
+    Attributes:
+        total: Leads in the input
+        duplicates: Input rows repeating an earlier lead
+        skipped: Leads already handled by an earlier run
+        sent: Leads sent to in this run
+        failed: Leads that failed in this run
+        elapsed: Seconds the run took
+    """
+
+    total: int
+    duplicates: int
+    skipped: int
+    sent: int
+    failed: int
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """Leads handled per second."""
+        handled = self.sent + self.failed
+        return handled / self.elapsed if self.elapsed else 0.0
+
+
+type SendFunction = Callable[[dict, str], Awaitable[None]]
+
+
+async def send_bulk_offers(
+    leads: list[Lead],
+    log: ResultLog,
+    render_pool: RenderPool,
+    send: SendFunction | None = None,
+    concurrency: int = DEFAULT_SEND_CONCURRENCY,
+    rate: float = DEFAULT_SEND_RATE,
+    window: int = DEFAULT_WINDOW,
+    retry_failed: bool = False,
+    attempts: int = DEFAULT_SEND_ATTEMPTS,
+    retry_delay: float = 1.0,
+    dry_run: bool = False,
+) -> BulkReport:
+    """Render and send a proposal to every lead not yet in the log.
+
+    PDFs render on the pool while earlier leads are being sent; at most
+    window leads are in progress at once. Each lead's proposal has its own
+    attachment, so each is one send; sends share the transport's pooled
+    connections, with at most concurrency in flight and rate started per
+    second. Duplicate leads in the input are sent once.
+
+    Args:
+        leads: Leads to send to
+        log: Results of this and earlier runs
+        render_pool: Pool that renders the PDFs
+        send: Sends one email, given the request body and idempotency key;
+              defaults to tools.send_offer_email
+        concurrency: Sends in flight at once
+        rate: Sends started per second (0 for no limit)
+        window: Leads rendered or sent at once
+        retry_failed: Also resend leads that failed in an earlier run
+        attempts: Tries per lead for retryable errors (rate limits, server
+                  and network errors)
+        retry_delay: Seconds before the second try; doubles after each
+        dry_run: Render the proposals but send nothing and record nothing,
+                 so a later real run still sends to every lead
+
+    Returns:
+        Totals of this run
+    """
+    send = _dry_run_send if dry_run else send or tools.send_offer_email
+    unique = {lead.key: lead for lead in leads}
+    todo = [lead for lead in unique.values() if not log.is_done(lead, retry_failed)]
+    send_slots = asyncio.Semaphore(concurrency)
+    lead_slots = asyncio.Semaphore(window)
+    limiter = RateLimiter(rate)
+    counts = {SENT: 0, FAILED: 0}
+
+    async def process(lead: Lead) -> None:
+        try:
+            pdf_base64 = await render_pool.run(
+                tools._generate_proposal_pdf,
+                lead.client_name,
+                str(lead.client_email),
+                lead.project_description,
+                lead.services_list,
+                lead.project_scope,
+            )
+            email_data = tools._format_proposal_email(
+                lead.client_name, str(lead.client_email), pdf_base64
+            )
+            for attempt in range(1, attempts + 1):
+                try:
+                    async with send_slots:
+                        await limiter.wait()
+                        await send(email_data, lead.key)
+                    break
+                except DeliveryError as e:
+                    if not e.retryable or attempt == attempts:
+                        raise
+                    await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+            status, detail = SENT, ""
+        except Exception as e:
+            status, detail = FAILED, str(e)
+            logger.warning(f"Offer to {lead.client_email} failed: {e}")
+        finally:
+            lead_slots.release()
+        counts[status] += 1
+        if not dry_run:
+            log.record(
+                LeadResult(
+                    lead.key, str(lead.client_email), status, detail, time.time()
+                )
+            )
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for lead in todo:
+            await lead_slots.acquire()
+            group.create_task(process(lead))
+
+    return BulkReport(
+        total=len(leads),
+        duplicates=len(leads) - len(unique),
+        skipped=len(unique) - len(todo),
+        sent=counts[SENT],
+        failed=counts[FAILED],
+        elapsed=time.perf_counter() - start,
+    )
+
+
+async def _dry_run_send(email_data: dict, idempotency_key: str) -> None:
+    """Send nothing (--dry-run)."""
+
+
+def main() -> None:
+    """Send proposals to the leads in a CSV or JSONL file."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("leads", type=Path, help="Leads file (.csv or .jsonl)")
+    parser.add_argument(
+        "--results",
+        type=Path,
+        help="Per-lead results (JSONL); rerunning with it resumes. "
+        "Default: <leads>.results.jsonl",
+    )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_SEND_CONCURRENCY)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_SEND_RATE,
+        help="Sends per second (0 for no limit)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--executor", choices=("process", "thread"), default="process")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Resend leads that failed"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Render the proposals, send nothing"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    try:
+        leads = load_leads(args.leads)
+        tools.mail_transport = transport_from_env()
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+    missing = tools.mail_transport.missing_config()
+    if missing and not args.dry_run:
+        sys.exit(f"Error: {missing}")
+
+    results_path = args.results or args.leads.with_suffix(".results.jsonl")
+    log = ResultLog(results_path)
+    render_pool = RenderPool(args.executor, workers=args.workers)
+
+    async def run() -> BulkReport:
+        async with app_http_client():
+            return await send_bulk_offers(
+                leads,
+                log,
+                render_pool,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                retry_failed=args.retry_failed,
+                dry_run=args.dry_run,
+            )
+
+    try:
+        report = asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.exit(f"\nInterrupted; rerun to resume from {results_path}")
+    finally:
+        log.close()
+        tools.mail_transport.close()
+        render_pool.shutdown()
+
+    print(
+        f"{report.total} leads: {report.sent} sent, {report.failed} failed, "
+        f"{report.skipped} already done, {report.duplicates} duplicates\n"
+        f"{report.elapsed:.1f}s, {report.throughput:.1f} leads/s\n"
+        f"Results: {results_path}"
+    )
+    if report.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Cross-session cache of knowledge base tool results."""
+
+import functools
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import TypeAdapter
+from pydantic_ai import RunContext
+
+from .models import KnowledgeBase
+
+# Serializes tool returns the same way pydantic-ai does for non-string results
+_tool_return_adapter = TypeAdapter(Any)
+
+_MISSING = object()
+
+
+def _serialize(result: Any) -> str | None:
+    """The tool result as the model receives it.
+
+    Text (and None) is returned as it is, as pydantic-ai passes it on
+    unchanged; anything else is serialized to JSON.
+    """
+    if result is None or isinstance(result, str):
+        return result
+    return _tool_return_adapter.dump_json(result).decode()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache effectiveness counters."""
+
+    hits: int
+    misses: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ToolResultCache:
+    """Bounded LRU cache of serialized tool results.
+
+    Entries are keyed by (tool name, normalized arguments, knowledge base
+    version) and hold the text the model receives, so a hit skips both
+    the lookup and pydantic serialization. Safe to share across sessions and
+    threads.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_entries: Least recently used entries are evicted beyond this
+        """
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], str | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compute(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        kb_version: str,
+        compute: Callable[[], Any],
+    ) -> str | None:
+        """Return the cached serialized result, computing it on a miss.
+
+        Args:
+            tool_name: Name of the tool
+            arguments: Tool arguments, excluding the run context
+            kb_version: Version of the knowledge base the tool reads
+            compute: Runs the tool; called outside the lock on a miss
+
+        Returns:
+            The tool result: text (or None) as returned, anything else as
+            JSON text
+        """
+        key = (tool_name, json.dumps(arguments, sort_keys=True), kb_version)
+        with self._lock:
+            cached = self._entries.get(key, _MISSING)
+            if cached is not _MISSING:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        result = _serialize(compute())
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop all entries, e.g. after the knowledge base reloads."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Current hit/miss counters and size."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                size=len(self._entries),
+                max_entries=self._max_entries,
+            )
+
+
+def cached_tool(
+    cache: ToolResultCache, func: Callable[..., Any]
+) -> Callable[..., str | None]:
+    """Wrap a pure knowledge base tool so its results are served from cache.
+
+    The wrapper keeps the tool's name, signature and docstring, so the agent
+    sees the same tool schema; it returns the serialized result instead
+    (text results are already what the model receives, and are kept as is).
+
+    Args:
+        cache: Cache shared by all wrapped tools
+        func: Tool taking RunContext[KnowledgeBase] as its first argument
+
+    Returns:
+        Wrapped tool function
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(
+        ctx: RunContext[KnowledgeBase], *args: Any, **kwargs: Any
+    ) -> str | None:
+        bound = signature.bind(ctx, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop(next(iter(signature.parameters)))
+
+        kb = ctx.deps
+        if not kb.version:
+            # Unversioned knowledge bases (built in code) can't be keyed safely
+            return _serialize(func(ctx, *args, **kwargs))
+        return cache.get_or_compute(
+            func.__name__, arguments, kb.version, lambda: func(ctx, *args, **kwargs)
+        )
+
+    wrapper.__annotations__ = {**func.__annotations__, "return": str | None}
+    return wrapper
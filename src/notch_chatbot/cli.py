@@ -5,23 +5,60 @@ import sys
 
 from dotenv import load_dotenv
 
+from . import tools
 from .agent import create_notch_agent
-from .knowledge_base import load_knowledge_base
+from .cache import ToolResultCache
+from .dedup import OfferDeduplicator
+from .history import HistoryCompactor, ToolReturnPruner
+from .http_client import close_app_client, open_app_client
+from .mail import transport_from_env
+from .outbox import EmailOutbox, OutboxSender
+from .reload import KnowledgeBaseWatcher
+from .rendering import RenderPool
+from .responses import FirstTurnCache, stream_turn
+from .router import IntentRouter
 
 
 async def async_main() -> None:
     """Async main function for streaming support."""
-    # Load knowledge base
+    # Load knowledge base and reload it in the background when data/ changes
     print("Loading Notch knowledge base...", file=sys.stderr)
-    kb = load_knowledge_base()
+    kb_watcher = KnowledgeBaseWatcher()
+    kb = kb_watcher.current
     print(
         f"Loaded {len(kb.services)} services, {len(kb.case_studies)} case studies, "
         f"and {len(kb.use_cases)} use cases.\n",
         file=sys.stderr,
     )
 
-    # Create agent
-    agent = create_notch_agent(kb)
+    # Create agent; tool results are cached until the knowledge base reloads
+    tool_cache = ToolResultCache()
+    kb_watcher.add_listener(lambda _: tool_cache.clear())
+    # Stale tool results are shrunk and older turns condensed once the
+    # history outgrows its token budget
+    agent = create_notch_agent(
+        kb,
+        tool_cache=tool_cache,
+        history_compactor=HistoryCompactor.from_env(),
+        tool_return_pruner=ToolReturnPruner(),
+    )
+    kb_watcher.start()
+
+    # One pooled HTTP client for all tool I/O (blog, email) in this session
+    await open_app_client()
+    # Proposal PDFs render on workers instead of blocking the loop
+    tools.pdf_render_pool = RenderPool.from_env()
+    tools.offer_deduplicator = OfferDeduplicator.from_env()
+    # Offer emails go out through the mail API or a pooled SMTP relay,
+    # queued and sent in the background, with retries
+    tools.mail_transport = transport_from_env()
+    tools.offer_outbox = OutboxSender(EmailOutbox(), tools.deliver_outbox_message)
+    await tools.offer_outbox.start()
+
+    # Catalogue questions are answered from the knowledge base directly, and
+    # answers to opening questions are kept and replayed to later sessions
+    router = IntentRouter()
+    response_cache = FirstTurnCache.from_env()
 
     # Initialize conversation history
     message_history = []
@@ -54,17 +91,29 @@ async def async_main() -> None:
 
             print("Notch: ", end="", flush=True)
 
-            # Run agent with streaming, passing conversation history
-            async with agent.run_stream(
-                user_input, deps=kb, message_history=message_history
-            ) as response:
-                async for chunk in response.stream_text(delta=True):
-                    print(chunk, end="", flush=True)
+            # Pick up the latest knowledge base; a reload during this turn
+            # only affects the next one
+            kb = kb_watcher.current
+
+            # Run agent with streaming, passing conversation history; a
+            # catalogue question is answered locally and a repeated opening
+            # question replayed from the cache
+            turn_history = []
+            async for chunk in stream_turn(
+                agent,
+                kb,
+                user_input,
+                message_history,
+                turn_history.extend,
+                response_cache,
+                router,
+            ):
+                print(chunk, end="", flush=True)
 
             print()  # Add newline after response
 
-            # Update message history with the new messages from this turn
-            message_history = response.new_messages()
+            # Keep the whole (compacted) conversation for the next turn
+            message_history = turn_history
 
         except KeyboardInterrupt:
             print("\n\nGoodbye!", file=sys.stderr)
@@ -74,6 +123,33 @@ async def async_main() -> None:
             print("Let's try again.\n")
             continue
 
+    router_stats = router.stats()
+    if router_stats.routed:
+        print(
+            f"Answered locally: {router_stats.routed} of "
+            f"{router_stats.routed + router_stats.passed} messages "
+            f"({router_stats.coverage:.0%}), "
+            f"{router_stats.mean_latency * 1000:.2f}ms per message",
+            file=sys.stderr,
+        )
+    cache_stats = response_cache.stats()
+    if cache_stats.hits + cache_stats.misses:
+        print(
+            f"First-turn cache: {cache_stats.hits} hits, {cache_stats.misses} "
+            f"misses ({cache_stats.hit_rate:.0%}), "
+            f"{cache_stats.seconds_saved:.1f}s of model time saved",
+            file=sys.stderr,
+        )
+    response_cache.close()
+
+    # Send what is already due before the HTTP client goes away
+    await tools.offer_outbox.stop()
+    tools.offer_outbox.outbox.close()
+    await close_app_client()
+    tools.mail_transport.close()
+    tools.pdf_render_pool.shutdown()
+    kb_watcher.stop()
+
 
 def main() -> None:
     """Run the Notch chatbot CLI."""
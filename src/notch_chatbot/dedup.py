@@ -0,0 +1,101 @@
+"""Deduplication of repeated offer requests."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEDUP_WINDOW = 60 * 60
+
+
+def offer_key(
+    client_email: str, project_description: str, services_list: str, project_scope: str
+) -> str:
+    """Identify an offer by its recipient and content.
+
+    Case and whitespace differences don't make a different offer, so a
+    model rephrasing nothing but spacing still hits the same key. The
+    client name is left out: a retry that spells it differently is still
+    the same offer to the same inbox.
+    """
+    content = "\x1f".join(
+        " ".join(text.split()).casefold()
+        for text in (project_description, services_list, project_scope)
+    )
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return f"{client_email.strip().casefold()}:{digest}"
+
+
+class OfferDeduplicator:
+    """Returns the earlier result for an offer repeated within a window.
+
+    The model sometimes calls the offer tool twice in a conversation, or
+    again after a retry. Within the window, a repeat gets the first call's
+    result without rendering or sending anything; a repeat made while the
+    first call is still running waits for it and shares its result. Only
+    successful results are kept, so a failed offer can be tried again.
+    """
+
+    def __init__(self, window: float = DEFAULT_DEDUP_WINDOW) -> None:
+        """Create an empty deduplicator.
+
+        Args:
+            window: Seconds a successful result is reused for
+        """
+        self.window = window
+        self.hits = 0
+        self._results: dict[str, tuple[str, float]] = {}
+        self._in_flight: dict[str, asyncio.Future[tuple[str, bool]]] = {}
+
+    @classmethod
+    def from_env(cls) -> "OfferDeduplicator":
+        """Build a deduplicator with the window from NOTCH_OFFER_DEDUP_WINDOW."""
+        return cls(float(os.getenv("NOTCH_OFFER_DEDUP_WINDOW", DEFAULT_DEDUP_WINDOW)))
+
+    async def run(
+        self,
+        key: str,
+        create: Callable[[], Awaitable[tuple[str, bool]]],
+    ) -> str:
+        """Return the result for key, calling create only if there is none.
+
+        Args:
+            key: Offer identity, from offer_key()
+            create: Renders and sends the offer, returning the tool result
+                    and whether it succeeded (only successes are reused)
+
+        Returns:
+            The tool result
+        """
+        self._forget_expired()
+        if key in self._results:
+            self.hits += 1
+            logger.info(f"Offer already handled, returning its result ({key})")
+            return self._results[key][0]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight.get_loop() is asyncio.get_running_loop():
+            self.hits += 1
+            logger.info(f"Offer already in progress, waiting for it ({key})")
+            result, _ = await asyncio.shield(in_flight)
+            return result
+
+        future = asyncio.ensure_future(create())
+        self._in_flight[key] = future
+        try:
+            result, succeeded = await asyncio.shield(future)
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if succeeded:
+            self._results[key] = (result, time.monotonic())
+        return result
+
+    def _forget_expired(self) -> None:
+        cutoff = time.monotonic() - self.window
+        for key in [k for k, (_, at) in self._results.items() if at <= cutoff]:
+            del self._results[key]
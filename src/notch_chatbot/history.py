@@ -0,0 +1,370 @@
+"""Conversation history processors that keep prompts small."""
+
+import dataclasses
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Marks the system prompt part that carries the rolling summary
+SUMMARY_HEADER = "Summary of the earlier conversation (older turns condensed):"
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_KEEP_RECENT_TURNS = 4
+
+# Per-line truncation when folding a turn into the summary
+_SUMMARY_USER_CHARS = 200
+_SUMMARY_ASSISTANT_CHARS = 300
+
+# Marks tool return payloads replaced by a short reference
+PRUNED_MARKER = "[Pruned tool result]"
+
+DEFAULT_PRUNE_MIN_TOKENS = 200
+DEFAULT_PRUNE_KEEP_RECENT_TURNS = 2
+
+# Record IDs listed in a pruned reference, so details can be fetched again
+_PRUNED_MAX_IDS = 20
+
+
+def part_text(part: object) -> str:
+    """Text a message part contributes to the prompt."""
+    if isinstance(part, SystemPromptPart | TextPart):
+        return part.content
+    if isinstance(part, UserPromptPart):
+        return part.content if isinstance(part.content, str) else str(part.content)
+    if isinstance(part, ToolCallPart):
+        return f"{part.tool_name} {part.args_as_json_str()}"
+    if isinstance(part, ToolReturnPart):
+        return part.model_response_str()
+    if isinstance(part, RetryPromptPart):
+        return part.model_response()
+    return ""
+
+
+def conversation_tokens(messages: list[ModelMessage]) -> int:
+    """Estimated tokens of the conversation, excluding system prompt parts.
+
+    The system prompt is a fixed cost per request; only the conversation
+    grows, so that is what the budget applies to.
+    """
+    return sum(
+        estimate_tokens(part_text(part))
+        for message in messages
+        for part in message.parts
+        if not isinstance(part, SystemPromptPart)
+    )
+
+
+def split_turns(messages: list[ModelMessage]) -> list[list[ModelMessage]]:
+    """Group messages into turns, each starting at a user prompt.
+
+    Tool calls and their returns always stay inside the turn that made them,
+    so dropping whole turns never orphans a tool return.
+    """
+    turns: list[list[ModelMessage]] = []
+    for message in messages:
+        starts_turn = isinstance(message, ModelRequest) and any(
+            isinstance(part, UserPromptPart) for part in message.parts
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def _summarize_turn(turn: list[ModelMessage]) -> list[str]:
+    """Condense one turn into short "User:" / "Assistant:" lines."""
+    lines = []
+    tools_used: list[str] = []
+    reply = ""
+    for message in turn:
+        for part in message.parts:
+            if isinstance(part, UserPromptPart):
+                lines.append(f"User: {_truncate(part_text(part), _SUMMARY_USER_CHARS)}")
+            elif isinstance(part, ToolCallPart):
+                tools_used.append(part.tool_name)
+            elif isinstance(part, TextPart) and isinstance(message, ModelResponse):
+                reply = part.content
+    if tools_used:
+        lines.append(f"(Looked up: {', '.join(dict.fromkeys(tools_used))})")
+    if reply:
+        lines.append(f"Assistant: {_truncate(reply, _SUMMARY_ASSISTANT_CHARS)}")
+    return lines
+
+
+@dataclass(frozen=True)
+class CompactionStats:
+    """Totals reported by a history processor."""
+
+    compactions: int
+    tokens_saved: int
+    last_tokens_saved: int
+
+
+class _StatsRecorder:
+    """Thread-safe counters shared by the history processors."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._compactions = 0
+        self._tokens_saved = 0
+        self._last_tokens_saved = 0
+
+    def _record(self, saved: int) -> None:
+        with self._lock:
+            self._compactions += 1
+            self._tokens_saved += saved
+            self._last_tokens_saved = saved
+
+    def stats(self) -> CompactionStats:
+        """How many times the history was rewritten and the tokens saved."""
+        with self._lock:
+            return CompactionStats(
+                compactions=self._compactions,
+                tokens_saved=self._tokens_saved,
+                last_tokens_saved=self._last_tokens_saved,
+            )
+
+
+class HistoryCompactor(_StatsRecorder):
+    """History processor that keeps the conversation under a token budget.
+
+    When the conversation outgrows the budget, the most recent turns are kept
+    verbatim and older ones are folded into a rolling summary, stored as a
+    system prompt part after the original system prompt. The summary itself
+    is capped, dropping its oldest lines first.
+
+    Register it with `Agent(history_processors=[...])`; pydantic-ai stores the
+    processed history, so callers should keep `result.all_messages()`.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+    ) -> None:
+        """Configure the compactor.
+
+        Args:
+            token_budget: Target size of the conversation (excluding the
+                          system prompt) in estimated tokens
+            keep_recent_turns: Turns kept verbatim, including the current one
+        """
+        super().__init__()
+        self.token_budget = token_budget
+        self.keep_recent_turns = max(1, keep_recent_turns)
+
+    @classmethod
+    def from_env(cls) -> "HistoryCompactor":
+        """Build a compactor configured by NOTCH_HISTORY_TOKEN_BUDGET and
+        NOTCH_HISTORY_KEEP_TURNS, falling back to the defaults."""
+        return cls(
+            token_budget=int(
+                os.getenv("NOTCH_HISTORY_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)
+            ),
+            keep_recent_turns=int(
+                os.getenv("NOTCH_HISTORY_KEEP_TURNS", DEFAULT_KEEP_RECENT_TURNS)
+            ),
+        )
+
+    def __call__(self, messages: list[ModelMessage]) -> list[ModelMessage]:
+        """Compact the history if it is over budget."""
+        before = conversation_tokens(messages)
+        if before <= self.token_budget:
+            return messages
+
+        turns = split_turns(messages)
+        if len(turns) <= 1:
+            # Nothing older than the current turn to fold away
+            return messages
+
+        system_parts, summary_lines = self._split_system_parts(turns[0][0])
+
+        # Keep as many recent turns as fit in three quarters of the budget
+        # (the rest is for the summary), but always the current one
+        keep = min(self.keep_recent_turns, len(turns) - 1)
+        while (
+            keep > 1
+            and conversation_tokens([m for turn in turns[-keep:] for m in turn])
+            > self.token_budget * 3 // 4
+        ):
+            keep -= 1
+
+        for turn in turns[:-keep]:
+            summary_lines.extend(_summarize_turn(turn))
+
+        # Roll the summary: oldest lines go first once it outgrows its share
+        summary_budget = self.token_budget // 4
+        while summary_lines and (
+            estimate_tokens("\n".join(summary_lines)) > summary_budget
+        ):
+            summary_lines.pop(0)
+
+        compacted = self._rebuild(turns[-keep:], system_parts, summary_lines)
+        after = conversation_tokens(compacted)
+        saved = before - after
+        self._record(saved)
+        logger.info(
+            f"Compacted conversation history: {before} -> {after} tokens "
+            f"(saved {saved}, folded {len(turns) - keep} turns)"
+        )
+        return compacted
+
+    @staticmethod
+    def _split_system_parts(
+        first_message: ModelMessage,
+    ) -> tuple[list[SystemPromptPart], list[str]]:
+        """Separate the original system prompt from a previous summary."""
+        system_parts = []
+        summary_lines: list[str] = []
+        for part in first_message.parts:
+            if not isinstance(part, SystemPromptPart):
+                continue
+            if part.content.startswith(SUMMARY_HEADER):
+                summary_lines = part.content.removeprefix(SUMMARY_HEADER).split("\n")
+                summary_lines = [line for line in summary_lines if line]
+            else:
+                system_parts.append(part)
+        return system_parts, summary_lines
+
+    @staticmethod
+    def _rebuild(
+        kept_turns: list[list[ModelMessage]],
+        system_parts: list[SystemPromptPart],
+        summary_lines: list[str],
+    ) -> list[ModelMessage]:
+        """Prefix the kept turns with the system prompt and summary."""
+        messages = [m for turn in kept_turns for m in turn]
+        first = messages[0]
+        prefix: list = list(system_parts)
+        if summary_lines:
+            prefix.append(SystemPromptPart("\n".join([SUMMARY_HEADER, *summary_lines])))
+        body = [p for p in first.parts if not isinstance(p, SystemPromptPart)]
+        messages[0] = ModelRequest(parts=[*prefix, *body])
+        return messages
+
+
+def _record_ids(payload: str) -> list[str]:
+    """IDs of the records in a serialized tool result, if it has any."""
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return []
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        return []
+    return [str(item["id"]) for item in data if isinstance(item, dict) and "id" in item]
+
+
+def _reference(part: ToolReturnPart, payload: str, duplicate: bool) -> str:
+    """Short stand-in for a pruned tool return payload."""
+    if duplicate:
+        return (
+            f"{PRUNED_MARKER} Same {part.tool_name} result as returned later "
+            "in this conversation."
+        )
+    reference = f"{PRUNED_MARKER} Earlier {part.tool_name} result omitted"
+    ids = _record_ids(payload)
+    if ids:
+        shown = ", ".join(ids[:_PRUNED_MAX_IDS])
+        more = (
+            f" and {len(ids) - _PRUNED_MAX_IDS} more"
+            if len(ids) > _PRUNED_MAX_IDS
+            else ""
+        )
+        reference += f"; it covered {len(ids)} records: {shown}{more}"
+    return reference + ". Call the tool again if its details are needed."
+
+
+class ToolReturnPruner(_StatsRecorder):
+    """History processor that shrinks stale tool return payloads.
+
+    In turns older than the most recent ones, a tool result that is repeated
+    later in the conversation is replaced by a pointer to the later copy,
+    and any other large result is replaced by a short reference naming the
+    tool and the IDs of the records it returned. Tool call IDs are kept, so
+    every call still has its return. The assistant replies of those turns
+    are untouched, which is where the facts the model used were stated.
+    """
+
+    def __init__(
+        self,
+        min_tokens: int = DEFAULT_PRUNE_MIN_TOKENS,
+        keep_recent_turns: int = DEFAULT_PRUNE_KEEP_RECENT_TURNS,
+    ) -> None:
+        """Configure the pruner.
+
+        Args:
+            min_tokens: Results smaller than this are kept unless duplicated
+            keep_recent_turns: Turns left intact, including the current one
+        """
+        super().__init__()
+        self.min_tokens = min_tokens
+        self.keep_recent_turns = max(1, keep_recent_turns)
+
+    def __call__(self, messages: list[ModelMessage]) -> list[ModelMessage]:
+        """Replace stale tool return payloads with short references."""
+        turns = split_turns(messages)
+        if len(turns) <= self.keep_recent_turns:
+            return messages
+        stale_count = sum(len(turn) for turn in turns[: -self.keep_recent_turns])
+
+        # Walk newest to oldest so the latest copy of a result is the one kept
+        seen: set[tuple[str, str]] = set()
+        pruned = list(messages)
+        saved = 0
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if not isinstance(message, ModelRequest):
+                continue
+            parts = list(message.parts)
+            for part_index, part in enumerate(parts):
+                if not isinstance(part, ToolReturnPart):
+                    continue
+                payload = part.model_response_str()
+                if payload.startswith(PRUNED_MARKER):
+                    continue
+                key = (part.tool_name, payload)
+                duplicate = key in seen
+                seen.add(key)
+                if index >= stale_count:
+                    continue
+                if not duplicate and estimate_tokens(payload) < self.min_tokens:
+                    continue
+                reference = _reference(part, payload, duplicate)
+                part_saved = estimate_tokens(payload) - estimate_tokens(reference)
+                if part_saved <= 0:
+                    continue
+                parts[part_index] = dataclasses.replace(part, content=reference)
+                saved += part_saved
+            if parts != message.parts:
+                pruned[index] = dataclasses.replace(message, parts=parts)
+
+        if not saved:
+            return messages
+        self._record(saved)
+        logger.info(f"Pruned stale tool results from history (saved {saved} tokens)")
+        return pruned
@@ -0,0 +1,189 @@
+"""Shared HTTP client plumbing."""
+
+import asyncio
+import importlib.util
+import logging
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Pool for outbound tool I/O (blog, email API)
+TOOL_CLIENT_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0
+)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Requests to these hosts always use the given timeout
+HOST_TIMEOUTS: dict[str, httpx.Timeout] = {
+    "www.wearenotch.com": httpx.Timeout(10.0, connect=5.0),
+    "api.sendgrid.com": httpx.Timeout(30.0, connect=5.0),
+}
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Application-scoped client and the event loop it belongs to
+_app_client: httpx.AsyncClient | None = None
+_app_loop: asyncio.AbstractEventLoop | None = None
+
+# Bounds on reading the rest of a response the caller stopped reading early
+DEFAULT_MAX_DRAIN_BYTES = 64 * 1024
+DEFAULT_DRAIN_TIMEOUT = 1.0
+
+
+class _DrainingStream(httpx.AsyncByteStream):
+    """Response body that finishes reading itself before it is closed."""
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, max_bytes: int, timeout: float
+    ) -> None:
+        self._stream = stream
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            drained = 0
+            async with asyncio.timeout(self._timeout):
+                async for chunk in self._stream:
+                    drained += len(chunk)
+                    if drained > self._max_bytes:
+                        break
+        except Exception as e:
+            logger.debug(f"Gave up draining response body: {e!r}")
+        finally:
+            await self._stream.aclose()
+
+
+class DrainingTransport(httpx.AsyncBaseTransport):
+    """Transport that lets early-closed responses keep their connection.
+
+    The OpenAI SDK stops reading a streamed completion at the `[DONE]` event
+    and closes the response before the HTTP layer has seen the end of the
+    body, so the connection is discarded instead of going back to the pool.
+    Draining the (normally empty) remainder on close keeps it reusable; a
+    response with more than a little left is still closed as before.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_drain_bytes: int = DEFAULT_MAX_DRAIN_BYTES,
+        drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
+    ) -> None:
+        """Wrap a transport.
+
+        Args:
+            transport: Transport doing the actual I/O (default pooled HTTP)
+            max_drain_bytes: Close without reuse past this many unread bytes
+            drain_timeout: Close without reuse if draining takes longer
+        """
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._max_drain_bytes = max_drain_bytes
+        self._drain_timeout = drain_timeout
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        response.stream = _DrainingStream(
+            response.stream, self._max_drain_bytes, self._drain_timeout
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_tool_client(
+    host_timeouts: Mapping[str, httpx.Timeout] | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Create the pooled client used for outbound tool I/O.
+
+    Connections are kept alive and reused, HTTP/2 is negotiated when h2 is
+    installed, and requests get a timeout by host.
+
+    Args:
+        host_timeouts: Timeout by host name; defaults to HOST_TIMEOUTS
+        transport: Transport override (mainly for tests)
+
+    Returns:
+        Client to open with open_app_client() or use directly
+    """
+    timeouts = dict(HOST_TIMEOUTS if host_timeouts is None else host_timeouts)
+
+    async def apply_host_timeout(request: httpx.Request) -> None:
+        timeout = timeouts.get(request.url.host)
+        if timeout is not None:
+            request.extensions["timeout"] = timeout.as_dict()
+
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            limits=TOOL_CLIENT_LIMITS, http2=HTTP2_AVAILABLE
+        )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=DEFAULT_TIMEOUT,
+        event_hooks={"request": [apply_host_timeout]},
+    )
+
+
+async def open_app_client(client: httpx.AsyncClient | None = None) -> httpx.AsyncClient:
+    """Make client the application-scoped client for the running event loop.
+
+    Entry points call this once at startup, on the loop that runs the agent,
+    and close_app_client() at shutdown.
+
+    Args:
+        client: Client to share; defaults to create_tool_client()
+
+    Returns:
+        The shared client
+    """
+    global _app_client, _app_loop
+    if _app_client is not None:
+        await close_app_client()
+    _app_client = client or create_tool_client()
+    _app_loop = asyncio.get_running_loop()
+    return _app_client
+
+
+async def close_app_client() -> None:
+    """Close the application-scoped client, if one is open."""
+    global _app_client, _app_loop
+    client, _app_client, _app_loop = _app_client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def app_http_client(
+    client: httpx.AsyncClient | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Open the application-scoped client for the duration of the block."""
+    try:
+        yield await open_app_client(client)
+    finally:
+        await close_app_client()
+
+
+@asynccontextmanager
+async def tool_http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Client for one tool call.
+
+    Yields the application-scoped client when one is open on the running
+    loop. Otherwise (scripts, tests, another loop) a short-lived client is
+    created and closed after the call, as before.
+    """
+    client = _app_client
+    if client is not None and _app_loop is asyncio.get_running_loop():
+        yield client
+        return
+    async with create_tool_client() as client:
+        yield client
@@ -1,17 +1,106 @@
 """Knowledge base loader for Notch chatbot."""
 
+import hashlib
 import json
+import logging
+import os
+import pickle
+import zlib
 from pathlib import Path
 
+from . import models, search
 from .models import CaseStudy, KnowledgeBase, Service, UseCase
 
+logger = logging.getLogger(__name__)
 
-def load_knowledge_base(data_dir: Path | str | None = None) -> KnowledgeBase:
+# Default data directory in project root
+DEFAULT_DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Snapshot of the validated knowledge base, written next to the data files
+SNAPSHOT_FILENAME = ".kb_snapshot.bin"
+_SNAPSHOT_MAGIC = b"NOTCHKB1"
+
+
+def _read_data_files(data_dir: Path) -> dict[str, bytes]:
+    """Read the raw bytes of every JSON file in the data directory."""
+    return {path.name: path.read_bytes() for path in sorted(data_dir.glob("*.json"))}
+
+
+def data_fingerprint(data_files: dict[str, bytes]) -> str:
+    """Hash the contents of the data files.
+
+    Args:
+        data_files: File name to raw contents, as read from the data directory
+
+    Returns:
+        Hex digest that changes whenever any data file changes
+    """
+    digest = hashlib.sha256()
+    for name, content in sorted(data_files.items()):
+        digest.update(name.encode("utf-8"))
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def _parse(data_files: dict[str, bytes], data_dir: Path, name: str):
+    """Parse one of the required JSON data files."""
+    if name not in data_files:
+        raise FileNotFoundError(f"Data file not found: {data_dir / name}")
+    return json.loads(data_files[name])
+
+
+def _snapshot_key(fingerprint: str) -> bytes:
+    """Key a snapshot by the data and by the code that shapes its indexes."""
+    digest = hashlib.sha256(fingerprint.encode("ascii"))
+    for module in (models, search):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.digest()
+
+
+def _read_snapshot(path: Path, key: bytes) -> KnowledgeBase | None:
+    """Return the snapshot at path if it matches key, else None."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+
+    header = _SNAPSHOT_MAGIC + key
+    if not raw.startswith(header):
+        return None
+
+    try:
+        kb = pickle.loads(zlib.decompress(raw[len(header) :]))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable knowledge base snapshot {path}: {e}")
+        return None
+    return kb if isinstance(kb, KnowledgeBase) else None
+
+
+def _write_snapshot(path: Path, key: bytes, kb: KnowledgeBase) -> None:
+    """Atomically write the snapshot; failures only cost the next startup."""
+    payload = zlib.compress(pickle.dumps(kb, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(_SNAPSHOT_MAGIC + key + payload)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write knowledge base snapshot {path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_knowledge_base(
+    data_dir: Path | str | None = None, use_snapshot: bool = True
+) -> KnowledgeBase:
     """Load knowledge base from JSON files.
 
+    When use_snapshot is set, the validated knowledge base and its search
+    indexes are cached in a binary snapshot next to the data files. Later
+    loads reuse it without re-validating, as long as no JSON file changed.
+
     Args:
         data_dir: Directory containing JSON data files.
                   Defaults to 'data' directory in project root.
+        use_snapshot: Read and write the snapshot cache.
 
     Returns:
         Loaded KnowledgeBase instance.
@@ -20,41 +109,37 @@ def load_knowledge_base(data_dir: Path | str | None = None) -> KnowledgeBase:
         FileNotFoundError: If data directory or required files don't exist.
         json.JSONDecodeError: If JSON files are invalid.
     """
-    if data_dir is None:
-        # Default to data directory in project root
-        data_dir = Path(__file__).parent.parent.parent / "data"
-    else:
-        data_dir = Path(data_dir)
+    data_dir = DEFAULT_DATA_DIR if data_dir is None else Path(data_dir)
 
     if not data_dir.exists():
         raise FileNotFoundError(f"Data directory not found: {data_dir}")
 
-    # Load services
-    services_file = data_dir / "services.json"
-    with open(services_file, encoding="utf-8") as f:
-        services_data = json.load(f)
-        services = [Service(**s) for s in services_data]
-
-    # Load case studies
-    case_studies_file = data_dir / "case_studies.json"
-    with open(case_studies_file, encoding="utf-8") as f:
-        case_studies_data = json.load(f)
-        case_studies = [CaseStudy(**cs) for cs in case_studies_data]
-
-    # Load use cases
-    use_cases_file = data_dir / "use_cases.json"
-    with open(use_cases_file, encoding="utf-8") as f:
-        use_cases_data = json.load(f)
-        use_cases = [UseCase(**uc) for uc in use_cases_data]
-
-    # Load expertise domains
-    expertise_file = data_dir / "expertise.json"
-    with open(expertise_file, encoding="utf-8") as f:
-        expertise_domains = json.load(f)
-
-    return KnowledgeBase(
+    # Read every file once; the same bytes are hashed and parsed
+    data_files = _read_data_files(data_dir)
+    fingerprint = data_fingerprint(data_files)
+    snapshot_path = data_dir / SNAPSHOT_FILENAME
+    if use_snapshot:
+        snapshot_key = _snapshot_key(fingerprint)
+        kb = _read_snapshot(snapshot_path, snapshot_key)
+        if kb is not None:
+            return kb
+
+    services = [Service(**s) for s in _parse(data_files, data_dir, "services.json")]
+    case_studies = [
+        CaseStudy(**cs) for cs in _parse(data_files, data_dir, "case_studies.json")
+    ]
+    use_cases = [UseCase(**uc) for uc in _parse(data_files, data_dir, "use_cases.json")]
+    expertise_domains = _parse(data_files, data_dir, "expertise.json")
+
+    kb = KnowledgeBase(
         services=services,
         case_studies=case_studies,
         use_cases=use_cases,
         expertise_domains=expertise_domains,
+        version=fingerprint,
     )
+
+    if use_snapshot:
+        _write_snapshot(snapshot_path, snapshot_key, kb)
+
+    return kb
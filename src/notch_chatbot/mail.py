@@ -0,0 +1,388 @@
+"""Email transports: the HTTP mail API and a pooled SMTP relay."""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import smtplib
+import ssl
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+
+import httpx
+
+from .http_client import tool_http_client
+from .outbox import DeliveryError
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_API_URL = "https://api.sendgrid.com/v3/mail/send"
+
+TRANSPORT_KINDS = ("api", "smtp")
+SMTP_TLS_MODES = ("starttls", "ssl", "none")
+DEFAULT_SMTP_PORT = 587
+DEFAULT_SMTP_POOL_SIZE = 2
+# Idle connections older than this are replaced rather than reused; relays
+# commonly drop idle sessions after a minute or more
+DEFAULT_SMTP_IDLE_TIMEOUT = 30.0
+DEFAULT_SMTP_TIMEOUT = 30.0
+
+
+class EmailTransport(ABC):
+    """Delivers emails given as mail API request bodies.
+
+    Emails are built once, in the mail API's JSON shape (see
+    tools._format_proposal_email), and stored that way in the outbox; each
+    transport turns that into whatever its backend takes.
+    """
+
+    name: str
+
+    def missing_config(self) -> str | None:
+        """Why the transport can't send right now, or None if it can."""
+        return None
+
+    @abstractmethod
+    async def send(self, email_data: dict, idempotency_key: str | None = None) -> None:
+        """Send one email.
+
+        Args:
+            email_data: Mail API request body
+            idempotency_key: Identifies the email across retries
+
+        Raises:
+            DeliveryError: If the email was not accepted; rate limits, server
+                           errors and network failures are retryable
+        """
+
+    def close(self) -> None:
+        """Release pooled connections; the transport reconnects if used again."""
+        return None
+
+
+class MailApiTransport(EmailTransport):
+    """Sends through the HTTP mail API on the shared pooled HTTP client.
+
+    The API key is read from SENDGRID_API_KEY on every send, so it can be
+    configured after the transport is created.
+    """
+
+    name = "SendGrid"
+
+    def __init__(self, url: str = SENDGRID_API_URL) -> None:
+        """Configure the endpoint.
+
+        Args:
+            url: Mail send endpoint
+        """
+        self.url = url
+
+    def missing_config(self) -> str | None:
+        if os.getenv("SENDGRID_API_KEY"):
+            return None
+        return (
+            "SENDGRID_API_KEY not configured. Please set up SendGrid API key "
+            "in environment variables. Get one at https://sendgrid.com "
+            "(free tier: 100 emails/day)"
+        )
+
+    async def send(self, email_data: dict, idempotency_key: str | None = None) -> None:
+        api_key = os.getenv("SENDGRID_API_KEY")
+        if not api_key:
+            raise DeliveryError("SENDGRID_API_KEY not configured")
+
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        # Best effort: SendGrid doesn't document this header, and the outbox
+        # doesn't rely on it to avoid sending twice
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        try:
+            async with tool_http_client() as client:
+                response = await client.post(self.url, json=email_data, headers=headers)
+        except httpx.HTTPError as e:
+            raise DeliveryError(f"Network error: {e!r}") from e
+        if response.status_code == 202:
+            return
+        retryable = response.status_code == 429 or response.status_code >= 500
+        raise DeliveryError(
+            f"SendGrid status {response.status_code}: {response.text}", retryable
+        )
+
+
+def build_messages(
+    email_data: dict, idempotency_key: str | None = None
+) -> list[tuple[EmailMessage, list[str]]]:
+    """Turn a mail API request body into MIME messages for SMTP.
+
+    Each personalization becomes its own message, as the mail API would
+    send it. With an idempotency key the Message-ID is derived from it, so
+    every attempt at the same email carries the same Message-ID.
+
+    Returns:
+        (message, envelope recipients) pairs; Bcc recipients are only in
+        the envelope
+    """
+    sender = email_data["from"]
+    domain = sender["email"].rpartition("@")[2]
+    first_content, *alternatives = email_data.get("content") or [None]
+
+    messages = []
+    for number, personalization in enumerate(email_data["personalizations"]):
+        message = EmailMessage()
+        message["From"] = _address(sender)
+        message["To"] = ", ".join(_address(to) for to in personalization["to"])
+        if personalization.get("cc"):
+            message["Cc"] = ", ".join(_address(cc) for cc in personalization["cc"])
+        message["Subject"] = personalization.get(
+            "subject", email_data.get("subject", "")
+        )
+        if idempotency_key:
+            digest = hashlib.sha256(f"{idempotency_key}/{number}".encode()).hexdigest()
+            message["Message-ID"] = f"<{digest[:32]}@{domain}>"
+        else:
+            message["Message-ID"] = make_msgid(domain=domain)
+
+        if first_content is not None:
+            message.set_content(
+                first_content["value"], subtype=first_content["type"].split("/")[1]
+            )
+        for content in alternatives:
+            message.add_alternative(
+                content["value"], subtype=content["type"].split("/")[1]
+            )
+        for attachment in email_data.get("attachments", []):
+            maintype, subtype = attachment["type"].split("/")
+            message.add_attachment(
+                base64.b64decode(attachment["content"]),
+                maintype=maintype,
+                subtype=subtype,
+                filename=attachment["filename"],
+            )
+
+        recipients = [
+            address["email"]
+            for field in ("to", "cc", "bcc")
+            for address in personalization.get(field, [])
+        ]
+        messages.append((message, recipients))
+    return messages
+
+
+def _address(address: dict) -> str:
+    return formataddr((address.get("name", ""), address["email"]))
+
+
+class SMTPTransport(EmailTransport):
+    """Sends through an SMTP relay over a pool of persistent sessions.
+
+    Connecting to a relay costs a TCP and TLS handshake, EHLO and AUTH
+    before the first message. Sessions are kept open after a send and
+    reused by the next one, so a burst of offers pays that once per pooled
+    connection rather than once per email. Sends run on a small thread pool
+    (smtplib blocks), one session per thread at most; a session idle for
+    longer than idle_timeout is replaced, and one the relay dropped is
+    reconnected once before the send fails.
+    """
+
+    name = "SMTP"
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_SMTP_PORT,
+        username: str | None = None,
+        password: str | None = None,
+        tls: str = "starttls",
+        pool_size: int = DEFAULT_SMTP_POOL_SIZE,
+        idle_timeout: float = DEFAULT_SMTP_IDLE_TIMEOUT,
+        timeout: float = DEFAULT_SMTP_TIMEOUT,
+    ) -> None:
+        """Configure the relay; sessions open on first use.
+
+        Args:
+            host: Relay host name
+            port: Relay port (587 for STARTTLS, 465 for implicit TLS)
+            username: Login user, or None to send without AUTH
+            password: Login password
+            tls: "starttls", "ssl" (implicit TLS) or "none"
+            pool_size: Sessions (and concurrent sends) at most
+            idle_timeout: Seconds an idle session is reused for
+            timeout: Socket timeout in seconds
+
+        Raises:
+            ValueError: If tls is not a known mode
+        """
+        if tls not in SMTP_TLS_MODES:
+            raise ValueError(
+                f"Unknown SMTP TLS mode {tls!r}, expected one of {SMTP_TLS_MODES}"
+            )
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.tls = tls
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: list[tuple[smtplib.SMTP, float]] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SMTPTransport":
+        """Build a transport from the NOTCH_SMTP_* environment variables.
+
+        Raises:
+            ValueError: If NOTCH_SMTP_HOST is not set or a value is invalid
+        """
+        host = os.getenv("NOTCH_SMTP_HOST")
+        if not host:
+            raise ValueError("NOTCH_SMTP_HOST is required for the SMTP transport")
+        return cls(
+            host,
+            port=int(os.getenv("NOTCH_SMTP_PORT", DEFAULT_SMTP_PORT)),
+            username=os.getenv("NOTCH_SMTP_USERNAME") or None,
+            password=os.getenv("NOTCH_SMTP_PASSWORD") or None,
+            tls=os.getenv("NOTCH_SMTP_TLS", "starttls"),
+            pool_size=int(os.getenv("NOTCH_SMTP_POOL_SIZE", DEFAULT_SMTP_POOL_SIZE)),
+        )
+
+    async def send(self, email_data: dict, idempotency_key: str | None = None) -> None:
+        messages = build_messages(email_data, idempotency_key)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._send_blocking, messages)
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            _quit(connection)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.pool_size, thread_name_prefix="smtp"
+                )
+            return self._executor
+
+    def _send_blocking(self, messages: list[tuple[EmailMessage, list[str]]]) -> None:
+        connection, reused = self._checkout()
+        try:
+            for message, recipients in messages:
+                try:
+                    refused = connection.send_message(message, to_addrs=recipients)
+                except smtplib.SMTPServerDisconnected:
+                    if not reused:
+                        raise
+                    # The relay closed the idle session; nothing was sent on it
+                    logger.info(f"SMTP session to {self.host} dropped, reconnecting")
+                    connection, reused = self._connect(), False
+                    refused = connection.send_message(message, to_addrs=recipients)
+                if refused:
+                    # The others got it, so a retry would send it to them twice
+                    logger.warning(f"SMTP relay refused some recipients: {refused}")
+        except smtplib.SMTPRecipientsRefused as e:
+            _quit(connection)
+            codes = [code for code, _ in e.recipients.values()]
+            raise DeliveryError(
+                f"SMTP recipients refused: {e.recipients}",
+                retryable=all(400 <= code < 500 for code in codes),
+            ) from e
+        except smtplib.SMTPResponseException as e:
+            _quit(connection)
+            raise DeliveryError(
+                f"SMTP status {e.smtp_code}: {e.smtp_error!r}",
+                retryable=400 <= e.smtp_code < 500,
+            ) from e
+        except OSError as e:
+            _quit(connection)
+            raise DeliveryError(f"SMTP network error: {e!r}") from e
+        self._checkin(connection)
+
+    def _checkout(self) -> tuple[smtplib.SMTP, bool]:
+        """Take the most recently used idle session, or open a new one."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, idle_since = self._idle.pop()
+            if time.monotonic() - idle_since < self.idle_timeout:
+                return connection, True
+            _quit(connection)
+        try:
+            return self._connect(), False
+        except smtplib.SMTPResponseException as e:
+            raise DeliveryError(
+                f"SMTP status {e.smtp_code}: {e.smtp_error!r}",
+                retryable=400 <= e.smtp_code < 500,
+            ) from e
+        except OSError as e:
+            raise DeliveryError(f"SMTP network error: {e!r}") from e
+
+    def _checkin(self, connection: smtplib.SMTP) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._idle.append((connection, time.monotonic()))
+                return
+        # Closed while sending
+        _quit(connection)
+
+    def _connect(self) -> smtplib.SMTP:
+        context = ssl.create_default_context()
+        if self.tls == "ssl":
+            connection = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=context
+            )
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.ehlo()
+            if self.tls == "starttls":
+                connection.starttls(context=context)
+                connection.ehlo()
+            if self.username:
+                connection.login(self.username, self.password or "")
+        except BaseException:
+            _quit(connection)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        logger.info(f"Opened SMTP session to {self.host}:{self.port}")
+        return connection
+
+
+def _quit(connection: smtplib.SMTP) -> None:
+    try:
+        connection.quit()
+    except (OSError, smtplib.SMTPException):
+        connection.close()
+
+
+def transport_from_env() -> EmailTransport:
+    """Build the transport named by NOTCH_MAIL_TRANSPORT ("api" or "smtp").
+
+    Raises:
+        ValueError: If the transport is unknown or misconfigured
+    """
+    kind = os.getenv("NOTCH_MAIL_TRANSPORT", "api")
+    if kind == "smtp":
+        return SMTPTransport.from_env()
+    if kind == "api":
+        return MailApiTransport()
+    raise ValueError(
+        f"Unknown mail transport {kind!r}, expected one of {TRANSPORT_KINDS}"
+    )
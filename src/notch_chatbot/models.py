@@ -2,7 +2,9 @@
 
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .search import InvertedIndex, TfidfIndex
 
 
 class ServiceCategory(str, Enum):
@@ -59,6 +61,18 @@ class Service(BaseModel):
     ideal_for: list[str] = Field(default_factory=list, description="Client scenarios")
     url: str
 
+    def search_text(self) -> str:
+        """Text searched by keyword tools (name, descriptions, features)."""
+        return " ".join(
+            [
+                self.name,
+                self.description,
+                self.short_description,
+                *self.key_features,
+                *self.ideal_for,
+            ]
+        )
+
 
 class CaseStudy(BaseModel):
     """A customer success story."""
@@ -79,6 +93,18 @@ class CaseStudy(BaseModel):
     metrics: list[str] | None = None
     url: str
 
+    def search_text(self) -> str:
+        """Text searched by keyword tools (title, challenge, solution, outcome)."""
+        return " ".join(
+            [
+                self.title,
+                self.challenge,
+                self.solution,
+                self.outcome or "",
+                *self.technologies,
+            ]
+        )
+
 
 class UseCase(BaseModel):
     """A use case demonstrating Notch's capabilities."""
@@ -92,6 +118,71 @@ class UseCase(BaseModel):
     related_services: list[str]
     url: str
 
+    def search_text(self) -> str:
+        """Text searched by keyword tools (title, problem, solution, metric)."""
+        return " ".join([self.title, self.problem, self.solution, self.metric or ""])
+
+
+class BlogPost(BaseModel):
+    """A post listed on the Notch blog."""
+
+    title: str
+    url: str
+    published: str | None = Field(None, description="Publication date as listed")
+    summary: str | None = None
+
+    def search_text(self) -> str:
+        """Text searched when filtering posts by topic (title, summary)."""
+        return " ".join([self.title, self.summary or ""])
+
+
+class ServiceSummary(BaseModel):
+    """Compact view of a service for listings."""
+
+    id: str
+    name: str
+    category: ServiceCategory
+    short_description: str
+
+    @classmethod
+    def from_service(cls, service: Service) -> "ServiceSummary":
+        """Project a full service onto its summary fields."""
+        return cls(
+            id=service.id,
+            name=service.name,
+            category=service.category,
+            short_description=service.short_description,
+        )
+
+
+class CaseStudySummary(BaseModel):
+    """Compact view of a case study for listings."""
+
+    id: str
+    client_name: str
+    title: str
+    industry: Industry
+
+    @classmethod
+    def from_case_study(cls, case_study: CaseStudy) -> "CaseStudySummary":
+        """Project a full case study onto its summary fields."""
+        return cls(
+            id=case_study.id,
+            client_name=case_study.client_name,
+            title=case_study.title,
+            industry=case_study.industry,
+        )
+
+
+class Page[T](BaseModel):
+    """One page of a listing."""
+
+    items: list[T]
+    total: int = Field(..., description="Number of records across all pages")
+    next_cursor: str | None = Field(
+        None, description="Pass back as cursor to get the next page; null at the end"
+    )
+
 
 class KnowledgeBase(BaseModel):
     """Complete knowledge base for the chatbot."""
@@ -102,3 +193,174 @@ class KnowledgeBase(BaseModel):
     expertise_domains: dict[str, str] = Field(
         ..., description="Domain key to description mapping"
     )
+    version: str = Field(
+        default="", description="Content hash of the data files this was loaded from"
+    )
+
+    _service_index: InvertedIndex = PrivateAttr()
+    _case_study_index: TfidfIndex = PrivateAttr()
+    _use_case_index: InvertedIndex = PrivateAttr()
+    _services_by_category: dict[str, list[Service]] = PrivateAttr()
+    _case_studies_by_industry: dict[str, list[CaseStudy]] = PrivateAttr()
+    _case_studies_by_service: dict[str, list[CaseStudy]] = PrivateAttr()
+    _use_cases_by_domain: dict[str, list[UseCase]] = PrivateAttr()
+    _industries: list[str] = PrivateAttr()
+    _service_positions: dict[str, int] = PrivateAttr()
+    _case_study_positions: dict[str, int] = PrivateAttr()
+
+    def model_post_init(self, __context: object) -> None:
+        """Build search and lookup indexes once, after validation."""
+        self._service_index = InvertedIndex(s.search_text() for s in self.services)
+        self._case_study_index = TfidfIndex(
+            cs.search_text() for cs in self.case_studies
+        )
+        self._use_case_index = InvertedIndex(uc.search_text() for uc in self.use_cases)
+
+        # Filter lookups keyed by enum value, each keeping knowledge base order
+        self._services_by_category = {}
+        for service in self.services:
+            self._services_by_category.setdefault(service.category.value, []).append(
+                service
+            )
+
+        self._case_studies_by_industry = {}
+        self._case_studies_by_service = {}
+        for cs in self.case_studies:
+            self._case_studies_by_industry.setdefault(cs.industry.value, []).append(cs)
+            # dict.fromkeys: a service listed twice must not duplicate the study
+            for service_id in dict.fromkeys(cs.services_used):
+                self._case_studies_by_service.setdefault(service_id, []).append(cs)
+
+        self._use_cases_by_domain = {}
+        for uc in self.use_cases:
+            self._use_cases_by_domain.setdefault(uc.domain.value, []).append(uc)
+
+        self._industries = sorted(self._case_studies_by_industry)
+
+        # ID lookups, also used as pagination cursors
+        self._service_positions = {s.id: i for i, s in enumerate(self.services)}
+        self._case_study_positions = {
+            cs.id: i for i, cs in enumerate(self.case_studies)
+        }
+
+    def services_in_category(self, category: str) -> list[Service]:
+        """Services in a category (enum value, e.g. "build")."""
+        return list(self._services_by_category.get(category, []))
+
+    def case_studies_in_industry(self, industry: str) -> list[CaseStudy]:
+        """Case studies in an industry (enum value, e.g. "fintech")."""
+        return list(self._case_studies_by_industry.get(industry, []))
+
+    def case_studies_using_service(self, service_id: str) -> list[CaseStudy]:
+        """Case studies that list service_id in services_used."""
+        return list(self._case_studies_by_service.get(service_id, []))
+
+    def use_cases_in_domain(self, domain: str) -> list[UseCase]:
+        """Use cases in an expertise domain (enum value, e.g. "ai_engineering")."""
+        return list(self._use_cases_by_domain.get(domain, []))
+
+    @property
+    def industries(self) -> list[str]:
+        """Sorted industry values that have at least one case study."""
+        return list(self._industries)
+
+    def services_by_id(self, service_ids: list[str]) -> list[Service]:
+        """Services with the given IDs, in request order; unknown IDs are skipped."""
+        return [
+            self.services[self._service_positions[service_id]]
+            for service_id in service_ids
+            if service_id in self._service_positions
+        ]
+
+    def case_studies_by_id(self, case_study_ids: list[str]) -> list[CaseStudy]:
+        """Case studies with the given IDs, in request order; unknown IDs are skipped."""
+        return [
+            self.case_studies[self._case_study_positions[case_study_id]]
+            for case_study_id in case_study_ids
+            if case_study_id in self._case_study_positions
+        ]
+
+    def page_services(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[Service], str | None]:
+        """Slice of services starting at the cursor.
+
+        Args:
+            cursor: ID of the first service on the page, or None for the start
+            limit: Maximum number of services on the page
+
+        Returns:
+            The services and the cursor of the next page (None at the end)
+
+        Raises:
+            KeyError: If the cursor is not a known service ID
+        """
+        return _page(self.services, self._service_positions, cursor, limit)
+
+    def page_case_studies(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[CaseStudy], str | None]:
+        """Slice of case studies starting at the cursor.
+
+        Args:
+            cursor: ID of the first case study on the page, or None for the start
+            limit: Maximum number of case studies on the page
+
+        Returns:
+            The case studies and the cursor of the next page (None at the end)
+
+        Raises:
+            KeyError: If the cursor is not a known case study ID
+        """
+        return _page(self.case_studies, self._case_study_positions, cursor, limit)
+
+    def search_services(self, keywords: list[str], top_k: int) -> list[Service]:
+        """Rank services against the keywords.
+
+        Args:
+            keywords: Keywords to search for
+            top_k: Maximum number of services to return
+
+        Returns:
+            Best matching services, highest BM25 score first
+        """
+        return [self.services[i] for i, _ in self._service_index.rank(keywords, top_k)]
+
+    def search_case_studies(self, keywords: list[str], top_k: int) -> list[CaseStudy]:
+        """Rank case studies by TF-IDF cosine similarity to the keywords.
+
+        Args:
+            keywords: Keywords or phrases describing the project
+            top_k: Maximum number of case studies to return
+
+        Returns:
+            Most similar case studies, highest similarity first
+        """
+        return [
+            self.case_studies[i]
+            for i, _ in self._case_study_index.rank(keywords, top_k)
+        ]
+
+    def search_use_cases(self, keywords: list[str], top_k: int) -> list[UseCase]:
+        """Rank use cases against the keywords.
+
+        Args:
+            keywords: Keywords to search for
+            top_k: Maximum number of use cases to return
+
+        Returns:
+            Best matching use cases, highest BM25 score first
+        """
+        return [
+            self.use_cases[i] for i, _ in self._use_case_index.rank(keywords, top_k)
+        ]
+
+
+def _page[R: (Service, CaseStudy)](
+    records: list[R], positions: dict[str, int], cursor: str | None, limit: int
+) -> tuple[list[R], str | None]:
+    """Cursor pagination over records, using the next record's ID as cursor."""
+    start = 0 if cursor is None else positions[cursor]
+    end = start + limit
+    next_cursor = records[end].id if end < len(records) else None
+    return records[start:end], next_cursor
@@ -0,0 +1,484 @@
+"""Durable email outbox with a background sender."""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Default database location, in the project root next to data/
+DEFAULT_OUTBOX_DB = Path(__file__).parent.parent.parent / ".outbox.sqlite3"
+
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 5 * 60.0
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_SEND_CONCURRENCY = 4
+DEFAULT_DRAIN_TIMEOUT = 30.0
+# Seconds a claimed message stays with its sender before another may take it
+DEFAULT_CLAIM_LEASE = 5 * 60.0
+
+
+class OutboxStatus(StrEnum):
+    """Delivery state of an outbox message."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """One queued email.
+
+    Attributes:
+        message_id: Outbox ID, shown to users as the reference
+        idempotency_key: Identifies the email to the mail API across retries
+        recipient: Recipient email address
+        recipient_name: Recipient display name
+        payload: Mail API request body
+        status: Delivery state
+        attempts: Sends tried so far
+        next_attempt_at: Epoch time the next send is due
+        last_error: Why the last attempt failed, if it did
+        created_at: Epoch time the message was queued
+        sent_at: Epoch time the mail API accepted it
+    """
+
+    message_id: str
+    idempotency_key: str
+    recipient: str
+    recipient_name: str
+    payload: dict
+    status: OutboxStatus
+    attempts: int
+    next_attempt_at: float
+    last_error: str | None
+    created_at: float
+    sent_at: float | None
+
+
+class DeliveryError(Exception):
+    """A send failed; retryable errors are tried again after a backoff."""
+
+    def __init__(self, message: str, retryable: bool = True) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+_INTERRUPTED_ERROR = (
+    "Interrupted while sending; not retried, as the mail API may have accepted it"
+)
+
+_COLUMNS = (
+    "message_id, idempotency_key, recipient, recipient_name, payload, status, "
+    "attempts, next_attempt_at, last_error, created_at, sent_at"
+)
+
+
+def _message_from_row(row: tuple) -> OutboxMessage:
+    return OutboxMessage(
+        message_id=row[0],
+        idempotency_key=row[1],
+        recipient=row[2],
+        recipient_name=row[3],
+        payload=json.loads(row[4]),
+        status=OutboxStatus(row[5]),
+        attempts=row[6],
+        next_attempt_at=row[7],
+        last_error=row[8],
+        created_at=row[9],
+        sent_at=row[10],
+    )
+
+
+class EmailOutbox:
+    """Email queue in a local SQLite database.
+
+    Messages survive restarts: anything not yet accepted by the mail API is
+    sent by the next OutboxSender to run. Several processes may share the
+    database; each message is claimed by one sender at a time.
+
+    A message left "sending" by a process that died is looked at again
+    once its lease runs out. If it was never handed to the mail transport
+    it is claimed again; if it was, the mail API may well have accepted
+    it (idempotency keys are not honored by every provider), so rather than
+    risk sending it twice it is marked failed, to be checked by hand.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        claim_lease: float = DEFAULT_CLAIM_LEASE,
+    ) -> None:
+        """Open (and create if needed) the database.
+
+        Args:
+            path: Database file; defaults to NOTCH_OUTBOX_DB or
+                  .outbox.sqlite3 in the project root
+            claim_lease: Seconds before a message claimed but never marked
+                         sent, retried or failed may be claimed again
+        """
+        if path is None:
+            path = os.getenv("NOTCH_OUTBOX_DB", DEFAULT_OUTBOX_DB)
+        self.claim_lease = claim_lease
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        # Write lock up front, so processes opening the file together don't
+        # race to migrate it
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    message_id TEXT PRIMARY KEY,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    recipient TEXT NOT NULL,
+                    recipient_name TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    sent_at REAL,
+                    claimed_at REAL,
+                    handed_at REAL
+                )
+                """
+            )
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")
+            }
+            for column in ("claimed_at", "handed_at"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} REAL")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS outbox_due "
+                "ON outbox (status, next_attempt_at)"
+            )
+
+    def enqueue(
+        self,
+        payload: dict,
+        recipient: str,
+        recipient_name: str = "",
+        idempotency_key: str | None = None,
+    ) -> OutboxMessage:
+        """Queue an email for sending.
+
+        Args:
+            payload: Mail API request body
+            recipient: Recipient email address
+            recipient_name: Recipient display name
+            idempotency_key: Key of this email; queuing a key again returns
+                             the message already queued under it
+
+        Returns:
+            The queued message
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO outbox ({_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, ?, NULL, ?, NULL)",
+                (
+                    uuid.uuid4().hex[:12],
+                    key,
+                    recipient,
+                    recipient_name,
+                    json.dumps(payload),
+                    OutboxStatus.PENDING,
+                    now,
+                    now,
+                ),
+            )
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return _message_from_row(row)
+
+    def claim_due(self, limit: int, now: float | None = None) -> list[OutboxMessage]:
+        """Mark up to limit due messages as sending and return them.
+
+        Due messages are pending ones whose next attempt has come, and ones
+        left sending past the claim lease before they were handed to the
+        transport; those handed over are marked failed instead (see the
+        class docstring). The claim is one statement under the database's
+        write lock, so concurrent senders, in this or other processes,
+        never claim the same message.
+        """
+        now = time.time() if now is None else now
+        expired = "status = ? AND (claimed_at IS NULL OR claimed_at <= ?)"
+        lease_start = now - self.claim_lease
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = ? "
+                f"WHERE {expired} AND handed_at IS NOT NULL",
+                (
+                    OutboxStatus.FAILED,
+                    _INTERRUPTED_ERROR,
+                    OutboxStatus.SENDING,
+                    lease_start,
+                ),
+            )
+            rows = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, "
+                "claimed_at = ?, handed_at = NULL WHERE message_id IN ("
+                "SELECT message_id FROM outbox "
+                f"WHERE (status = ? AND next_attempt_at <= ?) OR ({expired}) "
+                f"ORDER BY next_attempt_at LIMIT ?) RETURNING {_COLUMNS}",
+                (
+                    OutboxStatus.SENDING,
+                    now,
+                    OutboxStatus.PENDING,
+                    now,
+                    OutboxStatus.SENDING,
+                    lease_start,
+                    limit,
+                ),
+            ).fetchall()
+        messages = [_message_from_row(row) for row in rows]
+        return sorted(messages, key=lambda message: message.next_attempt_at)
+
+    def mark_handed(self, message_id: str) -> None:
+        """Record that the message is about to go to the mail transport."""
+        self._update(message_id, handed_at=time.time())
+
+    def mark_sent(self, message_id: str) -> None:
+        """Record that the mail API accepted the message."""
+        self._update(message_id, status=OutboxStatus.SENT, sent_at=time.time())
+
+    def mark_retry(self, message_id: str, error: str, next_attempt_at: float) -> None:
+        """Put the message back in the queue for another attempt."""
+        self._update(
+            message_id,
+            status=OutboxStatus.PENDING,
+            last_error=error,
+            next_attempt_at=next_attempt_at,
+            handed_at=None,
+        )
+
+    def mark_failed(self, message_id: str, error: str) -> None:
+        """Give up on the message."""
+        self._update(message_id, status=OutboxStatus.FAILED, last_error=error)
+
+    def _update(self, message_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE outbox SET {assignments} WHERE message_id = ?",
+                (*fields.values(), message_id),
+            )
+
+    def get(self, message_id: str) -> OutboxMessage | None:
+        """Look up a message by its ID."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM outbox WHERE message_id = ?", (message_id,)
+            ).fetchone()
+        return _message_from_row(row) if row else None
+
+    def find(self, recipient: str) -> list[OutboxMessage]:
+        """Messages to a recipient, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM outbox WHERE recipient = ? "
+                "ORDER BY created_at DESC",
+                (recipient,),
+            ).fetchall()
+        return [_message_from_row(row) for row in rows]
+
+    def counts(self) -> dict[OutboxStatus, int]:
+        """Number of messages in each state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(OutboxStatus, 0)
+        counts.update({OutboxStatus(status): count for status, count in rows})
+        return counts
+
+    def next_due(self) -> float | None:
+        """When the earliest pending message is due, if there is one."""
+        with self._lock:
+            (due,) = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?",
+                (OutboxStatus.PENDING,),
+            ).fetchone()
+        return due
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+type SendFunction = Callable[[OutboxMessage], Awaitable[None]]
+
+
+class OutboxSender:
+    """Background task that delivers outbox messages.
+
+    Due messages are sent concurrently; a retryable failure is tried again
+    after an exponential backoff with jitter, until max_attempts. stop()
+    lets in-flight sends finish and sends whatever is already due before
+    returning; messages still backing off stay queued for the next start.
+    """
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        send: SendFunction,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        concurrency: int = DEFAULT_SEND_CONCURRENCY,
+    ) -> None:
+        """Create a stopped sender.
+
+        Args:
+            outbox: Queue to deliver from
+            send: Delivers one message; raises DeliveryError on failure
+            max_attempts: Attempts before a message is marked failed
+            base_delay: Seconds before the first retry; doubles per attempt
+            max_delay: Upper bound on the delay between attempts
+            poll_interval: Seconds between checks for due messages when idle
+            concurrency: Messages sent at once
+        """
+        self.outbox = outbox
+        self._send = send
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the sender is started on the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return self._task is not None and not self._task.done() and loop is self._loop
+
+    async def start(self) -> None:
+        """Start sending on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="outbox-sender")
+
+    def enqueue(
+        self,
+        payload: dict,
+        recipient: str,
+        recipient_name: str = "",
+        idempotency_key: str | None = None,
+    ) -> OutboxMessage:
+        """Queue an email (see EmailOutbox.enqueue) and wake the sender."""
+        message = self.outbox.enqueue(
+            payload, recipient, recipient_name, idempotency_key
+        )
+        self.notify()
+        return message
+
+    def notify(self) -> None:
+        """Wake the sender to check for due messages; safe from any thread."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT) -> None:
+        """Send what is due, then stop.
+
+        Args:
+            drain_timeout: Seconds to wait for the drain before cancelling
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, drain_timeout)
+        except TimeoutError:
+            logger.warning("Outbox drain timed out; unsent mail stays queued")
+        finally:
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self._send_due():
+                    pass
+            except Exception:
+                logger.exception("Outbox sender error; retrying after the poll")
+            if self._stopping:
+                return
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._idle_timeout())
+            except TimeoutError:
+                pass
+
+    def _idle_timeout(self) -> float:
+        due = self.outbox.next_due()
+        if due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.0, due - time.time()))
+
+    async def _send_due(self) -> int:
+        """Send one batch of due messages; returns how many were tried."""
+        messages = self.outbox.claim_due(self.concurrency)
+        await asyncio.gather(*(self._deliver(message) for message in messages))
+        return len(messages)
+
+    async def _deliver(self, message: OutboxMessage) -> None:
+        try:
+            self.outbox.mark_handed(message.message_id)
+            await self._send(message)
+        except Exception as e:
+            retryable = getattr(e, "retryable", True)
+            if not retryable or message.attempts >= self.max_attempts:
+                logger.error(
+                    f"Giving up on outbox message {message.message_id} to "
+                    f"{message.recipient} after {message.attempts} attempts: {e}"
+                )
+                self.outbox.mark_failed(message.message_id, str(e))
+                return
+            delay = self._backoff(message.attempts)
+            logger.warning(
+                f"Outbox message {message.message_id} failed ({e}); "
+                f"retrying in {delay:.1f}s"
+            )
+            self.outbox.mark_retry(message.message_id, str(e), time.time() + delay)
+            return
+        self.outbox.mark_sent(message.message_id)
+        logger.info(f"Outbox message {message.message_id} sent to {message.recipient}")
+
+    def _backoff(self, attempts: int) -> float:
+        """Delay before the next attempt, with jitter so retries spread out."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
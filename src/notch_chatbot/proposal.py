@@ -0,0 +1,267 @@
+"""Proposal PDF template: static sections laid out once, client fields per render."""
+
+from dataclasses import dataclass
+from datetime import date
+from functools import cache
+
+from fpdf import FPDF
+from fpdf.enums import Align, XPos, YPos
+from fpdf.line_break import MultiLineBreak, TextLine
+
+BRAND_COLOR = (0, 102, 204)
+MUTED_COLOR = (100, 100, 100)
+TEXT_COLOR = (0, 0, 0)
+
+# (family, style, size) of the body text and the disclaimer
+BODY_FONT = ("helvetica", "", 11)
+DISCLAIMER_FONT = ("helvetica", "I", 9)
+
+PRICING_BY_SCOPE = {
+    "small": "Starting from $15,000 - $35,000",
+    "medium": "Typical range: $35,000 - $100,000 depending on scope",
+    "large": "Starting from $100,000+ depending on requirements",
+}
+DEFAULT_SCOPE = "medium"
+
+PRICING_NOTE = (
+    "Final pricing will be determined based on detailed requirements, "
+    "timeline, and project complexity. We'll provide a detailed breakdown "
+    "after our initial consultation call."
+)
+TEAM_TEXT = (
+    "Your project will be handled by a dedicated team including:\n"
+    "- Project Manager\n"
+    "- Senior Software Engineers\n"
+    "- UI/UX Designer\n"
+    "- QA Specialist\n"
+    "- DevOps Engineer (as needed)"
+)
+NEXT_STEPS_TEXT = (
+    "1. Review this proposal\n"
+    "2. Schedule a consultation call to discuss details\n"
+    "3. Receive detailed project plan and final quote\n"
+    "4. Project kickoff and development"
+)
+DISCLAIMER_TEXT = (
+    "IMPORTANT: This proposal is for orientational purposes only and does not "
+    "constitute a binding offer. Final terms, pricing, and deliverables will be "
+    "confirmed in a formal contract following detailed requirements analysis."
+)
+
+_NEXT_LINE = {"new_x": XPos.LMARGIN, "new_y": YPos.NEXT}
+
+# Every style the template writes text in (see _new_document)
+_FONT_STYLES = ("B", "I", "")
+
+# Writing pre-wrapped lines relies on private FPDF methods (as of fpdf2
+# 2.8); without them every section is laid out with multi_cell
+_CACHED_LINES = all(
+    hasattr(FPDF, name)
+    for name in (
+        "_preload_font_styles",
+        "_perform_page_break_if_need_be",
+        "_render_styled_text_line",
+    )
+)
+
+
+@dataclass(frozen=True)
+class _Section:
+    """Static text with its font and color, and its lines once wrapped.
+
+    Attributes:
+        font: (family, style, size) the text is written in
+        color: RGB text color
+        text: The text itself
+        lines: Lines as multi_cell would break them, or None if the
+               installed fpdf2 can't write them directly
+    """
+
+    font: tuple[str, str, int]
+    color: tuple[int, int, int]
+    text: str
+    lines: tuple[TextLine, ...] | None
+
+
+class ProposalTemplate:
+    """Renders proposal PDFs from a layout computed once.
+
+    Line breaking dominates the cost of a proposal, and most of the text
+    (team composition, pricing terms, next steps, disclaimer) is the same
+    for every prospect. The template wraps that text once, on construction;
+    a render only wraps the client's project description and services and
+    writes the cached lines out as they are. The output matches laying out
+    every section with multi_cell, which is what it falls back to if the
+    installed fpdf2 lacks the private methods used to write the lines.
+    """
+
+    def __init__(self) -> None:
+        """Lay out the static sections."""
+        pdf = _new_document()
+        self._team = _wrap(pdf, BODY_FONT, TEXT_COLOR, TEAM_TEXT)
+        self._pricing = {
+            scope: _wrap(pdf, BODY_FONT, TEXT_COLOR, f"{text}\n\n{PRICING_NOTE}")
+            for scope, text in PRICING_BY_SCOPE.items()
+        }
+        self._next_steps = _wrap(pdf, BODY_FONT, TEXT_COLOR, NEXT_STEPS_TEXT)
+        self._disclaimer = _wrap(pdf, DISCLAIMER_FONT, MUTED_COLOR, DISCLAIMER_TEXT)
+
+    def render(
+        self,
+        client_name: str,
+        client_email: str,
+        project_description: str,
+        services_list: str,
+        project_scope: str,
+        proposal_date: date | None = None,
+    ) -> bytes:
+        """Render one proposal.
+
+        Args:
+            client_name: Name of the client/prospect
+            client_email: Email address of the client
+            project_description: Project overview text
+            services_list: Recommended services text
+            project_scope: "small", "medium" or "large"; anything else is
+                           priced as medium
+            proposal_date: Date printed on the proposal (default today)
+
+        Returns:
+            The PDF document
+        """
+        proposal_date = proposal_date or date.today()
+        pdf = _new_document()
+        pdf.set_auto_page_break(auto=True, margin=15)
+
+        # Header with Notch branding
+        pdf.set_font("helvetica", "B", 24)
+        pdf.set_text_color(*BRAND_COLOR)
+        pdf.cell(0, 10, "NOTCH", align="C", **_NEXT_LINE)
+        pdf.set_font("helvetica", "I", 10)
+        pdf.set_text_color(*MUTED_COLOR)
+        pdf.cell(0, 5, "Software Development & AI Solutions", align="C", **_NEXT_LINE)
+        pdf.ln(10)
+
+        # Date
+        pdf.set_font("helvetica", "", 10)
+        pdf.set_text_color(*TEXT_COLOR)
+        pdf.cell(0, 5, f"Date: {proposal_date.strftime('%B %d, %Y')}", **_NEXT_LINE)
+        pdf.ln(5)
+
+        # Client information
+        pdf.set_font("helvetica", "B", 12)
+        pdf.cell(0, 7, "Proposal For:", **_NEXT_LINE)
+        pdf.set_font(*BODY_FONT)
+        pdf.cell(0, 6, client_name, **_NEXT_LINE)
+        pdf.cell(0, 6, client_email, **_NEXT_LINE)
+        pdf.ln(10)
+
+        _heading(pdf, "Project Overview")
+        pdf.multi_cell(0, 6, project_description)
+        pdf.ln(5)
+
+        _heading(pdf, "Recommended Services")
+        pdf.multi_cell(0, 6, services_list)
+        pdf.ln(5)
+
+        _heading(pdf, "Team Composition")
+        _write_section(pdf, self._team, 6)
+        pdf.ln(5)
+
+        _heading(pdf, "Investment Estimate")
+        pricing = self._pricing.get(project_scope.lower(), self._pricing[DEFAULT_SCOPE])
+        _write_section(pdf, pricing, 6)
+        pdf.ln(5)
+
+        _heading(pdf, "Next Steps")
+        _write_section(pdf, self._next_steps, 6)
+        pdf.ln(10)
+
+        pdf.set_font(*DISCLAIMER_FONT)
+        pdf.set_text_color(*MUTED_COLOR)
+        _write_section(pdf, self._disclaimer, 5)
+        pdf.ln(5)
+
+        # Footer
+        pdf.set_y(-30)
+        pdf.set_font("helvetica", "", 9)
+        pdf.set_text_color(*MUTED_COLOR)
+        pdf.cell(0, 5, "Notch Software Development", align="C", **_NEXT_LINE)
+        pdf.cell(0, 5, "www.wearenotch.com", align="C", **_NEXT_LINE)
+
+        return bytes(pdf.output())
+
+
+@cache
+def default_template() -> ProposalTemplate:
+    """The process-wide template, laid out on first use."""
+    return ProposalTemplate()
+
+
+def _new_document() -> FPDF:
+    """Open a one-page document with the template's fonts registered.
+
+    Cached lines refer to fonts by their number in the document they were
+    laid out in, so every document registers the same fonts in the same
+    order before any text is written.
+    """
+    pdf = FPDF()
+    for style in _FONT_STYLES:
+        pdf.set_font("helvetica", style)
+    pdf.add_page()
+    return pdf
+
+
+def _wrap(
+    pdf: FPDF, font: tuple[str, str, int], color: tuple[int, int, int], text: str
+) -> _Section:
+    """Break justified text into full-width lines exactly as multi_cell would.
+
+    The lines carry the font and color they are written in. If the
+    installed fpdf2 can't write them, the section is left unwrapped.
+    """
+    if not _CACHED_LINES:
+        return _Section(font, color, text, None)
+    pdf.set_font(*font)
+    pdf.set_text_color(*color)
+    fragments = pdf._preload_font_styles(pdf.normalize_text(text), False)
+    line_break = MultiLineBreak(
+        fragments,
+        pdf.epw,
+        (pdf.c_margin, pdf.c_margin),
+        align=Align.J,
+    )
+    lines = []
+    while (line := line_break.get_line()) is not None:
+        lines.append(line)
+    return _Section(font, color, text, tuple(lines))
+
+
+def _write_section(pdf: FPDF, section: _Section, line_height: float) -> None:
+    """Write a section's cached lines, breaking pages as multi_cell does.
+
+    Without cached lines the text is written with multi_cell itself.
+    """
+    lines = section.lines
+    if lines is None:
+        pdf.set_font(*section.font)
+        pdf.set_text_color(*section.color)
+        pdf.multi_cell(0, line_height, section.text)
+        return
+    for line in lines:
+        pdf._perform_page_break_if_need_be(line_height)
+        pdf._render_styled_text_line(
+            line, h=line_height, new_x=XPos.LEFT, new_y=YPos.NEXT
+        )
+    if lines and lines[-1].trailing_nl:
+        pdf.ln()
+    pdf.x = pdf.w - pdf.r_margin
+
+
+def _heading(pdf: FPDF, title: str) -> None:
+    """Section title, leaving the body font and color selected."""
+    pdf.set_font("helvetica", "B", 14)
+    pdf.set_text_color(*BRAND_COLOR)
+    pdf.cell(0, 8, title, **_NEXT_LINE)
+    pdf.set_text_color(*TEXT_COLOR)
+    pdf.set_font(*BODY_FONT)
@@ -0,0 +1,128 @@
+"""Hot reload of the knowledge base when data files change."""
+
+import logging
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from .knowledge_base import DEFAULT_DATA_DIR, load_knowledge_base
+from .models import KnowledgeBase
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeBaseWatcher:
+    """Holds the current knowledge base and swaps in a new one on data changes.
+
+    A background thread polls the data files and rebuilds the knowledge base
+    (and its indexes) off the request path. Callers read `current` once at the
+    start of each agent run and pass it as deps, so a run in flight keeps the
+    version it started with while the next turn sees the new one.
+    """
+
+    def __init__(
+        self, data_dir: Path | str | None = None, poll_interval: float = 2.0
+    ) -> None:
+        """Load the knowledge base and remember the state of the data files.
+
+        Args:
+            data_dir: Directory containing JSON data files (defaults to data/)
+            poll_interval: Seconds between checks once the watcher is started
+
+        Raises:
+            FileNotFoundError: If the initial load fails, as load_knowledge_base
+        """
+        self._data_dir = DEFAULT_DATA_DIR if data_dir is None else Path(data_dir)
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[KnowledgeBase], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._signature = self._file_signature()
+        self._failed_signature: tuple | None = None
+        self._kb = load_knowledge_base(self._data_dir)
+
+    @property
+    def current(self) -> KnowledgeBase:
+        """The most recently loaded knowledge base."""
+        return self._kb
+
+    def add_listener(self, callback: Callable[[KnowledgeBase], None]) -> None:
+        """Call callback with the new knowledge base after every reload."""
+        self._listeners.append(callback)
+
+    def _file_signature(self) -> tuple:
+        """Cheap change detector: name, size and mtime of each data file."""
+        signature = []
+        for path in sorted(self._data_dir.glob("*.json")):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def check(self) -> bool:
+        """Reload the knowledge base if any data file changed.
+
+        A file that fails to load (e.g. half-written JSON) keeps the previous
+        knowledge base in place; the check is retried on the next poll.
+
+        Returns:
+            True if a new knowledge base was swapped in
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if signature == self._signature:
+                return False
+
+            try:
+                kb = load_knowledge_base(self._data_dir)
+            except Exception as e:
+                if signature != self._failed_signature:
+                    logger.warning(f"Knowledge base reload failed, keeping old: {e}")
+                    self._failed_signature = signature
+                return False
+
+            self._signature = signature
+            self._failed_signature = None
+            if kb.version == self._kb.version:
+                # Touched but unchanged
+                return False
+            self._kb = kb
+
+        logger.info(
+            f"Knowledge base reloaded: {len(kb.services)} services, "
+            f"{len(kb.case_studies)} case studies, {len(kb.use_cases)} use cases"
+        )
+        for callback in self._listeners:
+            try:
+                callback(kb)
+            except Exception:
+                logger.exception("Knowledge base reload listener failed")
+        return True
+
+    def start(self) -> None:
+        """Start polling for changes in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="kb-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._poll_interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Knowledge base watcher check failed")
@@ -0,0 +1,126 @@
+"""Worker pool for CPU-bound rendering (proposal PDFs) off the event loop."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_QUEUE_SIZE = 16
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class RenderPool:
+    """Runs rendering functions in a thread or process pool.
+
+    Rendering on the event loop freezes every other session's stream on that
+    loop for the duration. The pool moves the work to workers; at most
+    max_pending renders are admitted per event loop, and further callers wait
+    their turn instead of piling up in the executor queue.
+
+    A thread pool is cheap and fine when the loop mostly waits on I/O; a
+    process pool also takes the rendering off the GIL, at the cost of
+    pickling the arguments and result.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = DEFAULT_RENDER_WORKERS,
+        max_pending: int = DEFAULT_RENDER_QUEUE_SIZE,
+    ) -> None:
+        """Configure the pool; workers start on first use.
+
+        Args:
+            kind: "thread" or "process"
+            workers: Number of worker threads or processes
+            max_pending: Renders admitted at once per event loop, running
+                         or queued
+
+        Raises:
+            ValueError: If kind is not a known executor kind
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown render executor {kind!r}, expected one of {EXECUTOR_KINDS}"
+            )
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls) -> "RenderPool":
+        """Build a pool configured by NOTCH_RENDER_EXECUTOR (thread/process),
+        NOTCH_RENDER_WORKERS and NOTCH_RENDER_QUEUE_SIZE."""
+        return cls(
+            kind=os.getenv("NOTCH_RENDER_EXECUTOR", "thread"),
+            workers=int(os.getenv("NOTCH_RENDER_WORKERS", DEFAULT_RENDER_WORKERS)),
+            max_pending=int(
+                os.getenv("NOTCH_RENDER_QUEUE_SIZE", DEFAULT_RENDER_QUEUE_SIZE)
+            ),
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # spawn: forking a process that runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="notch-render"
+                    )
+                logger.info(f"Started {self.workers} {self.kind} render workers")
+            return self._executor
+
+    def _slots_for(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+            return slots
+
+    async def run[**P, T](
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run func(*args, **kwargs) on a worker and await its result.
+
+        Args:
+            func: Module-level function (it must be picklable for a
+                  process pool)
+
+        Returns:
+            What func returns; its exception is re-raised here
+        """
+        loop = asyncio.get_running_loop()
+        async with self._slots_for(loop):
+            if kwargs:
+                return await loop.run_in_executor(
+                    self._get_executor(), _call, func, args, kwargs
+                )
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self) -> None:
+        """Stop the workers; the pool restarts them if used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _call(func: Callable, args: tuple, kwargs: dict):
+    """Apply kwargs in the worker (run_in_executor only passes args)."""
+    return func(*args, **kwargs)
@@ -0,0 +1,397 @@
+"""Turn streaming, with cached first-turn responses replayed without the model."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    UserPromptPart,
+)
+from pydantic_ai.models import Model
+
+from .agent import KNOWLEDGE_BASE_TOOLS, SYSTEM_PROMPT
+from .models import KnowledgeBase
+from .router import IntentRouter
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Default database location, in the project root next to data/
+DEFAULT_RESPONSE_CACHE_DB = Path(__file__).parent.parent.parent / ".responses.sqlite3"
+
+DEFAULT_RESPONSE_CACHE_SIZE = 512
+DEFAULT_RESPONSE_CACHE_TTL = 24 * 60 * 60
+# Pause between replayed chunks, roughly the pace the model streams at
+DEFAULT_REPLAY_DELAY = 0.01
+
+# Answers that only used these tools depend on nothing but the question and
+# the knowledge base
+CACHEABLE_TOOLS = frozenset(tool.__name__ for tool in KNOWLEDGE_BASE_TOOLS)
+
+# Words with their trailing whitespace, the unit of a replayed chunk
+_CHUNK_PATTERN = re.compile(r"\s*\S+\s*")
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    """Snapshot of first-turn cache effectiveness."""
+
+    hits: int
+    misses: int
+    size: int
+    max_entries: int
+    seconds_saved: float
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of first turns answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A first turn as it was answered.
+
+    Attributes:
+        text: The streamed answer
+        history: Messages of the turn, for the next turn's message_history
+        latency: Seconds the model took to answer in full
+        created_at: time.time() when the answer was stored
+    """
+
+    text: str
+    history: bytes
+    latency: float
+    created_at: float
+
+    def messages(self, user_message: str) -> list[ModelMessage]:
+        """The turn's messages, with the prompt as this user phrased it."""
+        messages = ModelMessagesTypeAdapter.validate_json(zlib.decompress(self.history))
+        for message in messages:
+            if isinstance(message, ModelRequest):
+                for part in message.parts:
+                    if isinstance(part, UserPromptPart):
+                        part.content = user_message
+        return messages
+
+
+def prompt_version(agent: Agent) -> str:
+    """Identify the model and system prompt an agent answers with.
+
+    A cached answer is only valid for the prompt and model that produced
+    it, so this is part of its key.
+    """
+    model = agent.model
+    if isinstance(model, Model):
+        model = f"{model.system}:{model.model_name}"
+    digest = hashlib.sha256(f"{model}\n{SYSTEM_PROMPT}".encode())
+    return digest.hexdigest()[:16]
+
+
+def normalize_message(message: str) -> str:
+    """Case, punctuation and spacing don't make a different question."""
+    return " ".join(tokenize(message))
+
+
+def is_cacheable(messages: Iterable[ModelMessage]) -> bool:
+    """Whether a turn can be replayed.
+
+    Turns that called a tool with side effects or time-dependent results
+    (offers, blog posts) can't.
+    """
+    return all(
+        part.tool_name in CACHEABLE_TOOLS
+        for message in messages
+        for part in message.parts
+        if isinstance(part, ToolCallPart)
+    )
+
+
+class FirstTurnCache:
+    """LRU cache of answers to opening questions, persisted in SQLite.
+
+    Many conversations open with the same question ("What services do you
+    offer?"). With no history, the answer depends only on the question, the
+    knowledge base, the model and the prompt, so it is stored under
+    (normalized question, knowledge base version, prompt version) and
+    replayed to the
+    next visitor who asks. Entries expire after ttl seconds so answers don't
+    go stale in wording, and the least recently used are evicted beyond
+    max_entries. Safe to share across sessions and threads.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        max_entries: int = DEFAULT_RESPONSE_CACHE_SIZE,
+        ttl: float = DEFAULT_RESPONSE_CACHE_TTL,
+    ) -> None:
+        """Open (and create if needed) the database and load live entries.
+
+        Args:
+            path: Database file; defaults to .responses.sqlite3 in the
+                  project root
+            max_entries: Least recently used entries are evicted beyond this
+            ttl: Seconds an answer is replayed for
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._seconds_saved = 0.0
+
+        self._conn = sqlite3.connect(
+            str(DEFAULT_RESPONSE_CACHE_DB if path is None else path),
+            check_same_thread=False,
+        )
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    history BLOB NOT NULL,
+                    latency REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at <= ?", (time.time() - ttl,)
+            )
+            rows = self._conn.execute(
+                "SELECT key, text, history, latency, created_at FROM responses "
+                "ORDER BY last_used DESC LIMIT ?",
+                (max_entries,),
+            ).fetchall()
+        # Oldest first, so the most recently used end up at the MRU end
+        for key, text, history, latency, created_at in reversed(rows):
+            self._entries[key] = CachedResponse(text, history, latency, created_at)
+
+    @classmethod
+    def from_env(cls) -> "FirstTurnCache":
+        """Open the cache configured by the NOTCH_RESPONSE_CACHE_* variables."""
+        return cls(
+            os.getenv("NOTCH_RESPONSE_CACHE_DB"),
+            max_entries=int(
+                os.getenv("NOTCH_RESPONSE_CACHE_SIZE", DEFAULT_RESPONSE_CACHE_SIZE)
+            ),
+            ttl=float(
+                os.getenv("NOTCH_RESPONSE_CACHE_TTL", DEFAULT_RESPONSE_CACHE_TTL)
+            ),
+        )
+
+    @staticmethod
+    def key(user_message: str, kb_version: str, prompt_version: str) -> str:
+        """Cache key of an opening question."""
+        content = (
+            f"{normalize_message(user_message)}\x1f{kb_version}\x1f{prompt_version}"
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(
+        self, user_message: str, kb_version: str, prompt_version: str
+    ) -> CachedResponse | None:
+        """Return the stored answer to an opening question, if still fresh."""
+        key = self.key(user_message, kb_version, prompt_version)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.created_at <= time.time() - self.ttl:
+                del self._entries[key]
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                cached = None
+            if cached is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        return cached
+
+    def put(
+        self,
+        user_message: str,
+        kb_version: str,
+        prompt_version: str,
+        text: str,
+        messages: list[ModelMessage],
+        latency: float,
+    ) -> None:
+        """Store the answer to an opening question.
+
+        Args:
+            user_message: The question
+            kb_version: Version of the knowledge base it was answered from
+            prompt_version: Model and prompt it was answered with, from
+                            prompt_version()
+            text: The streamed answer
+            messages: Messages of the turn
+            latency: Seconds the model took to answer
+        """
+        key = self.key(user_message, kb_version, prompt_version)
+        now = time.time()
+        cached = CachedResponse(
+            text,
+            zlib.compress(ModelMessagesTypeAdapter.dump_json(messages), 1),
+            latency,
+            now,
+        )
+        with self._lock, self._conn:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, cached.history, latency, now, now),
+            )
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (evicted,))
+
+    def record_saving(self, seconds: float) -> None:
+        """Count model time a replay saved."""
+        with self._lock:
+            self._seconds_saved += max(seconds, 0.0)
+
+    def stats(self) -> ResponseCacheStats:
+        """Current hit/miss counters, size and time saved."""
+        with self._lock:
+            return ResponseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                seconds_saved=self._seconds_saved,
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+async def replay(text: str, delay: float = DEFAULT_REPLAY_DELAY) -> AsyncIterator[str]:
+    """Stream a stored answer word by word, as the model would."""
+    for chunk in _CHUNK_PATTERN.findall(text):
+        yield chunk
+        await asyncio.sleep(delay)
+
+
+async def stream_turn(
+    agent: Agent,
+    kb: KnowledgeBase,
+    user_message: str,
+    message_history: list[ModelMessage],
+    on_complete: Callable[[list[ModelMessage]], None],
+    response_cache: FirstTurnCache | None = None,
+    router: IntentRouter | None = None,
+    replay_delay: float = DEFAULT_REPLAY_DELAY,
+) -> AsyncIterator[str]:
+    """Stream the answer to one turn, without the model where possible.
+
+    Catalogue questions are answered by the router. Opening questions (no
+    message_history) are looked up in the cache, and stored there once
+    the agent has answered them.
+
+    Args:
+        agent: Agent to run on a miss
+        kb: Knowledge base for this turn
+        user_message: The user's message
+        message_history: Conversation so far
+        on_complete: Called with the whole (compacted) conversation once the
+                     answer has finished streaming
+        response_cache: Cache of first-turn answers, or None to always run
+                        the agent
+        router: Answers catalogue questions locally, or None to send them
+                to the agent
+        replay_delay: Pause between replayed chunks
+
+    Yields:
+        Text deltas of the answer
+    """
+    if router is not None:
+        answer = router.answer(user_message, kb)
+        if answer is not None:
+            async for chunk in replay(answer, replay_delay):
+                yield chunk
+            on_complete(
+                message_history + _local_turn(user_message, answer, message_history)
+            )
+            return
+
+    first_turn = response_cache is not None and not message_history and kb.version
+    if first_turn:
+        version = prompt_version(agent)
+        cached = response_cache.get(user_message, kb.version, version)
+        if cached is not None:
+            start = time.perf_counter()
+            async for chunk in replay(cached.text, replay_delay):
+                yield chunk
+            response_cache.record_saving(cached.latency - (time.perf_counter() - start))
+            logger.info(f"Answered opening question from cache: {user_message[:60]!r}")
+            on_complete(cached.messages(user_message))
+            return
+
+    start = time.perf_counter()
+    chunks = []
+    async with agent.run_stream(
+        user_message, deps=kb, message_history=message_history
+    ) as response:
+        async for chunk in response.stream_text(delta=True):
+            chunks.append(chunk)
+            yield chunk
+        messages = response.all_messages()
+
+    text = "".join(chunks)
+    if first_turn and text and is_cacheable(messages):
+        response_cache.put(
+            user_message,
+            kb.version,
+            version,
+            text,
+            messages,
+            time.perf_counter() - start,
+        )
+    on_complete(messages)
+
+
+def _local_turn(
+    user_message: str, answer: str, message_history: list[ModelMessage]
+) -> list[ModelMessage]:
+    """Messages recording a turn answered without the model.
+
+    The agent only adds its system prompt to a run without history, so an
+    opening turn answered locally has to carry it for later turns.
+    """
+    parts = [] if message_history else [SystemPromptPart(SYSTEM_PROMPT)]
+    return [
+        ModelRequest(parts=[*parts, UserPromptPart(user_message)]),
+        ModelResponse(parts=[TextPart(answer)], model_name="notch-router"),
+    ]
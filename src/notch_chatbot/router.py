@@ -0,0 +1,163 @@
+"""Local answers to catalogue questions, without a model call."""
+
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import StrEnum
+
+from .models import KnowledgeBase
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class Intent(StrEnum):
+    """Catalogue questions the router answers itself."""
+
+    LIST_SERVICES = "list_services"
+    LIST_INDUSTRIES = "list_industries"
+
+
+# Words that name what the question asks for
+INTENT_TERMS: dict[Intent, frozenset[str]] = {
+    Intent.LIST_SERVICES: frozenset({"service", "services", "offering", "offerings"}),
+    Intent.LIST_INDUSTRIES: frozenset(
+        {"industry", "industries", "sector", "sectors", "vertical", "verticals"}
+    ),
+}
+
+# Words that don't narrow the question down. Anything else ("AI services",
+# "services for startups", "not") means the question is more specific than
+# the catalogue, and it goes to the agent
+FILLER_WORDS = frozenset(
+    """
+    a about all an and any are available be can company could cover
+    currently do does everything experience for full give have hello hey
+    hi i in is kind kinds know like list main me notch of offer on
+    operate please provide range s see serve show sort sorts specialise
+    specialize support tell that the there these to type types us want
+    we what which with work would you your
+    """.split()
+)
+
+# Industry values whose display name isn't the value with spaces
+INDUSTRY_NAMES = {"saas": "SaaS", "iot": "IoT"}
+
+
+@dataclass(frozen=True)
+class RouterStats:
+    """Snapshot of how many messages the router answered and how fast."""
+
+    routed: int
+    passed: int
+    by_intent: dict[str, int]
+    seconds: float
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of messages answered locally."""
+        total = self.routed + self.passed
+        return self.routed / total if total else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Mean seconds spent classifying (and answering) a message."""
+        total = self.routed + self.passed
+        return self.seconds / total if total else 0.0
+
+
+def classify(message: str) -> Intent | None:
+    """The catalogue intent of a message, or None if it asks anything more."""
+    intents = set()
+    for token in tokenize(message):
+        matched = [intent for intent, terms in INTENT_TERMS.items() if token in terms]
+        if matched:
+            intents.update(matched)
+        elif token not in FILLER_WORDS:
+            return None
+    return intents.pop() if len(intents) == 1 else None
+
+
+def list_services_answer(kb: KnowledgeBase) -> str:
+    """Concise overview of every service, one line each."""
+    lines = [f"We offer {len(kb.services)} services:", ""]
+    lines += [f"- **{s.name}**: {s.short_description}" for s in kb.services]
+    lines += ["", "Which of these fits what you have in mind?"]
+    return "\n".join(lines)
+
+
+def list_industries_answer(kb: KnowledgeBase) -> str:
+    """The industries we have case studies in, in one sentence."""
+    names = [
+        INDUSTRY_NAMES.get(industry, industry.replace("_", " "))
+        for industry in kb.industries
+    ]
+    if len(names) > 1:
+        listed = f"{', '.join(names[:-1])} and {names[-1]}"
+    else:
+        listed = "".join(names)
+    return (
+        f"We have delivered projects for clients in {listed}. "
+        "Would you like to see a case study from one of these industries?"
+    )
+
+
+_ANSWERS = {
+    Intent.LIST_SERVICES: list_services_answer,
+    Intent.LIST_INDUSTRIES: list_industries_answer,
+}
+
+
+class IntentRouter:
+    """Answers catalogue questions from the knowledge base directly.
+
+    "List your services" or "which industries do you cover" are fully
+    answered by one listing tool, yet cost the agent two model round trips:
+    one to call the tool and one to phrase its result. The router
+    recognizes these questions by their words alone and answers them from
+    a template; any message with a word outside the catalogue vocabulary
+    goes to the agent unchanged. Safe to share across sessions and threads.
+    """
+
+    def __init__(self) -> None:
+        """Create a router with zeroed counters."""
+        self._lock = threading.Lock()
+        self._routed: Counter[str] = Counter()
+        self._passed = 0
+        self._seconds = 0.0
+
+    def answer(self, message: str, kb: KnowledgeBase) -> str | None:
+        """Answer a catalogue question, or return None for the agent to answer.
+
+        Args:
+            message: The user's message
+            kb: Knowledge base to answer from
+
+        Returns:
+            The answer, or None if the message isn't a catalogue question
+        """
+        start = time.perf_counter()
+        intent = classify(message)
+        answer = _ANSWERS[intent](kb) if intent is not None else None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._seconds += elapsed
+            if intent is None:
+                self._passed += 1
+            else:
+                self._routed[intent] += 1
+        if intent is not None:
+            logger.info(f"Answered {intent} locally in {elapsed * 1000:.2f}ms")
+        return answer
+
+    def stats(self) -> RouterStats:
+        """Current counters."""
+        with self._lock:
+            return RouterStats(
+                routed=self._routed.total(),
+                passed=self._passed,
+                by_intent=dict(self._routed),
+                seconds=self._seconds,
+            )
@@ -0,0 +1,114 @@
+"""Long-lived event loop for running agent turns from synchronous code."""
+
+import asyncio
+import logging
+import queue
+import threading
+from collections.abc import AsyncIterator, Coroutine, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Queue marker for the end of a stream
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception from the loop thread to the consumer."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class AsyncRunner:
+    """Runs coroutines on one event loop in a background thread.
+
+    Streamlit executes each script run in its own thread, and calling
+    asyncio.run() there creates (and closes) an event loop per turn, which
+    throws away every pooled HTTP connection. The runner keeps a single loop
+    alive for the whole process so connection pools bound to it are reused
+    across turns and sessions.
+    """
+
+    def __init__(self, name: str = "notch-async-runner") -> None:
+        """Start the loop thread.
+
+        Args:
+            name: Name of the background thread
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop every submitted coroutine runs on."""
+        return self._loop
+
+    def run[T](self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run a coroutine on the loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before raising TimeoutError
+
+        Returns:
+            The coroutine's result; its exception is re-raised here
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def stream[T](self, items: AsyncIterator[T]) -> Iterator[T]:
+        """Consume an async iterator on the loop, yielding items as they arrive.
+
+        Items are handed over through a thread-safe queue, so the caller can
+        render each chunk while the loop keeps streaming. If the caller stops
+        early, the iteration is cancelled and the async iterator closed.
+
+        Args:
+            items: Async iterator (typically an async generator) to consume
+
+        Yields:
+            Items in the order produced; an exception raised by the iterator,
+            or CancelledError if the iteration is cancelled on the loop, is
+            re-raised after the items that preceded it
+        """
+        handoff: queue.Queue = queue.Queue()
+
+        async def pump() -> None:
+            try:
+                async for item in items:
+                    handoff.put(item)
+            except BaseException as e:
+                handoff.put(_Failure(e))
+                # Cancelled (e.g. by loop shutdown): the consumer is told
+                # above, but the task still has to end cancelled
+                if not isinstance(e, Exception):
+                    raise
+            finally:
+                handoff.put(_DONE)
+                aclose = getattr(items, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while (item := handoff.get()) is not _DONE:
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self) -> None:
+        """Stop the loop and wait for the thread to exit."""
+        if self._loop.is_closed():
+            return
+        # Let abandoned async generators (e.g. SDK response streams) clean up
+        self.run(self._loop.shutdown_asyncgens())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
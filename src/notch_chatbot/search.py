@@ -0,0 +1,175 @@
+"""Search indexes over knowledge base text."""
+
+import heapq
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+# Word characters only, so "Node.js" and "UI/UX" split into separate tokens
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized (case-folded) word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens in the order they appear
+    """
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+class InvertedIndex:
+    """BM25-ranked token index, built once over a list of documents."""
+
+    def __init__(self, documents: Iterable[str]) -> None:
+        """Index documents by their tokens.
+
+        Args:
+            documents: Searchable text of each document, in record order
+        """
+        self._postings: dict[str, dict[int, int]] = {}
+        self._doc_lengths: list[int] = []
+        for position, text in enumerate(documents):
+            tokens = tokenize(text)
+            self._doc_lengths.append(len(tokens))
+            for token, count in Counter(tokens).items():
+                self._postings.setdefault(token, {})[position] = count
+
+        doc_count = len(self._doc_lengths)
+        self._avg_length = sum(self._doc_lengths) / doc_count if doc_count else 0.0
+        self._idf = {
+            token: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self._postings.items()
+        }
+
+    def rank(self, keywords: list[str], top_k: int) -> list[tuple[int, float]]:
+        """Score documents against the keywords with BM25.
+
+        Only the posting lists of the query tokens are visited, so the cost
+        depends on how many documents mention them, not on the index size.
+
+        Args:
+            keywords: Keywords to search for (multi-word keywords are split)
+            top_k: Maximum number of results to return
+
+        Returns:
+            (position, score) pairs, best first; ties keep record order
+        """
+        query = {token for keyword in keywords for token in tokenize(keyword)}
+        scores: dict[int, float] = {}
+        for token in query:
+            docs = self._postings.get(token)
+            if not docs:
+                continue
+            idf = self._idf[token]
+            for position, tf in docs.items():
+                norm = BM25_K1 * (
+                    1 - BM25_B + BM25_B * self._doc_lengths[position] / self._avg_length
+                )
+                scores[position] = scores.get(position, 0.0) + idf * (
+                    tf * (BM25_K1 + 1) / (tf + norm)
+                )
+
+        return heapq.nsmallest(
+            top_k, scores.items(), key=lambda item: (-item[1], item[0])
+        )
+
+
+# Suffixes folded by the similarity analyzer, longest first
+_SUFFIXES = ("ings", "ing", "ers", "er", "ed", "s")
+
+
+def stem(token: str) -> str:
+    """Strip a common English suffix so word variants share a term.
+
+    This is deliberately crude ("tracking", "tracked" and "tracks" all become
+    "track"); it only needs to be consistent between documents and queries.
+
+    Args:
+        token: Normalized token from tokenize()
+
+    Returns:
+        Token with at most one suffix removed
+    """
+    if token.endswith("ss"):
+        # "process", "business": not a plural
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def _terms(text: str) -> list[str]:
+    """Tokenize and stem text for the similarity index."""
+    return [stem(token) for token in tokenize(text)]
+
+
+class TfidfIndex:
+    """Cosine similarity over a sparse, L2-normalized TF-IDF matrix.
+
+    The matrix is stored column-wise (term to {document: weight}), so scoring
+    a query is one sparse matrix-vector product that only touches the columns
+    of the query terms.
+    """
+
+    def __init__(self, documents: Iterable[str]) -> None:
+        """Build the TF-IDF matrix.
+
+        Args:
+            documents: Searchable text of each document, in record order
+        """
+        counts = [Counter(_terms(text)) for text in documents]
+        doc_count = len(counts)
+        doc_freq: Counter[str] = Counter()
+        for row in counts:
+            doc_freq.update(row.keys())
+
+        # Smoothed idf, as in scikit-learn's TfidfVectorizer
+        self._idf = {
+            term: math.log((1 + doc_count) / (1 + df)) + 1
+            for term, df in doc_freq.items()
+        }
+        self._columns: dict[str, dict[int, float]] = {}
+        for position, row in enumerate(counts):
+            weights = self._weigh(row)
+            for term, weight in weights.items():
+                self._columns.setdefault(term, {})[position] = weight
+
+    def _weigh(self, counts: Counter[str]) -> dict[str, float]:
+        """Turn term counts into an L2-normalized sublinear TF-IDF vector."""
+        weights = {
+            term: (1 + math.log(tf)) * self._idf[term]
+            for term, tf in counts.items()
+            if term in self._idf
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()} if norm else {}
+
+    def rank(self, keywords: list[str], top_k: int) -> list[tuple[int, float]]:
+        """Rank documents by cosine similarity to the keywords.
+
+        Args:
+            keywords: Keywords or phrases describing what to look for
+            top_k: Maximum number of results to return
+
+        Returns:
+            (position, similarity) pairs, best first; ties keep record order
+        """
+        query = self._weigh(Counter(_terms(" ".join(keywords))))
+        scores: dict[int, float] = {}
+        for term, query_weight in query.items():
+            for position, weight in self._columns[term].items():
+                scores[position] = scores.get(position, 0.0) + query_weight * weight
+
+        return heapq.nsmallest(
+            top_k, scores.items(), key=lambda item: (-item[1], item[0])
+        )
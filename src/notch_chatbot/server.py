@@ -0,0 +1,574 @@
+"""HTTP API streaming chat turns to many concurrent sessions over SSE."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import uuid
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+
+import uvicorn
+from dotenv import load_dotenv
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from . import tools
+from .agent import create_model_client, create_notch_agent, create_pooled_model
+from .cache import ToolResultCache
+from .dedup import OfferDeduplicator
+from .history import HistoryCompactor, ToolReturnPruner
+from .http_client import close_app_client, open_app_client
+from .mail import transport_from_env
+from .outbox import EmailOutbox, OutboxSender
+from .reload import KnowledgeBaseWatcher
+from .rendering import RenderPool
+from .responses import DEFAULT_REPLAY_DELAY, FirstTurnCache, stream_turn
+from .router import IntentRouter
+from .sessions import DEFAULT_SESSION_TTL, SessionManager, SQLiteSessionStore
+
+logger = logging.getLogger(__name__)
+
+# Turns running at once across all sessions; more are refused with 503 so a
+# load balancer can retry them elsewhere
+DEFAULT_MAX_TURNS = 256
+# Seconds without a delta before a comment line keeps proxies from timing out
+DEFAULT_HEARTBEAT = 15.0
+MAX_MESSAGE_LENGTH = 4000
+
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+class SessionBusyError(Exception):
+    """The session already has a turn in flight."""
+
+
+class ServerBusyError(Exception):
+    """Every turn slot is taken."""
+
+
+@dataclass(frozen=True)
+class ServerStats:
+    """Snapshot of the turns the server has run."""
+
+    sessions: int
+    active_turns: int
+    max_turns: int
+    completed: int
+    disconnected: int
+    failed: int
+    rejected: int
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class DeltaBuffer:
+    """Text deltas waiting to be sent to one client.
+
+    The agent never waits for the network: deltas that arrive while the
+    client is still receiving the previous event are appended to the pending
+    text and go out together as one larger event. A slow client gets fewer,
+    bigger events instead of holding a model stream (and its connection)
+    open, and memory per turn is bounded by the length of the answer.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty, open buffer."""
+        self._pending: list[str] = []
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._error: BaseException | None = None
+
+    def put(self, text: str) -> None:
+        """Add a delta."""
+        self._pending.append(text)
+        self._ready.set()
+
+    def close(self, error: BaseException | None = None) -> None:
+        """Mark the answer as finished, or failed with error."""
+        self._closed = True
+        self._error = error
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> str | None:
+        """Wait for text, and take all of it.
+
+        Args:
+            timeout: Seconds to wait before returning "" with nothing pending
+
+        Returns:
+            Everything added since the last call, "" on timeout, or None
+            once the buffer is closed and drained
+
+        Raises:
+            The error the buffer was closed with, once drained
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except TimeoutError:
+            return ""
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._ready.clear()
+        if text:
+            if self._closed:
+                # Leave the end for the next call
+                self._ready.set()
+            return text
+        if self._error is not None:
+            raise self._error
+        return None
+
+
+class ChatService:
+    """Runs chat turns for sessions identified by the caller.
+
+    One agent, knowledge base, response cache and router are shared by
+    every session, so a session costs only its history. Sessions take one
+    turn at a time, and at most max_turns run at once; both limits are
+    checked in reserve() before a response starts, so callers can refuse
+    the request with a proper status code.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        kb_watcher: KnowledgeBaseWatcher,
+        sessions: SessionManager,
+        response_cache: FirstTurnCache | None = None,
+        router: IntentRouter | None = None,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        heartbeat: float = DEFAULT_HEARTBEAT,
+        replay_delay: float = DEFAULT_REPLAY_DELAY,
+    ) -> None:
+        """Create the service.
+
+        Args:
+            agent: Agent shared by every session
+            kb_watcher: Source of the current knowledge base
+            sessions: Session histories, loaded and persisted per turn
+            response_cache: Cache of first-turn answers, or None
+            router: Answers catalogue questions locally, or None
+            max_turns: Turns allowed to run at once across all sessions
+            heartbeat: Seconds without a delta before a keep-alive comment
+            replay_delay: Pause between replayed chunks
+        """
+        self.agent = agent
+        self.kb_watcher = kb_watcher
+        self.sessions = sessions
+        self.response_cache = response_cache
+        self.router = router
+        self.max_turns = max_turns
+        self.heartbeat = heartbeat
+        self.replay_delay = replay_delay
+        self._active: dict[str, object] = {}
+        self._completed = 0
+        self._disconnected = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def reserve(self, session_id: str) -> Callable[[], None]:
+        """Claim a turn slot for the session.
+
+        Returns:
+            Releases the slot; safe to call more than once
+
+        Raises:
+            SessionBusyError: If the session already has a turn running
+            ServerBusyError: If max_turns turns are running
+        """
+        if session_id in self._active:
+            self._rejected += 1
+            raise SessionBusyError(f"A turn is already running in {session_id}")
+        if len(self._active) >= self.max_turns:
+            self._rejected += 1
+            raise ServerBusyError(f"{self.max_turns} turns are already running")
+        reservation = object()
+        self._active[session_id] = reservation
+
+        def release() -> None:
+            # A later turn of the same session may hold the slot by now
+            if self._active.get(session_id) is reservation:
+                del self._active[session_id]
+
+        return release
+
+    def is_busy(self, session_id: str) -> bool:
+        """Whether the session has a turn running."""
+        return session_id in self._active
+
+    async def stream(
+        self, session_id: str, user_message: str, release: Callable[[], None]
+    ) -> AsyncIterator[str]:
+        """Run one turn of a session as Server-Sent Events.
+
+        Emits `delta` events with the text as it streams, then `done` with
+        the whole answer once the turn is saved, or `error`. The session's
+        slot (from reserve()) is released before `done`, so the client can
+        send its next message straight away. If the client goes away the
+        agent run is cancelled and the turn is not saved.
+
+        Args:
+            session_id: Conversation the turn belongs to
+            user_message: The user's message
+            release: Slot release returned by reserve()
+
+        Yields:
+            Encoded events and keep-alive comments
+        """
+        session = await asyncio.to_thread(self.sessions.get, session_id)
+        kb = self.kb_watcher.current
+        buffer = DeltaBuffer()
+        turn_history: list[ModelMessage] = []
+
+        async def produce() -> None:
+            async for chunk in stream_turn(
+                self.agent,
+                kb,
+                user_message,
+                session.history,
+                turn_history.extend,
+                self.response_cache,
+                self.router,
+                self.replay_delay,
+            ):
+                buffer.put(chunk)
+
+        producer = asyncio.create_task(produce())
+        producer.add_done_callback(
+            lambda task: buffer.close(None if task.cancelled() else task.exception())
+        )
+        finished = False
+        try:
+            chunks = []
+            try:
+                while (text := await buffer.get(self.heartbeat)) is not None:
+                    if text:
+                        chunks.append(text)
+                        yield sse_event("delta", {"text": text})
+                    else:
+                        yield ": keep-alive\n\n"
+            except Exception as e:
+                finished = True
+                self._failed += 1
+                logger.exception(f"Turn failed in session {session_id}: {e}")
+                release()
+                yield sse_event("error", {"detail": f"Error generating response: {e}"})
+                return
+
+            answer = "".join(chunks)
+            await asyncio.to_thread(
+                self.sessions.record_turn,
+                session_id,
+                [
+                    {"role": "user", "content": user_message},
+                    {"role": "assistant", "content": answer},
+                ],
+                turn_history,
+            )
+            finished = True
+            self._completed += 1
+            release()
+            yield sse_event("done", {"text": answer})
+        finally:
+            if not finished:
+                self._disconnected += 1
+                logger.info(f"Client left session {session_id} mid-turn; cancelled")
+            producer.cancel()
+            release()
+
+    def stats(self) -> ServerStats:
+        """Current counters."""
+        return ServerStats(
+            sessions=len(self.sessions),
+            active_turns=len(self._active),
+            max_turns=self.max_turns,
+            completed=self._completed,
+            disconnected=self._disconnected,
+            failed=self._failed,
+            rejected=self._rejected,
+        )
+
+
+class EventStreamResponse(StreamingResponse):
+    """Streams Server-Sent Events and stops as soon as the client leaves.
+
+    The stream is cancelled on the client's disconnect message rather than
+    on the next failed write, so a turn waiting on the model doesn't keep
+    running for a client that is gone. on_close runs however the response
+    ends, even if the stream never started.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self, events: AsyncIterator[str], on_close: Callable[[], None]
+    ) -> None:
+        """Create the response.
+
+        Args:
+            events: Encoded events to send
+            on_close: Called once the response is over
+        """
+        # Tell reverse proxies not to buffer the stream
+        super().__init__(
+            events,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            media_type=self.media_type,
+        )
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the events until they end or the client disconnects."""
+
+        async def stream() -> None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            async for event in self.body_iterator:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": event.encode(),
+                        "more_body": True,
+                    }
+                )
+            await send({"type": "http.response.body", "body": b""})
+
+        async def wait_for_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        streaming = asyncio.create_task(stream())
+        watching = asyncio.create_task(wait_for_disconnect())
+        try:
+            await asyncio.wait(
+                {streaming, watching}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            streaming.cancel()
+            watching.cancel()
+            try:
+                await streaming
+            except (asyncio.CancelledError, OSError):
+                # Client went away
+                pass
+            finally:
+                await self.body_iterator.aclose()
+                self.on_close()
+
+
+def _session_id(request: Request) -> str:
+    session_id = request.path_params["session_id"]
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        raise HTTPException(404, "Unknown session")
+    return session_id
+
+
+async def health(request: Request) -> JSONResponse:
+    """Liveness, knowledge base version and turn counters."""
+    service: ChatService = request.app.state.service
+    stats = service.stats()
+    return JSONResponse(
+        {
+            "status": "ok",
+            "knowledge_base": service.kb_watcher.current.version,
+            "sessions": stats.sessions,
+            "active_turns": stats.active_turns,
+            "max_turns": stats.max_turns,
+            "completed": stats.completed,
+            "disconnected": stats.disconnected,
+            "failed": stats.failed,
+            "rejected": stats.rejected,
+        }
+    )
+
+
+async def create_session(request: Request) -> JSONResponse:
+    """Assign an ID for a new conversation."""
+    return JSONResponse({"session_id": uuid.uuid4().hex}, status_code=201)
+
+
+async def get_session(request: Request) -> JSONResponse:
+    """The conversation's display messages."""
+    service: ChatService = request.app.state.service
+    session_id = _session_id(request)
+    session = await asyncio.to_thread(service.sessions.get, session_id)
+    return JSONResponse({"session_id": session_id, "messages": session.messages})
+
+
+async def delete_session(request: Request) -> Response:
+    """Forget the conversation."""
+    service: ChatService = request.app.state.service
+    session_id = _session_id(request)
+    if service.is_busy(session_id):
+        raise HTTPException(409, "A turn is running in this session")
+    await asyncio.to_thread(service.sessions.clear, session_id)
+    return Response(status_code=204)
+
+
+async def post_message(request: Request) -> Response:
+    """Answer a message, streaming the reply as Server-Sent Events."""
+    service: ChatService = request.app.state.service
+    session_id = _session_id(request)
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON") from None
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise HTTPException(400, 'Body must have a non-empty "message"')
+    if len(message) > MAX_MESSAGE_LENGTH:
+        raise HTTPException(
+            413, f"Messages are limited to {MAX_MESSAGE_LENGTH} characters"
+        )
+
+    try:
+        release = service.reserve(session_id)
+    except SessionBusyError as e:
+        raise HTTPException(409, str(e)) from None
+    except ServerBusyError as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "1"}) from None
+    return EventStreamResponse(
+        service.stream(session_id, message.strip(), release), on_close=release
+    )
+
+
+async def _http_error(request: Request, exc: Exception) -> JSONResponse:
+    assert isinstance(exc, HTTPException)
+    return JSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers
+    )
+
+
+def create_app(
+    service: ChatService,
+    lifespan: Callable[[Starlette], AbstractAsyncContextManager[None]] | None = None,
+) -> Starlette:
+    """Create the ASGI app serving a ChatService.
+
+    Args:
+        service: Runs the turns
+        lifespan: Optional lifespan context for shared resources
+
+    Returns:
+        Starlette application
+    """
+    app = Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/sessions", create_session, methods=["POST"]),
+            Route("/sessions/{session_id}", get_session, methods=["GET"]),
+            Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+            Route("/sessions/{session_id}/messages", post_message, methods=["POST"]),
+        ],
+        exception_handlers={HTTPException: _http_error},
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
+
+
+def create_service() -> ChatService:
+    """Build the chat service configured by the environment."""
+    kb_watcher = KnowledgeBaseWatcher()
+    kb = kb_watcher.current
+    logger.info(
+        f"Loaded {len(kb.services)} services, {len(kb.case_studies)} case studies"
+    )
+    # Tool results are shared by all sessions until the knowledge base reloads
+    tool_cache = ToolResultCache()
+    kb_watcher.add_listener(lambda _: tool_cache.clear())
+    agent = create_notch_agent(
+        kb,
+        tool_cache=tool_cache,
+        history_compactor=HistoryCompactor.from_env(),
+        tool_return_pruner=ToolReturnPruner(),
+        model=create_pooled_model(create_model_client()),
+    )
+    ttl = float(os.getenv("NOTCH_SESSION_TTL", DEFAULT_SESSION_TTL))
+    return ChatService(
+        agent,
+        kb_watcher,
+        SessionManager(SQLiteSessionStore(), ttl=ttl),
+        response_cache=FirstTurnCache.from_env(),
+        router=IntentRouter(),
+        max_turns=int(os.getenv("NOTCH_SERVER_MAX_TURNS", DEFAULT_MAX_TURNS)),
+        heartbeat=float(os.getenv("NOTCH_SERVER_HEARTBEAT", DEFAULT_HEARTBEAT)),
+    )
+
+
+@asynccontextmanager
+async def _serve(app: Starlette) -> AsyncIterator[None]:
+    """Start the shared tool resources on the server's loop, and stop them."""
+    service: ChatService = app.state.service
+    service.kb_watcher.start()
+    await open_app_client()
+    tools.pdf_render_pool = RenderPool.from_env()
+    tools.offer_deduplicator = OfferDeduplicator.from_env()
+    tools.mail_transport = transport_from_env()
+    tools.offer_outbox = OutboxSender(EmailOutbox(), tools.deliver_outbox_message)
+    await tools.offer_outbox.start()
+    try:
+        yield
+    finally:
+        # Send what is already due before the HTTP client goes away
+        await tools.offer_outbox.stop()
+        tools.offer_outbox.outbox.close()
+        await close_app_client()
+        tools.mail_transport.close()
+        tools.pdf_render_pool.shutdown()
+        if service.response_cache is not None:
+            service.response_cache.close()
+        service.kb_watcher.stop()
+
+
+def main() -> None:
+    """Run the Notch chat HTTP API."""
+    parser = argparse.ArgumentParser(
+        description="Serve the Notch chatbot over HTTP, streaming replies as SSE."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY not configured", file=sys.stderr)
+        sys.exit(1)
+    try:
+        service = create_service()
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    uvicorn.run(
+        create_app(service, lifespan=_serve),
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
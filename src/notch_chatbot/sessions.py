@@ -0,0 +1,264 @@
+"""Durable chat sessions with an in-memory working set."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
+
+logger = logging.getLogger(__name__)
+
+# Default database location, in the project root next to data/
+DEFAULT_SESSION_DB = Path(__file__).parent.parent.parent / ".sessions.sqlite3"
+
+DEFAULT_SESSION_TTL = 30 * 60
+
+
+@dataclass
+class Session:
+    """One conversation: what the UI shows and what the agent remembers.
+
+    Attributes:
+        session_id: Stable ID of the conversation
+        messages: Display messages, as {"role": ..., "content": ...} dicts
+        history: Agent message history to pass as message_history
+        last_access: time.monotonic() of the last use, for idle eviction
+    """
+
+    session_id: str
+    messages: list[dict[str, str]] = field(default_factory=list)
+    history: list[ModelMessage] = field(default_factory=list)
+    last_access: float = field(default_factory=time.monotonic)
+
+
+class SessionStore(ABC):
+    """Persistent storage for sessions.
+
+    Turns are stored as deltas: the display messages the turn added, and the
+    agent history from the first message that changed. History processors
+    can rewrite older messages, so a delta records how many stored messages
+    it keeps (`keep`) before appending its own.
+    """
+
+    @abstractmethod
+    def append_turn(
+        self,
+        session_id: str,
+        messages: list[dict[str, str]],
+        keep: int,
+        history: list[ModelMessage],
+    ) -> None:
+        """Record one turn.
+
+        Args:
+            session_id: Conversation the turn belongs to
+            messages: Display messages added by the turn
+            keep: Number of previously stored history messages still valid
+            history: History messages to append after the kept ones
+        """
+
+    @abstractmethod
+    def load(self, session_id: str) -> Session | None:
+        """Rebuild a session from its stored turns, or None if unknown."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget a session."""
+
+
+def _encode_history(history: list[ModelMessage]) -> bytes:
+    return zlib.compress(ModelMessagesTypeAdapter.dump_json(history), 1)
+
+
+def _decode_history(blob: bytes) -> list[ModelMessage]:
+    return ModelMessagesTypeAdapter.validate_json(zlib.decompress(blob))
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a local SQLite database.
+
+    Each turn is one appended row, so writing a turn costs the size of the
+    turn rather than of the whole conversation. A turn whose history was
+    rewritten from the start makes all earlier history rows obsolete; their
+    history is dropped so loads stay proportional to the live conversation.
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        """Open (and create if needed) the database.
+
+        Args:
+            path: Database file; defaults to NOTCH_SESSION_DB or
+                  .sessions.sqlite3 in the project root
+        """
+        if path is None:
+            path = os.getenv("NOTCH_SESSION_DB", DEFAULT_SESSION_DB)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_turns (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    messages TEXT NOT NULL,
+                    keep INTEGER NOT NULL,
+                    history BLOB,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                )
+                """
+            )
+
+    def append_turn(
+        self,
+        session_id: str,
+        messages: list[dict[str, str]],
+        keep: int,
+        history: list[ModelMessage],
+    ) -> None:
+        """Record one turn; see SessionStore.append_turn."""
+        row = (json.dumps(messages), keep, _encode_history(history), time.time())
+        with self._lock, self._conn:
+            if keep == 0:
+                self._conn.execute(
+                    "UPDATE session_turns SET history = NULL WHERE session_id = ?",
+                    (session_id,),
+                )
+            self._conn.execute(
+                """
+                INSERT INTO session_turns
+                    (session_id, seq, messages, keep, history, created_at)
+                SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ?, ?
+                FROM session_turns WHERE session_id = ?
+                """,
+                (session_id, *row, session_id),
+            )
+
+    def load(self, session_id: str) -> Session | None:
+        """Rebuild a session by replaying its turns in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT messages, keep, history FROM session_turns "
+                "WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        if not rows:
+            return None
+
+        session = Session(session_id)
+        for messages, keep, history in rows:
+            session.messages.extend(json.loads(messages))
+            if history is not None:
+                session.history = session.history[:keep] + _decode_history(history)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        """Forget a session."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM session_turns WHERE session_id = ?", (session_id,)
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _common_prefix(old: list[ModelMessage], new: list[ModelMessage]) -> int:
+    """Number of leading messages the two histories share."""
+    count = 0
+    for before, after in zip(old, new, strict=False):
+        if before is not after and before != after:
+            break
+        count += 1
+    return count
+
+
+class SessionManager:
+    """Keeps recently used sessions in memory on top of a SessionStore.
+
+    Sessions are loaded from the store on first use and evicted from memory
+    once idle for longer than the TTL; the store keeps them, so a returning
+    user gets their conversation back.
+    """
+
+    def __init__(self, store: SessionStore, ttl: float = DEFAULT_SESSION_TTL) -> None:
+        """Create an empty working set.
+
+        Args:
+            store: Durable storage for the sessions
+            ttl: Seconds a session may stay idle before it leaves memory
+        """
+        self._store = store
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: dict[str, Session] = {}
+
+    def get(self, session_id: str) -> Session:
+        """Return the session, loading it from the store if not in memory.
+
+        Unknown IDs get a new, empty session.
+        """
+        self.evict_idle()
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            session = self._store.load(session_id) or Session(session_id)
+            with self._lock:
+                session = self._sessions.setdefault(session_id, session)
+        session.last_access = time.monotonic()
+        return session
+
+    def record_turn(
+        self,
+        session_id: str,
+        messages: list[dict[str, str]],
+        history: list[ModelMessage],
+    ) -> None:
+        """Add a finished turn to the session and persist it.
+
+        Args:
+            session_id: Conversation the turn belongs to
+            messages: Display messages added by the turn
+            history: Full agent history after the turn (all_messages())
+        """
+        session = self.get(session_id)
+        keep = _common_prefix(session.history, history)
+        self._store.append_turn(session_id, messages, keep, history[keep:])
+        session.messages.extend(messages)
+        session.history = list(history)
+
+    def clear(self, session_id: str) -> None:
+        """Drop the conversation from memory and the store."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self._store.delete(session_id)
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than the TTL from memory.
+
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = time.monotonic() - self._ttl
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items() if s.last_access < cutoff]
+            for session_id in idle:
+                del self._sessions[session_id]
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle sessions from memory")
+        return len(idle)
+
+    def __len__(self) -> int:
+        """Number of sessions currently in memory."""
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,21 @@
+"""Offline token estimates for prompt size accounting."""
+
+import math
+
+# OpenAI's rule of thumb for English text and JSON: ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many model tokens a piece of text costs.
+
+    A character-count heuristic rather than a real tokenizer, so it works
+    offline and costs nothing; good enough for budgeting and comparisons.
+
+    Args:
+        text: Text that will be sent to the model
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
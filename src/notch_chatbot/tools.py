@@ -2,54 +2,76 @@
 
 import base64
 import logging
-import os
 from datetime import datetime
 
-import httpx
-from fpdf import FPDF
-from pydantic_ai import RunContext
-
-from .models import CaseStudy, KnowledgeBase, Service, UseCase
+from pydantic_ai import ModelRetry, RunContext
+
+from .blog import BlogFeed
+from .dedup import OfferDeduplicator, offer_key
+from .mail import EmailTransport, MailApiTransport
+from .models import (
+    CaseStudy,
+    CaseStudySummary,
+    KnowledgeBase,
+    Page,
+    Service,
+    ServiceSummary,
+    UseCase,
+)
+from .outbox import DeliveryError, OutboxMessage, OutboxSender, OutboxStatus
+from .proposal import default_template
+from .rendering import RenderPool
+from .search import tokenize
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Page size bounds for the listing tools
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+# Outbound endpoint used by the blog tool
+BLOG_URL = "https://www.wearenotch.com/resources/blog"
+
+# Blog index, cached for the whole process and revalidated in the background
+blog_feed = BlogFeed(BLOG_URL)
+
+# Proposal PDFs are rendered off the event loop; entry points replace this
+# with RenderPool.from_env() once .env is loaded
+pdf_render_pool = RenderPool()
+
+# Offer emails are sent through the mail API unless entry points replace
+# this with transport_from_env() (e.g. a pooled SMTP relay)
+mail_transport: EmailTransport = MailApiTransport()
+
+# Offers go through this outbox when entry points start one; without it
+# they are sent inline
+offer_outbox: OutboxSender | None = None
+
+# Repeated offers within the window return the first result; entry points
+# replace this with OfferDeduplicator.from_env()
+offer_deduplicator = OfferDeduplicator()
+
+# Words in a blog query that don't name a topic
+_GENERIC_BLOG_QUERY_TERMS = {"latest", "recent", "new", "blog", "post", "posts"}
+
 
 def find_services_by_keyword(
-    ctx: RunContext[KnowledgeBase], keywords: list[str]
+    ctx: RunContext[KnowledgeBase], keywords: list[str], top_k: int = 5
 ) -> list[Service]:
-    """Find services matching given keywords.
+    """Find the services that best match given keywords.
 
     Searches across service names, descriptions, and key features.
 
     Args:
         ctx: Agent context containing knowledge base
         keywords: List of keywords to search for
+        top_k: Maximum number of services to return
 
     Returns:
-        List of matching services
+        List of matching services, best match first
     """
-    kb = ctx.deps
-    matches = []
-    keywords_lower = [k.lower() for k in keywords]
-
-    for service in kb.services:
-        # Create searchable text
-        searchable = " ".join(
-            [
-                service.name,
-                service.description,
-                service.short_description,
-                *service.key_features,
-                *service.ideal_for,
-            ]
-        ).lower()
-
-        # Check if any keyword matches
-        if any(kw in searchable for kw in keywords_lower):
-            matches.append(service)
-
-    return matches
+    return ctx.deps.search_services(keywords, top_k)
 
 
 def find_services_by_category(
@@ -64,8 +86,7 @@ def find_services_by_category(
     Returns:
         List of services in the category
     """
-    kb = ctx.deps
-    return [s for s in kb.services if s.category.value == category.lower()]
+    return ctx.deps.services_in_category(category.lower())
 
 
 def find_case_studies_by_industry(
@@ -80,15 +101,8 @@ def find_case_studies_by_industry(
     Returns:
         List of case studies in that industry
     """
-    kb = ctx.deps
     industry_lower = industry.lower().replace(" ", "_")
-
-    matches = []
-    for cs in kb.case_studies:
-        if cs.industry.value == industry_lower:
-            matches.append(cs)
-
-    return matches
+    return ctx.deps.case_studies_in_industry(industry_lower)
 
 
 def find_case_studies_by_service(
@@ -103,55 +117,74 @@ def find_case_studies_by_service(
     Returns:
         List of case studies using that service
     """
-    kb = ctx.deps
-    return [cs for cs in kb.case_studies if service_id in cs.services_used]
+    return ctx.deps.case_studies_using_service(service_id)
 
 
 def find_similar_case_studies(
-    ctx: RunContext[KnowledgeBase], keywords: list[str]
+    ctx: RunContext[KnowledgeBase], keywords: list[str], top_k: int = 3
 ) -> list[CaseStudy]:
-    """Find case studies matching keywords in challenge, solution, or outcome.
+    """Find case studies similar to keywords in challenge, solution, or outcome.
+
+    Results are ranked by TF-IDF cosine similarity, so related wording
+    (e.g. "warehouse tracking" vs "real-time location tracking") still matches.
 
     Args:
         ctx: Agent context containing knowledge base
-        keywords: Keywords to search for
+        keywords: Keywords or short phrases describing the project
+        top_k: Maximum number of case studies to return
 
     Returns:
-        List of matching case studies
+        List of similar case studies, most similar first
     """
-    kb = ctx.deps
-    matches = []
-    keywords_lower = [k.lower() for k in keywords]
+    return ctx.deps.search_case_studies(keywords, top_k)
 
-    for cs in kb.case_studies:
-        # Create searchable text
-        searchable = " ".join(
-            [
-                cs.title,
-                cs.challenge,
-                cs.solution,
-                cs.outcome or "",
-                *cs.technologies,
-            ]
-        ).lower()
 
-        # Check if any keyword matches
-        if any(kw in searchable for kw in keywords_lower):
-            matches.append(cs)
+def get_all_case_studies(
+    ctx: RunContext[KnowledgeBase],
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page[CaseStudySummary]:
+    """Get a page of case study summaries (id, client, title, industry).
 
-    return matches
+    Use get_case_study_details for the full story of specific case studies.
 
+    Args:
+        ctx: Agent context containing knowledge base
+        cursor: next_cursor from the previous page; omit for the first page
+        limit: Maximum number of case studies per page
+
+    Returns:
+        Page of case study summaries
+    """
+    kb = ctx.deps
+    try:
+        case_studies, next_cursor = kb.page_case_studies(
+            cursor, _clamp_page_size(limit)
+        )
+    except KeyError:
+        raise ModelRetry(
+            f"Unknown cursor {cursor!r}; omit it to start from the first page"
+        ) from None
+    return Page[CaseStudySummary](
+        items=[CaseStudySummary.from_case_study(cs) for cs in case_studies],
+        total=len(kb.case_studies),
+        next_cursor=next_cursor,
+    )
 
-def get_all_case_studies(ctx: RunContext[KnowledgeBase]) -> list[CaseStudy]:
-    """Get all available case studies.
+
+def get_case_study_details(
+    ctx: RunContext[KnowledgeBase], case_study_ids: list[str]
+) -> list[CaseStudy]:
+    """Get full details (challenge, solution, outcome, quote) of case studies.
 
     Args:
         ctx: Agent context containing knowledge base
+        case_study_ids: IDs of the case studies, as returned by other tools
 
     Returns:
-        List of all case studies
+        List of case studies; unknown IDs are skipped
     """
-    return ctx.deps.case_studies
+    return ctx.deps.case_studies_by_id(case_study_ids)
 
 
 def find_use_cases_by_domain(
@@ -166,10 +199,24 @@ def find_use_cases_by_domain(
     Returns:
         List of use cases in that domain
     """
-    kb = ctx.deps
     domain_lower = domain.lower().replace(" ", "_")
+    return ctx.deps.use_cases_in_domain(domain_lower)
 
-    return [uc for uc in kb.use_cases if uc.domain.value == domain_lower]
+
+def find_use_cases_by_keyword(
+    ctx: RunContext[KnowledgeBase], keywords: list[str], top_k: int = 3
+) -> list[UseCase]:
+    """Find use cases matching keywords in title, problem, or solution.
+
+    Args:
+        ctx: Agent context containing knowledge base
+        keywords: Keywords to search for
+        top_k: Maximum number of use cases to return
+
+    Returns:
+        List of matching use cases, best match first
+    """
+    return ctx.deps.search_use_cases(keywords, top_k)
 
 
 def get_expertise_description(
@@ -188,16 +235,56 @@ def get_expertise_description(
     return kb.expertise_domains.get(domain)
 
 
-def list_all_services(ctx: RunContext[KnowledgeBase]) -> list[Service]:
-    """List all available services.
+def list_all_services(
+    ctx: RunContext[KnowledgeBase],
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page[ServiceSummary]:
+    """List a page of service summaries (id, name, category, short description).
+
+    Use get_service_details for features, timelines and URLs of specific
+    services.
+
+    Args:
+        ctx: Agent context containing knowledge base
+        cursor: next_cursor from the previous page; omit for the first page
+        limit: Maximum number of services per page
+
+    Returns:
+        Page of service summaries
+    """
+    kb = ctx.deps
+    try:
+        services, next_cursor = kb.page_services(cursor, _clamp_page_size(limit))
+    except KeyError:
+        raise ModelRetry(
+            f"Unknown cursor {cursor!r}; omit it to start from the first page"
+        ) from None
+    return Page[ServiceSummary](
+        items=[ServiceSummary.from_service(s) for s in services],
+        total=len(kb.services),
+        next_cursor=next_cursor,
+    )
+
+
+def get_service_details(
+    ctx: RunContext[KnowledgeBase], service_ids: list[str]
+) -> list[Service]:
+    """Get full details (description, key features, ideal clients, URL) of services.
 
     Args:
         ctx: Agent context containing knowledge base
+        service_ids: IDs of the services, as returned by other tools
 
     Returns:
-        List of all services
+        List of services; unknown IDs are skipped
     """
-    return ctx.deps.services
+    return ctx.deps.services_by_id(service_ids)
+
+
+def _clamp_page_size(limit: int) -> int:
+    """Keep a model-chosen page size within sensible bounds."""
+    return max(1, min(limit, MAX_PAGE_SIZE))
 
 
 def list_available_industries(ctx: RunContext[KnowledgeBase]) -> list[str]:
@@ -209,7 +296,7 @@ def list_available_industries(ctx: RunContext[KnowledgeBase]) -> list[str]:
     Returns:
         List of industry names
     """
-    return sorted({cs.industry.value for cs in ctx.deps.case_studies})
+    return ctx.deps.industries
 
 
 async def fetch_latest_blog_posts(
@@ -225,24 +312,26 @@ async def fetch_latest_blog_posts(
         Formatted string with blog post information
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.wearenotch.com/resources/blog",
-                timeout=10.0,
-                follow_redirects=True,
-            )
-            response.raise_for_status()
-
-            # Simple extraction - in production you'd want proper HTML parsing
-            # response.text contains the HTML content
-
-            # Return a note that this is available
-            return (
-                "Blog posts are available at https://www.wearenotch.com/resources/blog. "
-                "The blog covers topics in AI, software development, best practices, and case studies."
-            )
+        posts = await blog_feed.get_posts()
     except Exception as e:
-        return f"Unable to fetch blog posts at this time. Visit https://www.wearenotch.com/resources/blog for latest content. Error: {str(e)}"
+        return f"Unable to fetch blog posts at this time. Visit {BLOG_URL} for latest content. Error: {str(e)}"
+
+    if not posts:
+        return f"No blog posts could be found right now. Visit {BLOG_URL} for latest content."
+
+    # Prefer posts about the topic asked for; otherwise the latest ones
+    topic = set(tokenize(query)) - _GENERIC_BLOG_QUERY_TERMS
+    if topic:
+        on_topic = [p for p in posts if topic & set(tokenize(p.search_text()))]
+        posts = on_topic or posts
+
+    lines = [f"Posts from the Notch blog ({BLOG_URL}):"]
+    for number, post in enumerate(posts[:max_results], start=1):
+        published = f" ({post.published})" if post.published else ""
+        lines.append(f"{number}. {post.title}{published} - {post.url}")
+        if post.summary:
+            lines.append(f"   {post.summary}")
+    return "\n".join(lines)
 
 
 async def create_and_send_offer(
@@ -264,25 +353,64 @@ async def create_and_send_offer(
     Returns:
         Success or error message
     """
+    key = offer_key(client_email, project_description, services_list, project_scope)
+    return await offer_deduplicator.run(
+        key,
+        lambda: _create_and_send_offer(
+            client_name,
+            client_email,
+            project_description,
+            services_list,
+            project_scope,
+            key,
+        ),
+    )
+
+
+async def _create_and_send_offer(
+    client_name: str,
+    client_email: str,
+    project_description: str,
+    services_list: str,
+    project_scope: str,
+    key: str,
+) -> tuple[str, bool]:
+    """Render the proposal and send (or queue) the email.
+
+    The offer key doubles as the email's idempotency key, so the outbox
+    queues an offer once however often (or across however many restarts)
+    it is requested.
+
+    Returns:
+        The tool result, and whether the offer was sent or queued
+    """
     logger.info(
         f"Starting offer creation for {client_name} ({client_email}), scope: {project_scope}"
     )
 
     try:
-        # Create PDF
-        pdf_base64 = _generate_proposal_pdf(
-            client_name, client_email, project_description, services_list, project_scope
+        # Create PDF on a render worker, so other sessions keep streaming
+        pdf_base64 = await pdf_render_pool.run(
+            _generate_proposal_pdf,
+            client_name,
+            client_email,
+            project_description,
+            services_list,
+            project_scope,
         )
 
         # Prepare email data
         email_data = _format_proposal_email(client_name, client_email, pdf_base64)
 
-        # Send email
-        return await _send_email_via_sendgrid(email_data, client_email, client_name)
+        # Queue the email if a sender is running, so the turn doesn't wait
+        # on the mail API; otherwise send it now
+        if offer_outbox is not None and offer_outbox.running:
+            return _queue_offer_email(email_data, client_email, client_name, key)
+        return await _send_offer_email(email_data, client_email, client_name, key)
 
     except Exception as e:
         logger.exception(f"Exception while creating/sending offer: {e}")
-        return f"Error sending offer email: {str(e)}"
+        return f"Error sending offer email: {str(e)}", False
 
 
 def _generate_proposal_pdf(
@@ -294,131 +422,9 @@ def _generate_proposal_pdf(
 ) -> str:
     """Generate a PDF proposal and return it as a base64 string."""
     logger.info("Generating PDF proposal...")
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-
-    # Header with Notch branding
-    pdf.set_font("Arial", "B", 24)
-    pdf.set_text_color(0, 102, 204)  # Blue color for branding
-    pdf.cell(0, 10, "NOTCH", ln=True, align="C")
-    pdf.set_font("Arial", "I", 10)
-    pdf.set_text_color(100, 100, 100)
-    pdf.cell(0, 5, "Software Development & AI Solutions", ln=True, align="C")
-    pdf.ln(10)
-
-    # Date
-    pdf.set_font("Arial", "", 10)
-    pdf.set_text_color(0, 0, 0)
-    pdf.cell(0, 5, f"Date: {datetime.now().strftime('%B %d, %Y')}", ln=True)
-    pdf.ln(5)
-
-    # Client information
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 7, "Proposal For:", ln=True)
-    pdf.set_font("Arial", "", 11)
-    pdf.cell(0, 6, f"{client_name}", ln=True)
-    pdf.cell(0, 6, f"{client_email}", ln=True)
-    pdf.ln(10)
-
-    # Project overview
-    pdf.set_font("Arial", "B", 14)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 8, "Project Overview", ln=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", "", 11)
-    pdf.multi_cell(0, 6, project_description)
-    pdf.ln(5)
-
-    # Recommended services
-    pdf.set_font("Arial", "B", 14)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 8, "Recommended Services", ln=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", "", 11)
-    pdf.multi_cell(0, 6, services_list)
-    pdf.ln(5)
-
-    # Team composition
-    pdf.set_font("Arial", "B", 14)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 8, "Team Composition", ln=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", "", 11)
-    pdf.multi_cell(
-        0,
-        6,
-        "Your project will be handled by a dedicated team including:\n"
-        "- Project Manager\n"
-        "- Senior Software Engineers\n"
-        "- UI/UX Designer\n"
-        "- QA Specialist\n"
-        "- DevOps Engineer (as needed)",
-    )
-    pdf.ln(5)
-
-    # Pricing estimate
-    pdf.set_font("Arial", "B", 14)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 8, "Investment Estimate", ln=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", "", 11)
-
-    # Determine pricing based on scope
-    pricing_info = {
-        "small": "Starting from $15,000 - $35,000",
-        "medium": "Typical range: $35,000 - $100,000 depending on scope",
-        "large": "Starting from $100,000+ depending on requirements",
-    }
-
-    pricing_text = pricing_info.get(project_scope.lower(), pricing_info["medium"])
-    pdf.multi_cell(
-        0,
-        6,
-        f"{pricing_text}\n\n"
-        "Final pricing will be determined based on detailed requirements, "
-        "timeline, and project complexity. We'll provide a detailed breakdown "
-        "after our initial consultation call.",
-    )
-    pdf.ln(5)
-
-    # Next steps
-    pdf.set_font("Arial", "B", 14)
-    pdf.set_text_color(0, 102, 204)
-    pdf.cell(0, 8, "Next Steps", ln=True)
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Arial", "", 11)
-    pdf.multi_cell(
-        0,
-        6,
-        "1. Review this proposal\n"
-        "2. Schedule a consultation call to discuss details\n"
-        "3. Receive detailed project plan and final quote\n"
-        "4. Project kickoff and development",
-    )
-    pdf.ln(10)
-
-    # Disclaimer
-    pdf.set_font("Arial", "I", 9)
-    pdf.set_text_color(100, 100, 100)
-    pdf.multi_cell(
-        0,
-        5,
-        "IMPORTANT: This proposal is for orientational purposes only and does not "
-        "constitute a binding offer. Final terms, pricing, and deliverables will be "
-        "confirmed in a formal contract following detailed requirements analysis.",
+    pdf_bytes = default_template().render(
+        client_name, client_email, project_description, services_list, project_scope
     )
-    pdf.ln(5)
-
-    # Footer
-    pdf.set_y(-30)
-    pdf.set_font("Arial", "", 9)
-    pdf.set_text_color(100, 100, 100)
-    pdf.cell(0, 5, "Notch Software Development", ln=True, align="C")
-    pdf.cell(0, 5, "www.wearenotch.com", ln=True, align="C")
-
-    # Get PDF as bytes (output returns bytes/bytearray directly)
-    pdf_bytes = pdf.output(dest="S")
     pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
     logger.info(f"PDF generated successfully ({len(pdf_base64)} bytes base64)")
     return pdf_base64
@@ -483,47 +489,86 @@ def _format_proposal_email(
     }
 
 
-async def _send_email_via_sendgrid(
-    email_data: dict, client_email: str, client_name: str
-) -> str:
-    """Send the email using SendGrid API."""
-    sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
+def _queue_offer_email(
+    email_data: dict,
+    client_email: str,
+    client_name: str,
+    idempotency_key: str | None = None,
+) -> tuple[str, bool]:
+    """Put the offer email in the outbox and report it as on its way.
+
+    An email already queued under the idempotency key is not queued again;
+    its state is reported instead.
+    """
+    missing = mail_transport.missing_config()
+    if missing:
+        logger.error(missing)
+        return f"Error: {missing}", False
 
-    if not sendgrid_api_key:
-        error_msg = "SENDGRID_API_KEY not configured"
-        logger.error(error_msg)
+    message = offer_outbox.enqueue(
+        email_data, client_email, client_name, idempotency_key
+    )
+    if message.status == OutboxStatus.FAILED:
         return (
-            "Error: SENDGRID_API_KEY not configured. Please set up SendGrid API key "
-            "in environment variables. Get one at https://sendgrid.com (free tier: 100 emails/day)"
-        )
+            f"Error: this offer to {client_email} could not be delivered "
+            f"earlier ({message.last_error}; reference {message.message_id})."
+        ), False
+    if message.status == OutboxStatus.SENT:
+        return (
+            f"✓ This offer was already sent to {client_email} "
+            f"(reference {message.message_id})."
+        ), True
+    logger.info(f"Queued offer email {message.message_id} to {client_email}")
+    return (
+        f"✓ Offer queued for {client_email}! {client_name} should receive it "
+        f"shortly (reference {message.message_id})."
+    ), True
+
+
+async def deliver_outbox_message(message: OutboxMessage) -> None:
+    """Send one outbox message; see send_offer_email."""
+    await send_offer_email(message.payload, message.idempotency_key)
 
-    # SendGrid API endpoint
-    url = "https://api.sendgrid.com/v3/mail/send"
-
-    # Send email via SendGrid
-    logger.info(f"Sending email to {client_email} via SendGrid...")
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            json=email_data,
-            headers={
-                "Authorization": f"Bearer {sendgrid_api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
-        )
 
-        if response.status_code == 202:
-            logger.info(
-                f"✓ Email sent successfully to {client_email} from proposals@wearenotch.com (Status: {response.status_code})"
-            )
-            return f"✓ Offer sent successfully to {client_email}! {client_name} should receive it shortly."
-        else:
-            error_msg = (
-                f"SendGrid error - Status {response.status_code}: {response.text}"
-            )
-            logger.error(error_msg)
-            return (
-                f"Error sending email: Status {response.status_code} - {response.text}"
-            )
+async def send_offer_email(
+    email_data: dict, idempotency_key: str | None = None
+) -> None:
+    """Send one email through the configured mail transport.
+
+    Args:
+        email_data: Mail API request body, from _format_proposal_email()
+        idempotency_key: Identifies the email across retries
+
+    Raises:
+        DeliveryError: If the email was not accepted; rate limits, server
+                       errors and network failures are retryable
+    """
+    await mail_transport.send(email_data, idempotency_key)
+
+
+async def _send_offer_email(
+    email_data: dict,
+    client_email: str,
+    client_name: str,
+    idempotency_key: str | None = None,
+) -> tuple[str, bool]:
+    """Send the email now and report the outcome, and whether it was sent."""
+    missing = mail_transport.missing_config()
+    if missing:
+        logger.error(missing)
+        return f"Error: {missing}", False
+
+    logger.info(f"Sending email to {client_email} via {mail_transport.name}...")
+    try:
+        await mail_transport.send(email_data, idempotency_key)
+    except DeliveryError as e:
+        logger.error(f"{mail_transport.name} error - {e}")
+        return f"Error sending email: {e}", False
+
+    logger.info(
+        f"✓ Email sent successfully to {client_email} from proposals@wearenotch.com"
+    )
+    return (
+        f"✓ Offer sent successfully to {client_email}! {client_name} should "
+        "receive it shortly."
+    ), True
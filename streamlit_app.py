@@ -1,15 +1,35 @@
 """Streamlit UI for Notch Chatbot."""
 
-import asyncio
 import logging
 import os
 import sys
+import uuid
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from src.notch_chatbot.agent import create_notch_agent
-from src.notch_chatbot.knowledge_base import load_knowledge_base
+from src.notch_chatbot import tools
+from src.notch_chatbot.agent import (
+    create_model_client,
+    create_notch_agent,
+    create_pooled_model,
+)
+from src.notch_chatbot.cache import ToolResultCache
+from src.notch_chatbot.dedup import OfferDeduplicator
+from src.notch_chatbot.history import HistoryCompactor, ToolReturnPruner
+from src.notch_chatbot.http_client import close_app_client, open_app_client
+from src.notch_chatbot.mail import transport_from_env
+from src.notch_chatbot.outbox import EmailOutbox, OutboxSender, OutboxStatus
+from src.notch_chatbot.reload import KnowledgeBaseWatcher
+from src.notch_chatbot.rendering import RenderPool
+from src.notch_chatbot.responses import FirstTurnCache, stream_turn
+from src.notch_chatbot.router import IntentRouter
+from src.notch_chatbot.runner import AsyncRunner
+from src.notch_chatbot.sessions import (
+    DEFAULT_SESSION_TTL,
+    SessionManager,
+    SQLiteSessionStore,
+)
 
 # Configure logging to show in terminal
 logging.basicConfig(
@@ -60,20 +80,109 @@ st.markdown(
 )
 
 
-@st.cache_resource
+def release_chatbot(chatbot):
+    """Shut down what load_chatbot() started when its cache entry is released."""
+    _, kb_watcher, _, _, async_runner = chatbot
+    kb_watcher.stop()
+    async_runner.run(tools.offer_outbox.stop())
+    tools.offer_outbox.outbox.close()
+    async_runner.run(close_app_client())
+    async_runner.stop()
+    tools.mail_transport.close()
+    tools.pdf_render_pool.shutdown()
+
+
+@st.cache_resource(on_release=release_chatbot)
 def load_chatbot():
-    """Load knowledge base and create agent (cached)."""
+    """Load knowledge base and create agent (cached).
+
+    The knowledge base is wrapped in a watcher that reloads it in the
+    background when data/ changes, so live sessions pick up edits without
+    a restart.
+
+    All agent runs execute on one background event loop and share one
+    connection-pooled OpenAI client, so connections (and TLS sessions) are
+    reused across turns and sessions. Tool I/O (blog, email) shares one
+    application-scoped HTTP client opened on that loop, and offer emails are
+    delivered from a durable outbox by a sender running there.
+    """
     logger.info("Loading knowledge base from data/ directory...")
-    kb = load_knowledge_base()
+    kb_watcher = KnowledgeBaseWatcher()
+    kb = kb_watcher.current
     logger.info(
         f"Knowledge base loaded: {len(kb.services)} services, {len(kb.case_studies)} case studies"
     )
 
     logger.info("Creating Notch agent...")
-    agent = create_notch_agent(kb)
+    # Tool results are shared by all sessions until the knowledge base reloads
+    tool_cache = ToolResultCache()
+    kb_watcher.add_listener(lambda _: tool_cache.clear())
+    # Each session's stale tool results are shrunk and its history condensed
+    # once it outgrows its token budget
+    history_processors = (ToolReturnPruner(), HistoryCompactor.from_env())
+    tool_return_pruner, history_compactor = history_processors
+    async_runner = AsyncRunner()
+    async_runner.run(open_app_client())
+    # Proposal PDFs render on workers so other sessions keep streaming
+    tools.pdf_render_pool = RenderPool.from_env()
+    # The model sometimes repeats the offer call; repeats reuse the result
+    tools.offer_deduplicator = OfferDeduplicator.from_env()
+    # Offer emails go out through the mail API or a pooled SMTP relay,
+    # queued and sent in the background, with retries
+    tools.mail_transport = transport_from_env()
+    tools.offer_outbox = OutboxSender(EmailOutbox(), tools.deliver_outbox_message)
+    async_runner.run(tools.offer_outbox.start())
+    agent = create_notch_agent(
+        kb,
+        tool_cache=tool_cache,
+        history_compactor=history_compactor,
+        tool_return_pruner=tool_return_pruner,
+        model=create_pooled_model(create_model_client()),
+    )
     logger.info("Agent created successfully")
 
-    return agent, kb
+    kb_watcher.start()
+    return agent, kb_watcher, tool_cache, history_processors, async_runner
+
+
+@st.cache_resource
+def load_session_manager():
+    """Open the session store shared by all browser sessions (cached).
+
+    Conversations are persisted to SQLite turn by turn, so they survive
+    restarts; idle ones are only kept in memory for NOTCH_SESSION_TTL seconds.
+    """
+    ttl = float(os.getenv("NOTCH_SESSION_TTL", DEFAULT_SESSION_TTL))
+    return SessionManager(SQLiteSessionStore(), ttl=ttl)
+
+
+@st.cache_resource
+def load_response_cache():
+    """Open the first-turn response cache shared by all browser sessions (cached).
+
+    Answers to opening questions are replayed to later visitors who ask the
+    same thing, without a model call; they persist across restarts.
+    """
+    return FirstTurnCache.from_env()
+
+
+@st.cache_resource
+def load_intent_router():
+    """Create the router answering catalogue questions locally (cached)."""
+    return IntentRouter()
+
+
+def get_session_id():
+    """Get the conversation ID from the URL, assigning a new one if missing.
+
+    Keeping it in the query string lets a reload or a returning visitor with
+    the same link resume the conversation.
+    """
+    session_id = st.query_params.get("session")
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id
+    return session_id
 
 
 def get_api_key():
@@ -91,16 +200,18 @@ def get_api_key():
     return api_key
 
 
-async def stream_response(agent, kb, user_message, message_history):
-    """Stream response from agent."""
-    async with agent.run_stream(
-        user_message, deps=kb, message_history=message_history
-    ) as response:
-        async for chunk in response.stream_text(delta=True):
-            yield chunk
+async def stream_response(
+    agent, kb, user_message, message_history, on_complete, response_cache, router
+):
+    """Stream response from agent, the router or the first-turn cache.
 
-        # Store updated history
-        st.session_state.pydantic_history = response.new_messages()
+    on_complete is called with the whole (compacted) conversation once the
+    response has finished streaming.
+    """
+    async for chunk in stream_turn(
+        agent, kb, user_message, message_history, on_complete, response_cache, router
+    ):
+        yield chunk
 
 
 def main():
@@ -131,9 +242,11 @@ def main():
     # Set API key in environment for the agent
     os.environ["OPENAI_API_KEY"] = api_key
 
-    # Check for SendGrid API key (optional)
+    # Check for an SMTP relay or SendGrid API key (optional)
     sendgrid_key = os.getenv("SENDGRID_API_KEY")
-    if sendgrid_key:
+    if os.getenv("NOTCH_MAIL_TRANSPORT") == "smtp":
+        logger.info("SMTP relay configured - email proposals enabled")
+    elif sendgrid_key:
         logger.info("SendGrid API key found - email proposals enabled")
     else:
         logger.warning(
@@ -144,20 +257,25 @@ def main():
     try:
         logger.info("Loading knowledge base and agent...")
         with st.spinner("Loading Notch knowledge base..."):
-            agent, kb = load_chatbot()
+            agent, kb_watcher, tool_cache, history_processors, async_runner = (
+                load_chatbot()
+            )
+            session_manager = load_session_manager()
+            response_cache = load_response_cache()
+            router = load_intent_router()
         logger.info("Chatbot loaded successfully")
     except Exception as e:
         logger.exception(f"Failed to load chatbot: {e}")
         st.error(f"Failed to load chatbot: {str(e)}")
         st.stop()
 
-    # Initialize session state for chat messages
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-        st.session_state.pydantic_history = []
+    # Load this conversation (from memory, or from the store after a restart
+    # or a long idle period)
+    session_id = get_session_id()
+    session = session_manager.get(session_id)
 
     # Display chat messages from history
-    for message in st.session_state.messages:
+    for message in session.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
@@ -167,9 +285,6 @@ def main():
     ):
         logger.info(f"User message received: {prompt[:100]}...")  # Log first 100 chars
 
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
-
         # Display user message
         with st.chat_message("user"):
             st.markdown(prompt)
@@ -183,26 +298,38 @@ def main():
             try:
                 logger.info("Starting agent response stream...")
 
-                # Create async generator and run it
-                async def collect_response():
-                    response_text = ""
-                    async for chunk in stream_response(
-                        agent, kb, prompt, st.session_state.pydantic_history
-                    ):
-                        response_text += chunk
-                        message_placeholder.markdown(response_text + "▌")
-                    message_placeholder.markdown(response_text)
-                    return response_text
-
-                # Run async function and get final response
-                full_response = asyncio.run(collect_response())
+                # Each turn runs against the latest knowledge base
+                kb = kb_watcher.current
+
+                # Run the agent on the shared event loop and render chunks
+                # as they are handed back to this script thread
+                turn_history = []
+                for chunk in async_runner.stream(
+                    stream_response(
+                        agent,
+                        kb,
+                        prompt,
+                        session.history,
+                        turn_history.extend,
+                        response_cache,
+                        router,
+                    )
+                ):
+                    full_response += chunk
+                    message_placeholder.markdown(full_response + "▌")
+                message_placeholder.markdown(full_response)
                 logger.info(
                     f"Agent response complete ({len(full_response)} chars): {full_response[:100]}..."
                 )
 
-                # Add assistant response to chat history
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": full_response}
+                # Add the turn to the conversation and persist it
+                session_manager.record_turn(
+                    session_id,
+                    [
+                        {"role": "user", "content": prompt},
+                        {"role": "assistant", "content": full_response},
+                    ],
+                    turn_history,
                 )
 
             except Exception as e:
@@ -232,11 +359,49 @@ def main():
         st.divider()
 
         st.markdown("**Stats:**")
-        st.metric("Messages", len(st.session_state.messages))
+        st.metric("Messages", len(session.messages))
+        cache_stats = tool_cache.stats()
+        st.metric(
+            "Tool cache hit rate",
+            f"{cache_stats.hit_rate:.0%}",
+            help=f"{cache_stats.hits} hits, {cache_stats.misses} misses, "
+            f"{cache_stats.size} cached results",
+        )
+        router_stats = router.stats()
+        st.metric(
+            "Answered locally",
+            f"{router_stats.coverage:.0%}",
+            help=f"{router_stats.routed} of "
+            f"{router_stats.routed + router_stats.passed} messages answered "
+            "from the knowledge base without the model, "
+            f"{router_stats.mean_latency * 1000:.2f}ms per message",
+        )
+        response_stats = response_cache.stats()
+        st.metric(
+            "First-turn cache hit rate",
+            f"{response_stats.hit_rate:.0%}",
+            help=f"{response_stats.hits} hits, {response_stats.misses} misses, "
+            f"{response_stats.seconds_saved:.1f}s of model time saved",
+        )
+        pruning_stats, compaction_stats = (p.stats() for p in history_processors)
+        st.metric(
+            "History tokens saved",
+            pruning_stats.tokens_saved + compaction_stats.tokens_saved,
+            help=f"{pruning_stats.tokens_saved} from pruning stale tool results, "
+            f"{compaction_stats.tokens_saved} from {compaction_stats.compactions} "
+            "history compactions",
+        )
+
+        outbox_counts = tools.offer_outbox.outbox.counts()
+        st.metric(
+            "Offer emails queued",
+            outbox_counts[OutboxStatus.PENDING] + outbox_counts[OutboxStatus.SENDING],
+            help=f"{outbox_counts[OutboxStatus.SENT]} sent, "
+            f"{outbox_counts[OutboxStatus.FAILED]} failed",
+        )
 
         if st.button("🔄 Clear Chat"):
-            st.session_state.messages = []
-            st.session_state.pydantic_history = []
+            session_manager.clear(session_id)
             st.rerun()
 
         st.divider()
@@ -29,3 +29,28 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if "email" in item.keywords:
             item.add_marker(skip_email)
+
+
+@pytest.fixture(scope="session")
+def kb():
+    """Knowledge base loaded from the shipped data/ directory."""
+    from notch_chatbot.knowledge_base import load_knowledge_base
+
+    return load_knowledge_base()
+
+
+@pytest.fixture
+def ctx(kb):
+    """Minimal stand-in for the agent RunContext used by knowledge base tools."""
+    from types import SimpleNamespace
+
+    return SimpleNamespace(deps=kb)
+
+
+@pytest.fixture(autouse=True)
+def fresh_offer_deduplicator(monkeypatch):
+    """Keep offers sent by one test from deduplicating another test's."""
+    from notch_chatbot import tools
+    from notch_chatbot.dedup import OfferDeduplicator
+
+    monkeypatch.setattr(tools, "offer_deduplicator", OfferDeduplicator())
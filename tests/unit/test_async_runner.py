@@ -0,0 +1,156 @@
+"""Unit tests for the background event loop runner."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.openai import OpenAIChatModel
+
+from notch_chatbot.agent import (
+    create_model_client,
+    create_notch_agent,
+    create_pooled_model,
+)
+from notch_chatbot.runner import AsyncRunner
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncRunner()
+    yield runner
+    runner.stop()
+
+
+async def count(n, delay=0.0):
+    for i in range(n):
+        await asyncio.sleep(delay)
+        yield i
+
+
+class TestAsyncRunner:
+    """Test running and streaming on the shared loop."""
+
+    def test_run_returns_result(self, runner):
+        async def add(a, b):
+            return a + b
+
+        assert runner.run(add(1, 2)) == 3
+
+    def test_every_call_uses_the_same_loop(self, runner):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        loops = {runner.run(current_loop()) for _ in range(3)}
+        assert loops == {runner.loop}
+
+    def test_stream_yields_in_order(self, runner):
+        assert list(runner.stream(count(5))) == [0, 1, 2, 3, 4]
+
+    def test_stream_reraises_after_earlier_items(self, runner):
+        async def failing():
+            yield "a"
+            raise ValueError("boom")
+
+        received = []
+        with pytest.raises(ValueError, match="boom"):
+            for item in runner.stream(failing()):
+                received.append(item)
+        assert received == ["a"]
+
+    def test_stopping_early_closes_the_iterator(self, runner):
+        closed = threading.Event()
+
+        async def endless():
+            try:
+                while True:
+                    yield 1
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.set()
+
+        for _ in runner.stream(endless()):
+            break
+        assert closed.wait(timeout=2)
+
+    def test_cancelling_the_pump_ends_the_stream(self, runner):
+        def cancel_tasks():
+            for task in asyncio.all_tasks(runner.loop):
+                task.cancel()
+
+        outcome = []
+
+        def consume():
+            try:
+                for item in runner.stream(count(100, delay=0.01)):
+                    if item == 0:
+                        runner.loop.call_soon_threadsafe(cancel_tasks)
+            except asyncio.CancelledError:
+                outcome.append("cancelled")
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        thread.join(timeout=2)
+        assert outcome == ["cancelled"]
+
+    def test_concurrent_streams_from_many_threads(self, runner):
+        results = {}
+
+        def consume(key):
+            results[key] = list(runner.stream(count(10, delay=0.001)))
+
+        threads = [threading.Thread(target=consume, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(items == list(range(10)) for items in results.values())
+        assert len(results) == 8
+
+
+class TestPooledModel:
+    """Test the shared model client."""
+
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def test_model_uses_the_given_client(self):
+        client = create_model_client()
+        model = create_pooled_model(client)
+        assert isinstance(model, OpenAIChatModel)
+        assert model.client._client is client
+
+    def test_agent_streams_through_runner(self, runner, kb):
+        async def stream_model(messages, info: AgentInfo):
+            for word in ("Hello", " from", " Notch"):
+                yield word
+
+        async def chunks():
+            async with agent.run_stream("hi", deps=kb) as response:
+                async for chunk in response.stream_text(delta=True):
+                    yield chunk
+
+        agent = create_notch_agent(
+            kb, model=FunctionModel(stream_function=stream_model)
+        )
+        assert "".join(runner.stream(chunks())) == "Hello from Notch"
+
+    def test_client_is_reused_across_turns(self, runner):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"ok": True})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def fetch():
+            return (await client.get("https://api.example.com/")).json()
+
+        # Before the runner, asyncio.run() per turn would leave the pool bound
+        # to a closed loop; on the shared loop the same client keeps working
+        assert [runner.run(fetch()) for _ in range(3)] == [{"ok": True}] * 3
+        assert len(requests) == 3
+        runner.run(client.aclose())
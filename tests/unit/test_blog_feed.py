@@ -0,0 +1,210 @@
+"""Unit tests for blog index parsing and the cached blog feed."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from notch_chatbot import tools
+from notch_chatbot.blog import BlogFeed, parse_blog_index
+
+BLOG_INDEX = """
+<html><body>
+<nav>
+  <ul>
+    <li><a href="/resources/blog">Blog</a></li>
+    <li><a href="/services">Services</a></li>
+    <li><a href="/resources/blog/category/ai">AI</a></li>
+  </ul>
+</nav>
+<main>
+  <article class="card">
+    <a href="/resources/blog/agentic-ai-in-practice"><img src="a.png" alt=""></a>
+    <time datetime="2025-11-04">Nov 4, 2025</time>
+    <h3><a href="/resources/blog/agentic-ai-in-practice">Agentic AI in practice</a></h3>
+    <p>What we learned shipping AI agents to &amp; for enterprise clients.</p>
+  </article>
+  <article class="card">
+    <time>Oct 20, 2025</time>
+    <h3><a href="/resources/blog/okta-migration-guide#top">Okta migration
+        guide</a></h3>
+    <p>Moving identity to Okta without downtime.</p>
+  </article>
+  <a href="https://example.com/resources/blog/elsewhere">Off-site post</a>
+  <a href="/resources/blog?page=2">Older posts</a>
+</main>
+</body></html>
+"""
+
+BASE_URL = "https://www.wearenotch.com/resources/blog"
+
+
+class TestParseBlogIndex:
+    """Test extraction of posts from the index HTML."""
+
+    def test_extracts_posts_in_page_order(self):
+        posts = parse_blog_index(BLOG_INDEX, BASE_URL)
+        assert [(p.title, p.url) for p in posts] == [
+            (
+                "Agentic AI in practice",
+                "https://www.wearenotch.com/resources/blog/agentic-ai-in-practice",
+            ),
+            (
+                "Okta migration guide",
+                "https://www.wearenotch.com/resources/blog/okta-migration-guide",
+            ),
+        ]
+
+    def test_card_date_and_summary(self):
+        first, second = parse_blog_index(BLOG_INDEX, BASE_URL)
+        assert first.published == "2025-11-04"
+        assert first.summary == (
+            "What we learned shipping AI agents to & for enterprise clients."
+        )
+        assert second.published == "Oct 20, 2025"
+
+    def test_page_without_posts(self):
+        assert parse_blog_index("<html><p>Coming soon</p></html>", BASE_URL) == []
+
+
+class _BlogHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        server.release.wait(timeout=5)
+        if server.fail:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.html.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", server.etag)
+        self.send_header("Last-Modified", "Tue, 04 Nov 2025 10:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def blog_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BlogHandler)
+    server.requests = []
+    server.html = BLOG_INDEX
+    server.etag = '"v1"'
+    server.fail = False
+    server.release = threading.Event()
+    server.release.set()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def blog_url(blog_server):
+    return f"http://127.0.0.1:{blog_server.server_port}/resources/blog"
+
+
+async def settle(feed):
+    """Wait for a background refresh to finish."""
+    if feed._refresh_task is not None:
+        await feed._refresh_task
+
+
+class TestBlogFeed:
+    """Test caching and background revalidation against a local server."""
+
+    async def test_first_call_fetches_and_later_calls_are_cached(
+        self, blog_server, blog_url
+    ):
+        feed = BlogFeed(blog_url)
+        first = await feed.get_posts()
+        second = await feed.get_posts()
+        assert [p.title for p in first] == [
+            "Agentic AI in practice",
+            "Okta migration guide",
+        ]
+        assert second == first
+        assert len(blog_server.requests) == 1
+
+    async def test_stale_posts_are_served_while_revalidating(
+        self, blog_server, blog_url
+    ):
+        feed = BlogFeed(blog_url, ttl=0)
+        posts = await feed.get_posts()
+
+        blog_server.release.clear()
+        blog_server.html = "<article><a href='/resources/blog/new'>New</a></article>"
+        blog_server.etag = '"v2"'
+        # Returns the cached posts without waiting on the slow server
+        assert await asyncio.wait_for(feed.get_posts(), timeout=1) == posts
+
+        blog_server.release.set()
+        await settle(feed)
+        assert [p.title for p in await feed.get_posts()] == ["New"]
+
+    async def test_revalidation_sends_validators(self, blog_server, blog_url):
+        feed = BlogFeed(blog_url, ttl=0)
+        posts = await feed.get_posts()
+        await feed.get_posts()
+        await settle(feed)
+
+        revalidation = blog_server.requests[-1]
+        assert revalidation["If-None-Match"] == '"v1"'
+        assert revalidation["If-Modified-Since"] == "Tue, 04 Nov 2025 10:00:00 GMT"
+        # 304 keeps the cached posts
+        assert await feed.get_posts() == posts
+
+    async def test_failed_refresh_keeps_cached_posts(self, blog_server, blog_url):
+        feed = BlogFeed(blog_url, ttl=0)
+        posts = await feed.get_posts()
+
+        blog_server.fail = True
+        await feed.get_posts()
+        await settle(feed)
+        assert await feed.get_posts() == posts
+
+    async def test_failed_first_fetch_raises(self, blog_server, blog_url):
+        blog_server.fail = True
+        with pytest.raises(httpx.HTTPStatusError):
+            await BlogFeed(blog_url).get_posts()
+
+
+class TestFetchLatestBlogPostsTool:
+    """Test the agent tool on top of the feed."""
+
+    @pytest.fixture(autouse=True)
+    def _local_feed(self, blog_server, blog_url, monkeypatch):
+        monkeypatch.setattr(tools, "blog_feed", BlogFeed(blog_url))
+
+    async def test_lists_latest_posts(self):
+        result = await tools.fetch_latest_blog_posts(max_results=1)
+        assert "1. Agentic AI in practice (2025-11-04)" in result
+        assert "What we learned shipping AI agents" in result
+        assert "Okta" not in result
+
+    async def test_query_prefers_matching_posts(self):
+        result = await tools.fetch_latest_blog_posts("okta", max_results=1)
+        assert "1. Okta migration guide" in result
+
+    async def test_fetch_error_is_reported(self, blog_server):
+        blog_server.fail = True
+        result = await tools.fetch_latest_blog_posts()
+        assert result.startswith("Unable to fetch blog posts")
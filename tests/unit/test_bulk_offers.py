@@ -0,0 +1,209 @@
+"""Unit tests for bulk proposal sending."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from notch_chatbot.bulk import (
+    FAILED,
+    SENT,
+    Lead,
+    RateLimiter,
+    ResultLog,
+    load_leads,
+    send_bulk_offers,
+)
+from notch_chatbot.outbox import DeliveryError
+
+LEADS = [
+    {
+        "client_name": f"Lead {n}",
+        "client_email": f"lead{n}@example.com",
+        "project_description": "Inventory app with demand forecasting",
+        "services_list": "Custom Software Development",
+        "project_scope": "small",
+    }
+    for n in range(5)
+]
+
+
+class InlinePool:
+    """Render pool stand-in that skips the PDF."""
+
+    def __init__(self):
+        self.renders = 0
+
+    async def run(self, func, *args):
+        self.renders += 1
+        return "cGRm"
+
+
+class FakeSend:
+    """Records sends; can fail given addresses or hold sends open."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.errors = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, email_data, idempotency_key):
+        recipient = email_data["personalizations"][0]["to"][0]["email"]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors.get(recipient):
+                raise self.errors[recipient].pop(0)
+            self.sent.append(recipient)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def leads():
+    return [Lead.model_validate(row) for row in LEADS]
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ResultLog(tmp_path / "results.jsonl")
+    yield log
+    log.close()
+
+
+async def send_all(leads, log, send, **kwargs):
+    kwargs.setdefault("rate", 0)
+    kwargs.setdefault("retry_delay", 0)
+    return await send_bulk_offers(leads, log, InlinePool(), send=send, **kwargs)
+
+
+class TestLoadLeads:
+    """Test reading lead files."""
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "leads.csv"
+        path.write_text(
+            "client_name,client_email,project_description,services_list\n"
+            'Jane,jane@example.com,"Inventory app, with forecasting",AI\n'
+        )
+        (lead,) = load_leads(path)
+        assert lead.client_email == "jane@example.com"
+        assert lead.project_description == "Inventory app, with forecasting"
+        assert lead.project_scope == "medium"
+
+    def test_jsonl_skips_blank_lines(self, tmp_path):
+        path = tmp_path / "leads.jsonl"
+        path.write_text("\n".join(json.dumps(row) for row in LEADS[:2]) + "\n\n")
+        assert [lead.client_name for lead in load_leads(path)] == ["Lead 0", "Lead 1"]
+
+    def test_invalid_lead_names_its_line(self, tmp_path):
+        path = tmp_path / "leads.csv"
+        path.write_text(
+            "client_name,client_email,project_description,services_list\n"
+            "Jane,jane@example.com,App,AI\n"
+            "John,not-an-email,App,AI\n"
+        )
+        with pytest.raises(ValueError, match="leads.csv line 3"):
+            load_leads(path)
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / "leads.xlsx"
+        path.write_text("")
+        with pytest.raises(ValueError, match="Unsupported"):
+            load_leads(path)
+
+
+class TestSendBulkOffers:
+    """Test rendering and sending to a list of leads."""
+
+    async def test_sends_every_lead_and_records_it(self, leads, log):
+        send = FakeSend()
+        report = await send_all(leads, log, send)
+        assert sorted(send.sent) == [lead["client_email"] for lead in LEADS]
+        assert (report.total, report.sent, report.failed) == (5, 5, 0)
+        lines = log.path.read_text().splitlines()
+        assert {json.loads(line)["status"] for line in lines} == {SENT}
+
+    async def test_rerun_resumes_after_recorded_leads(self, leads, tmp_path):
+        path = tmp_path / "results.jsonl"
+        first = ResultLog(path)
+        await send_all(leads[:2], first, FakeSend())
+        first.close()
+
+        send = FakeSend()
+        resumed = ResultLog(path)
+        report = await send_all(leads, resumed, send)
+        resumed.close()
+        assert sorted(send.sent) == [f"lead{n}@example.com" for n in range(2, 5)]
+        assert (report.skipped, report.sent) == (2, 3)
+
+    async def test_dry_run_does_not_block_the_real_run(self, leads, tmp_path):
+        path = tmp_path / "results.jsonl"
+        preview = ResultLog(path)
+        send = FakeSend()
+        report = await send_all(leads, preview, send, dry_run=True)
+        preview.close()
+        assert (report.sent, send.sent) == (5, [])
+        assert path.read_text() == ""
+
+        real = ResultLog(path)
+        report = await send_all(leads, real, send)
+        real.close()
+        assert (report.skipped, report.sent) == (0, 5)
+        assert len(send.sent) == 5
+
+    async def test_rejected_lead_is_recorded_as_failed(self, leads, log):
+        send = FakeSend()
+        send.errors["lead1@example.com"] = [DeliveryError("Bad address", False)]
+        report = await send_all(leads, log, send)
+        assert (report.sent, report.failed) == (4, 1)
+        assert log.results[leads[1].key].status == FAILED
+        assert log.results[leads[1].key].detail == "Bad address"
+
+    async def test_retryable_errors_are_retried(self, leads, log):
+        send = FakeSend()
+        send.errors["lead0@example.com"] = [DeliveryError("503"), DeliveryError("429")]
+        report = await send_all(leads[:1], log, send, attempts=3)
+        assert report.sent == 1
+
+    async def test_failed_leads_are_resent_only_when_asked(self, leads, log):
+        send = FakeSend()
+        send.errors["lead0@example.com"] = [DeliveryError("Bad address", False)]
+        await send_all(leads, log, send)
+
+        assert (await send_all(leads, log, send)).skipped == 5
+        report = await send_all(leads, log, send, retry_failed=True)
+        assert (report.skipped, report.sent) == (4, 1)
+        assert log.results[leads[0].key].status == SENT
+
+    async def test_duplicate_leads_are_sent_once(self, leads, log):
+        send = FakeSend()
+        report = await send_all([leads[0], leads[0]], log, send)
+        assert send.sent == ["lead0@example.com"]
+        assert (report.duplicates, report.skipped) == (1, 0)
+
+    async def test_concurrency_is_bounded(self, leads, log):
+        send = FakeSend(delay=0.02)
+        await send_all(leads, log, send, concurrency=2)
+        assert send.max_in_flight == 2
+
+
+class TestRateLimiter:
+    """Test spacing of calls."""
+
+    async def test_calls_are_spaced_out(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(6)))
+        # The first call goes at once, the other five 20 ms apart
+        assert time.monotonic() - start >= 0.09
+
+    async def test_zero_rate_is_unlimited(self):
+        limiter = RateLimiter(0)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(100)))
+        assert time.monotonic() - start < 0.05
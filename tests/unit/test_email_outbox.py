@@ -0,0 +1,334 @@
+"""Unit tests for the email outbox and its background sender."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from notch_chatbot import tools
+from notch_chatbot.dedup import OfferDeduplicator
+from notch_chatbot.http_client import app_http_client
+from notch_chatbot.mail import MailApiTransport
+from notch_chatbot.outbox import (
+    DeliveryError,
+    EmailOutbox,
+    OutboxSender,
+    OutboxStatus,
+)
+
+
+class _MailHandler(BaseHTTPRequestHandler):
+    """Fake mail API: answers with scripted statuses, drops repeated keys."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(server.delay)
+        key = self.headers.get("Idempotency-Key")
+        status = server.statuses.pop(0) if server.statuses else 202
+        server.requests.append(key)
+        if status == 202 and key not in server.delivered:
+            server.delivered[key] = body
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mail_api(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MailHandler)
+    server.statuses = []
+    server.requests = []
+    server.delivered = {}
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v3/mail"
+    monkeypatch.setattr(tools, "mail_transport", MailApiTransport(url))
+    monkeypatch.setenv("SENDGRID_API_KEY", "test-key")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = EmailOutbox(tmp_path / "outbox.sqlite3")
+    yield outbox
+    outbox.close()
+
+
+@pytest.fixture
+async def sender(outbox, mail_api):
+    sender = OutboxSender(
+        outbox, tools.deliver_outbox_message, base_delay=0.01, poll_interval=0.05
+    )
+    async with app_http_client():
+        await sender.start()
+        yield sender
+        await sender.stop()
+
+
+async def wait_for_status(outbox, message_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (message := outbox.get(message_id)).status != status:
+        assert time.monotonic() < deadline, f"still {message.status}"
+        await asyncio.sleep(0.01)
+    return message
+
+
+class TestEmailOutbox:
+    """Test the SQLite queue."""
+
+    def test_enqueue_and_get(self, outbox):
+        message = outbox.enqueue({"subject": "Hi"}, "a@b.com", "A")
+        assert outbox.get(message.message_id) == message
+        assert message.status == OutboxStatus.PENDING
+        assert message.payload == {"subject": "Hi"}
+
+    def test_same_idempotency_key_is_queued_once(self, outbox):
+        first = outbox.enqueue({"n": 1}, "a@b.com", idempotency_key="offer-1")
+        second = outbox.enqueue({"n": 2}, "a@b.com", idempotency_key="offer-1")
+        assert second == first
+        assert outbox.counts()[OutboxStatus.PENDING] == 1
+
+    def test_claim_skips_messages_backing_off(self, outbox):
+        ready = outbox.enqueue({}, "a@b.com")
+        later = outbox.enqueue({}, "c@d.com")
+        outbox.mark_retry(later.message_id, "503", time.time() + 60)
+        claimed = outbox.claim_due(10)
+        assert [m.message_id for m in claimed] == [ready.message_id]
+        assert claimed[0].status == OutboxStatus.SENDING
+        assert claimed[0].attempts == 1
+
+    def test_claims_in_progress_survive_reopening(self, tmp_path):
+        path = tmp_path / "outbox.sqlite3"
+        outbox = EmailOutbox(path)
+        message = outbox.enqueue({}, "a@b.com")
+        outbox.claim_due(10)
+
+        other = EmailOutbox(path)
+        assert other.get(message.message_id).status == OutboxStatus.SENDING
+        assert other.claim_due(10) == []
+        other.close()
+        outbox.close()
+
+    def test_expired_claims_are_claimed_again(self, tmp_path):
+        path = tmp_path / "outbox.sqlite3"
+        outbox = EmailOutbox(path)
+        message = outbox.enqueue({}, "a@b.com")
+        now = time.time()
+        outbox.claim_due(10, now=now)
+        outbox.close()
+
+        reopened = EmailOutbox(path, claim_lease=60)
+        assert reopened.claim_due(10, now=now + 30) == []
+        (reclaimed,) = reopened.claim_due(10, now=now + 61)
+        assert reclaimed.message_id == message.message_id
+        assert reclaimed.attempts == 2
+        reopened.close()
+
+    def test_expired_claims_handed_to_the_transport_are_failed(self, tmp_path):
+        path = tmp_path / "outbox.sqlite3"
+        outbox = EmailOutbox(path)
+        message = outbox.enqueue({}, "a@b.com")
+        now = time.time()
+        outbox.claim_due(10, now=now)
+        outbox.mark_handed(message.message_id)
+        outbox.close()
+
+        reopened = EmailOutbox(path, claim_lease=60)
+        assert reopened.claim_due(10, now=now + 61) == []
+        failed = reopened.get(message.message_id)
+        assert failed.status == OutboxStatus.FAILED
+        assert "Interrupted while sending" in failed.last_error
+        reopened.close()
+
+    def test_retry_clears_the_handed_mark(self, outbox):
+        message = outbox.enqueue({}, "a@b.com")
+        now = time.time()
+        outbox.claim_due(10, now=now)
+        outbox.mark_handed(message.message_id)
+        outbox.mark_retry(message.message_id, "503", now)
+        outbox.claim_due(10, now=now)
+        (reclaimed,) = outbox.claim_due(10, now=now + outbox.claim_lease + 1)
+        assert reclaimed.attempts == 3
+
+    def test_concurrent_outboxes_never_claim_the_same_message(self, tmp_path):
+        path = tmp_path / "outbox.sqlite3"
+        outboxes = [EmailOutbox(path) for _ in range(4)]
+        queued = {outboxes[0].enqueue({}, f"{n}@b.com").message_id for n in range(200)}
+        claimed = []
+        start = threading.Barrier(len(outboxes))
+
+        def claim(outbox):
+            start.wait()
+            while batch := outbox.claim_due(3):
+                claimed.extend(message.message_id for message in batch)
+
+        threads = [threading.Thread(target=claim, args=(o,)) for o in outboxes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for outbox in outboxes:
+            outbox.close()
+        assert sorted(claimed) == sorted(queued)
+
+    def test_outbox_without_claim_times_is_migrated(self, tmp_path):
+        path = tmp_path / "outbox.sqlite3"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE outbox (message_id TEXT PRIMARY KEY, "
+                "idempotency_key TEXT NOT NULL UNIQUE, recipient TEXT NOT NULL, "
+                "recipient_name TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL NOT NULL, last_error TEXT, "
+                "created_at REAL NOT NULL, sent_at REAL)"
+            )
+            conn.execute(
+                "INSERT INTO outbox VALUES "
+                "('m1', 'k1', 'a@b.com', '', '{}', 'sending', 1, 0, NULL, 0, NULL)"
+            )
+        conn.close()
+
+        outbox = EmailOutbox(path)
+        # Left sending by the old version, which requeued it on open
+        (message,) = outbox.claim_due(10)
+        assert (message.message_id, message.attempts) == ("m1", 2)
+        outbox.close()
+
+    def test_find_and_counts(self, outbox):
+        outbox.enqueue({}, "a@b.com")
+        sent = outbox.enqueue({}, "a@b.com")
+        outbox.mark_sent(sent.message_id)
+        assert len(outbox.find("a@b.com")) == 2
+        counts = outbox.counts()
+        assert counts[OutboxStatus.PENDING] == 1
+        assert counts[OutboxStatus.SENT] == 1
+        assert counts[OutboxStatus.FAILED] == 0
+
+
+class TestOutboxSender:
+    """Test background delivery against a fake mail API."""
+
+    async def test_delivers_queued_message(self, sender, outbox, mail_api):
+        message = sender.enqueue({"subject": "Offer"}, "a@b.com", "A")
+        sent = await wait_for_status(outbox, message.message_id, OutboxStatus.SENT)
+        assert sent.sent_at is not None
+        assert mail_api.delivered == {message.idempotency_key: {"subject": "Offer"}}
+
+    async def test_transient_errors_are_retried(self, sender, outbox, mail_api):
+        mail_api.statuses = [503, 429]
+        message = sender.enqueue({}, "a@b.com")
+        sent = await wait_for_status(outbox, message.message_id, OutboxStatus.SENT)
+        assert sent.attempts == 3
+        # Every attempt carried the same key
+        assert mail_api.requests == [message.idempotency_key] * 3
+
+    async def test_rejected_message_fails_without_retry(self, sender, outbox, mail_api):
+        mail_api.statuses = [400]
+        message = sender.enqueue({}, "a@b.com")
+        failed = await wait_for_status(outbox, message.message_id, OutboxStatus.FAILED)
+        assert failed.attempts == 1
+        assert "400" in failed.last_error
+
+    async def test_gives_up_after_max_attempts(self, sender, outbox, mail_api):
+        sender.max_attempts = 2
+        mail_api.statuses = [503] * 5
+        message = sender.enqueue({}, "a@b.com")
+        failed = await wait_for_status(outbox, message.message_id, OutboxStatus.FAILED)
+        assert failed.attempts == 2
+
+    async def test_stop_drains_due_messages(self, outbox, mail_api):
+        sender = OutboxSender(outbox, tools.deliver_outbox_message, poll_interval=60)
+        await sender.start()
+        messages = [outbox.enqueue({}, f"lead{n}@b.com") for n in range(6)]
+        await sender.stop()
+        assert all(
+            outbox.get(m.message_id).status == OutboxStatus.SENT for m in messages
+        )
+
+    async def test_backoff_grows_and_is_capped(self, outbox):
+        sender = OutboxSender(outbox, tools.deliver_outbox_message, max_delay=8)
+        delays = [sender._backoff(attempt) for attempt in range(1, 8)]
+        assert 1 <= delays[0] <= 2
+        assert 4 <= delays[2] <= 8
+        assert all(delay <= 8 for delay in delays)
+
+    async def test_send_error_is_recorded(self, outbox):
+        async def send(message):
+            raise DeliveryError("relay down")
+
+        sender = OutboxSender(outbox, send, base_delay=60)
+        message = outbox.enqueue({}, "a@b.com")
+        await sender.start()
+        await sender.stop()
+        retry = outbox.get(message.message_id)
+        assert retry.status == OutboxStatus.PENDING
+        assert retry.last_error == "relay down"
+        assert retry.next_attempt_at > time.time()
+
+
+class TestQueuedOffers:
+    """Test create_and_send_offer with the outbox running."""
+
+    @pytest.fixture(autouse=True)
+    def _use_outbox(self, sender, monkeypatch):
+        monkeypatch.setattr(tools, "offer_outbox", sender)
+
+    async def test_offer_returns_before_the_mail_api_answers(self, outbox, mail_api):
+        mail_api.delay = 1.0
+        start = time.monotonic()
+        result = await tools.create_and_send_offer(
+            "Jane Smith", "jane@example.com", "Inventory app", "AI", "small"
+        )
+        assert time.monotonic() - start < 0.5
+        assert "✓ Offer queued for jane@example.com" in result
+
+        (message,) = outbox.find("jane@example.com")
+        assert message.message_id in result
+        sent = await wait_for_status(outbox, message.message_id, OutboxStatus.SENT)
+        attachment = mail_api.delivered[sent.idempotency_key]["attachments"][0]
+        assert attachment["type"] == "application/pdf"
+
+    async def test_repeat_after_restart_is_not_sent_again(
+        self, outbox, mail_api, tmp_path, monkeypatch
+    ):
+        offer = ("Jane Smith", "jane@example.com", "Inventory app", "AI", "small")
+        await tools.create_and_send_offer(*offer)
+        (message,) = outbox.find("jane@example.com")
+        await wait_for_status(outbox, message.message_id, OutboxStatus.SENT)
+
+        # A restart: nothing in memory, the same outbox database
+        reopened = EmailOutbox(tmp_path / "outbox.sqlite3")
+        sender = OutboxSender(reopened, tools.deliver_outbox_message)
+        monkeypatch.setattr(tools, "offer_outbox", sender)
+        monkeypatch.setattr(tools, "offer_deduplicator", OfferDeduplicator())
+        await sender.start()
+        result = await tools.create_and_send_offer(*offer)
+        await sender.stop()
+        assert (
+            f"already sent to jane@example.com (reference {message.message_id})"
+            in result
+        )
+        assert reopened.find("jane@example.com") == [outbox.get(message.message_id)]
+        assert mail_api.requests == [message.idempotency_key]
+        reopened.close()
+
+    async def test_missing_key_is_reported_without_queueing(self, outbox, monkeypatch):
+        monkeypatch.delenv("SENDGRID_API_KEY")
+        result = await tools.create_and_send_offer(
+            "Jane Smith", "jane@example.com", "Inventory app", "AI", "small"
+        )
+        assert "SENDGRID_API_KEY not configured" in result
+        assert outbox.find("jane@example.com") == []
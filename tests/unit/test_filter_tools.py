@@ -0,0 +1,56 @@
+"""Unit tests for the knowledge base filter tools and their lookup indexes."""
+
+from notch_chatbot.tools import (
+    find_case_studies_by_industry,
+    find_case_studies_by_service,
+    find_services_by_category,
+    find_use_cases_by_domain,
+    list_available_industries,
+)
+
+
+class TestFilterTools:
+    """Each filter tool must agree with a linear scan of the knowledge base."""
+
+    def test_services_by_category(self, ctx, kb):
+        for category in ("plan", "design", "build", "integrate"):
+            expected = [s for s in kb.services if s.category.value == category]
+            assert find_services_by_category(ctx, category) == expected
+        assert find_services_by_category(ctx, "BUILD") == find_services_by_category(
+            ctx, "build"
+        )
+
+    def test_case_studies_by_industry(self, ctx, kb):
+        for industry in {cs.industry.value for cs in kb.case_studies}:
+            expected = [cs for cs in kb.case_studies if cs.industry.value == industry]
+            assert find_case_studies_by_industry(ctx, industry) == expected
+
+    def test_industry_names_are_normalized(self, ctx):
+        assert find_case_studies_by_industry(
+            ctx, "Workforce Management"
+        ) == find_case_studies_by_industry(ctx, "workforce_management")
+
+    def test_case_studies_by_service(self, ctx, kb):
+        for service in kb.services:
+            expected = [cs for cs in kb.case_studies if service.id in cs.services_used]
+            assert find_case_studies_by_service(ctx, service.id) == expected
+
+    def test_use_cases_by_domain(self, ctx, kb):
+        for domain in {uc.domain.value for uc in kb.use_cases}:
+            expected = [uc for uc in kb.use_cases if uc.domain.value == domain]
+            assert find_use_cases_by_domain(ctx, domain) == expected
+
+    def test_unknown_keys_return_empty(self, ctx):
+        assert find_services_by_category(ctx, "unknown") == []
+        assert find_case_studies_by_industry(ctx, "space travel") == []
+        assert find_case_studies_by_service(ctx, "no-such-service") == []
+        assert find_use_cases_by_domain(ctx, "hr") == []
+
+    def test_list_available_industries(self, ctx, kb):
+        assert list_available_industries(ctx) == sorted(
+            {cs.industry.value for cs in kb.case_studies}
+        )
+
+    def test_results_are_copies(self, ctx):
+        find_services_by_category(ctx, "build").clear()
+        assert find_services_by_category(ctx, "build")
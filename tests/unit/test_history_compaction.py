@@ -0,0 +1,260 @@
+"""Unit tests for token-budgeted conversation history compaction."""
+
+import pytest
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.history import (
+    PRUNED_MARKER,
+    SUMMARY_HEADER,
+    HistoryCompactor,
+    ToolReturnPruner,
+    conversation_tokens,
+    split_turns,
+)
+
+
+def make_turn(index, with_tool=False, size=400):
+    """One user turn, optionally with a tool call/return pair."""
+    messages = [ModelRequest(parts=[UserPromptPart(f"question {index} " + "q" * size)])]
+    if with_tool:
+        messages += [
+            ModelResponse(
+                parts=[ToolCallPart("list_all_services", {}, f"call-{index}")]
+            ),
+            ModelRequest(
+                parts=[ToolReturnPart("list_all_services", "r" * size, f"call-{index}")]
+            ),
+        ]
+    messages.append(ModelResponse(parts=[TextPart(f"answer {index} " + "a" * size)]))
+    return messages
+
+
+def make_history(turns, with_tool=False, size=400):
+    """Conversation of completed turns followed by a new user prompt."""
+    messages = []
+    for index in range(turns):
+        messages += make_turn(index, with_tool, size)
+    messages.append(ModelRequest(parts=[UserPromptPart("latest question")]))
+    messages[0] = ModelRequest(parts=[SystemPromptPart("system"), *messages[0].parts])
+    return messages
+
+
+class TestSplitTurns:
+    """Test turn boundaries."""
+
+    def test_tool_pairs_stay_in_their_turn(self):
+        turns = split_turns(make_history(2, with_tool=True))
+        assert [len(turn) for turn in turns] == [4, 4, 1]
+
+
+class TestHistoryCompactor:
+    """Test compaction of over-budget histories."""
+
+    def test_under_budget_is_untouched(self):
+        messages = make_history(2)
+        compactor = HistoryCompactor(token_budget=10_000)
+        assert compactor(messages) is messages
+        assert compactor.stats().compactions == 0
+
+    def test_over_budget_keeps_recent_turns_verbatim(self):
+        messages = make_history(10, with_tool=True)
+        compactor = HistoryCompactor(token_budget=1000, keep_recent_turns=3)
+
+        compacted = compactor(messages)
+
+        assert conversation_tokens(compacted) <= 1000
+        assert compacted[-1] is messages[-1]
+        # The previous turn survives intact, tool call and return included
+        assert compacted[-5:-1] == messages[-5:-1]
+
+    def test_system_prompt_and_summary_lead_the_history(self):
+        compacted = HistoryCompactor(token_budget=1000)(make_history(10))
+
+        first = compacted[0].parts
+        assert first[0].content == "system"
+        assert first[1].content.startswith(SUMMARY_HEADER)
+        assert isinstance(first[2], UserPromptPart)
+
+    def test_summary_rolls_forward(self):
+        compactor = HistoryCompactor(token_budget=1000, keep_recent_turns=2)
+        compacted = compactor(make_history(10, with_tool=True))
+        summary = compacted[0].parts[1].content
+        assert "(Looked up: list_all_services)" in summary
+
+        # The next compaction folds more turns into the same summary part
+        history = [
+            *compacted,
+            ModelResponse(parts=[TextPart("latest answer")]),
+            *make_turn(10, size=2000),
+            ModelRequest(parts=[UserPromptPart("newest question")]),
+        ]
+        again = compactor(history)
+        summaries = [
+            part
+            for part in again[0].parts
+            if isinstance(part, SystemPromptPart)
+            and part.content.startswith(SUMMARY_HEADER)
+        ]
+        assert len(summaries) == 1
+        assert "latest question" in summaries[0].content
+
+    def test_reports_tokens_saved(self):
+        messages = make_history(10)
+        compactor = HistoryCompactor(token_budget=1000)
+        compacted = compactor(messages)
+
+        stats = compactor.stats()
+        saved = conversation_tokens(messages) - conversation_tokens(compacted)
+        assert stats.compactions == 1
+        assert stats.tokens_saved == stats.last_tokens_saved == saved > 0
+
+    def test_single_oversized_turn_is_kept(self):
+        messages = make_history(0)
+        messages[0].parts.append(UserPromptPart("x" * 10_000))
+        assert HistoryCompactor(token_budget=100)(messages) is messages
+
+
+def tool_turn(index, payload, tool_name="list_all_services"):
+    """One user turn that calls a tool and answers from its result."""
+    call_id = f"call-{index}"
+    return [
+        ModelRequest(parts=[UserPromptPart(f"question {index}")]),
+        ModelResponse(parts=[ToolCallPart(tool_name, {}, call_id)]),
+        ModelRequest(parts=[ToolReturnPart(tool_name, payload, call_id)]),
+        ModelResponse(parts=[TextPart(f"answer {index}")]),
+    ]
+
+
+def tool_returns(messages):
+    return [
+        part
+        for message in messages
+        for part in message.parts
+        if isinstance(part, ToolReturnPart)
+    ]
+
+
+PAGE = (
+    '{"items": ['
+    + ", ".join(f'{{"id": "service-{i}", "name": "{"x" * 80}"}}' for i in range(10))
+    + '], "total": 10, "next_cursor": null}'
+)
+
+
+class TestToolReturnPruner:
+    """Test pruning of stale tool results."""
+
+    def test_stale_large_result_becomes_reference(self):
+        messages = [*tool_turn(0, PAGE), *tool_turn(1, "small"), *make_history(0)]
+        pruned = ToolReturnPruner(keep_recent_turns=2)(messages)
+
+        old, recent = tool_returns(pruned)
+        assert old.content.startswith(PRUNED_MARKER)
+        assert "10 records: service-0, service-1" in old.content
+        # The call ID is kept, so the call still has its return
+        assert old.tool_call_id == "call-0"
+        assert recent.content == "small"
+        # The assistant reply that stated the facts is untouched
+        assert pruned[3] is messages[3]
+
+    def test_recent_turns_stay_intact(self):
+        messages = [*tool_turn(0, PAGE), *make_history(0)]
+        assert ToolReturnPruner(keep_recent_turns=2)(messages) is messages
+
+    def test_small_unique_results_are_kept(self):
+        messages = [*tool_turn(0, '["fintech"]'), *tool_turn(1, "x"), *make_history(0)]
+        assert ToolReturnPruner(keep_recent_turns=1)(messages) is messages
+
+    def test_older_duplicates_point_to_latest_copy(self):
+        payload = str([f"industry {i}" for i in range(30)])
+        messages = [
+            *tool_turn(0, payload, "list_available_industries"),
+            *tool_turn(1, payload, "list_available_industries"),
+            *make_history(0),
+        ]
+        pruned = ToolReturnPruner(keep_recent_turns=2)(messages)
+
+        first, latest = tool_returns(pruned)
+        assert "Same list_available_industries result" in first.content
+        assert latest.content == payload
+
+    def test_is_idempotent_and_reports_savings(self):
+        pruner = ToolReturnPruner(keep_recent_turns=1)
+        messages = [*tool_turn(0, PAGE), *make_history(0)]
+        pruned = pruner(messages)
+        assert pruner(pruned) is pruned
+
+        stats = pruner.stats()
+        saved = conversation_tokens(messages) - conversation_tokens(pruned)
+        assert stats.compactions == 1
+        assert stats.tokens_saved == saved > 0
+
+
+class TestAgentIntegration:
+    """Test the compactor registered as an agent history processor."""
+
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def test_model_sees_compacted_history(self, kb):
+        seen = []
+
+        def model(messages, info: AgentInfo):
+            seen.append(messages)
+            return ModelResponse(parts=[TextPart("reply " + "z" * 2000)])
+
+        compactor = HistoryCompactor(token_budget=1500, keep_recent_turns=2)
+        agent = create_notch_agent(kb, history_compactor=compactor)
+
+        history = []
+        for turn in range(6):
+            result = agent.run_sync(
+                f"turn {turn}",
+                deps=kb,
+                message_history=history,
+                model=FunctionModel(model),
+            )
+            history = result.all_messages()
+
+        assert compactor.stats().compactions > 0
+        assert conversation_tokens(seen[-1]) <= 1500
+        # The system prompt is never dropped
+        assert isinstance(seen[-1][0].parts[0], SystemPromptPart)
+        assert "Notch" in seen[-1][0].parts[0].content
+
+    def test_stale_tool_results_are_pruned(self, kb):
+        seen = []
+
+        def model(messages, info: AgentInfo):
+            seen.append(messages)
+            if isinstance(messages[-1].parts[-1], ToolReturnPart):
+                return ModelResponse(parts=[TextPart("done")])
+            return ModelResponse(parts=[ToolCallPart("list_all_services", {})])
+
+        pruner = ToolReturnPruner(keep_recent_turns=2)
+        agent = create_notch_agent(kb, tool_return_pruner=pruner)
+
+        history = []
+        for turn in range(3):
+            history = agent.run_sync(
+                f"turn {turn}",
+                deps=kb,
+                message_history=history,
+                model=FunctionModel(model),
+            ).all_messages()
+
+        returns = tool_returns(seen[-1])
+        assert returns[0].content.startswith(PRUNED_MARKER)
+        assert not str(returns[-1].content).startswith(PRUNED_MARKER)
+        assert pruner.stats().tokens_saved > 0
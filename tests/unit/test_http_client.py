@@ -0,0 +1,158 @@
+"""Unit tests for the shared HTTP client plumbing."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from notch_chatbot import tools
+from notch_chatbot.agent import create_model_client
+from notch_chatbot.blog import BlogFeed
+from notch_chatbot.http_client import (
+    DrainingTransport,
+    app_http_client,
+    close_app_client,
+    create_tool_client,
+    open_app_client,
+    tool_http_client,
+)
+from notch_chatbot.mail import MailApiTransport
+from notch_chatbot.runner import AsyncRunner
+
+SSE_BODY = (
+    b'data: {"id": "c", "object": "chat.completion.chunk", "created": 0, '
+    b'"model": "gpt-4o", "choices": [{"index": 0, "delta": {"content": "hi"}, '
+    b'"finish_reason": "stop"}]}\n\n'
+    b"data: [DONE]\n\n"
+)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        self.server.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.do_POST()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.delay)
+        body = self.server.body
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.connections = 0
+    server.body = SSE_BODY
+    server.status = 200
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def stream_completions(http_client, server, count=3):
+    client = AsyncOpenAI(
+        api_key="test-key",
+        base_url=f"http://127.0.0.1:{server.server_port}/v1",
+        http_client=http_client,
+    )
+    for _ in range(count):
+        stream = await client.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "hi"}], stream=True
+        )
+        async for _ in stream:
+            pass
+    await http_client.aclose()
+
+
+class TestDrainingTransport:
+    """Test connection reuse for streamed completions."""
+
+    async def test_sdk_streams_discard_connections_without_draining(self, stub_server):
+        await stream_completions(httpx.AsyncClient(), stub_server)
+        assert stub_server.connections == 3
+
+    async def test_streams_reuse_one_connection(self, stub_server):
+        await stream_completions(create_model_client(), stub_server)
+        assert stub_server.connections == 1
+
+    async def test_large_remainder_is_not_drained(self, stub_server):
+        stub_server.body = b"x" * 1024 * 1024
+        transport = DrainingTransport(max_drain_bytes=0)
+        client = httpx.AsyncClient(transport=transport)
+        url = f"http://127.0.0.1:{stub_server.server_port}/"
+        for _ in range(2):
+            async with client.stream("POST", url) as response:
+                async for _ in response.aiter_raw(1):
+                    break
+        await client.aclose()
+        assert stub_server.connections == 2
+
+
+class TestAppClient:
+    """Test the application-scoped client used by the I/O tools."""
+
+    @pytest.fixture
+    def stub_url(self, stub_server):
+        return f"http://127.0.0.1:{stub_server.server_port}/"
+
+    async def test_blog_refreshes_reuse_one_connection(self, stub_server, stub_url):
+        feed = BlogFeed(stub_url)
+        async with app_http_client():
+            for _ in range(3):
+                await feed.refresh()
+        assert stub_server.connections == 1
+
+    async def test_email_sends_reuse_one_connection(
+        self, stub_server, stub_url, monkeypatch
+    ):
+        stub_server.status = 202
+        monkeypatch.setattr(tools, "mail_transport", MailApiTransport(stub_url))
+        monkeypatch.setenv("SENDGRID_API_KEY", "test-key")
+        async with app_http_client():
+            for _ in range(2):
+                result, sent = await tools._send_offer_email({}, "a@b.com", "A")
+                assert sent
+                assert "Offer sent successfully" in result
+        assert stub_server.connections == 1
+
+    async def test_without_app_client_each_call_connects(self, stub_server, stub_url):
+        feed = BlogFeed(stub_url)
+        for _ in range(3):
+            await feed.refresh()
+        assert stub_server.connections == 3
+
+    async def test_client_of_another_loop_is_not_shared(self):
+        runner = AsyncRunner()
+        app_client = runner.run(open_app_client())
+        try:
+            async with tool_http_client() as client:
+                assert client is not app_client
+        finally:
+            runner.run(close_app_client())
+            runner.stop()
+
+    async def test_per_host_timeout(self, stub_server, stub_url):
+        stub_server.delay = 0.5
+        client = create_tool_client(host_timeouts={"127.0.0.1": httpx.Timeout(0.05)})
+        async with client:
+            with pytest.raises(httpx.ReadTimeout):
+                await client.get(stub_url)
@@ -0,0 +1,257 @@
+"""Unit tests for the streaming HTTP API, against a local server."""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.reload import KnowledgeBaseWatcher
+from notch_chatbot.router import IntentRouter
+from notch_chatbot.server import ChatService, DeltaBuffer, create_app
+from notch_chatbot.sessions import SessionManager, SQLiteSessionStore
+
+ANSWER = "We build custom software, AI systems and MVPs."
+
+
+class ScriptedModel:
+    """Streams ANSWER word by word, recording what it was sent."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.cancelled = 0
+        self.error = None
+
+    async def stream(self, messages, info: AgentInfo):
+        self.requests.append(messages)
+        if self.error is not None:
+            raise self.error
+        try:
+            for word in ANSWER.split(" "):
+                await asyncio.sleep(self.delay)
+                yield word + " "
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.fixture
+def model():
+    return ScriptedModel()
+
+
+@pytest.fixture
+def service(kb, model, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    agent = create_notch_agent(kb, model=FunctionModel(stream_function=model.stream))
+    return ChatService(
+        agent,
+        KnowledgeBaseWatcher(),
+        SessionManager(SQLiteSessionStore(tmp_path / "sessions.sqlite3")),
+        router=IntentRouter(),
+        replay_delay=0,
+    )
+
+
+@pytest.fixture
+def server(service):
+    config = uvicorn.Config(
+        create_app(service),
+        host="127.0.0.1",
+        port=0,
+        log_level="warning",
+        lifespan="off",
+        timeout_graceful_shutdown=1,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+async def client(server):
+    async with httpx.AsyncClient(base_url=server, timeout=10) as client:
+        yield client
+
+
+def parse_events(body):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def chat(client, session_id, message):
+    response = await client.post(
+        f"/sessions/{session_id}/messages", json={"message": message}
+    )
+    return response, parse_events(response.text)
+
+
+class TestDeltaBuffer:
+    """Test merging deltas for clients that fall behind."""
+
+    async def test_pending_deltas_are_merged(self):
+        buffer = DeltaBuffer()
+        for word in ("We ", "build ", "software"):
+            buffer.put(word)
+        buffer.close()
+        assert await buffer.get() == "We build software"
+        assert await buffer.get() is None
+
+    async def test_timeout_returns_empty(self):
+        assert await DeltaBuffer().get(timeout=0.01) == ""
+
+    async def test_error_is_raised_after_the_text(self):
+        buffer = DeltaBuffer()
+        buffer.put("partial")
+        buffer.close(RuntimeError("model failed"))
+        assert await buffer.get() == "partial"
+        with pytest.raises(RuntimeError, match="model failed"):
+            await buffer.get()
+
+
+class TestChatEndpoint:
+    """Test streaming turns over Server-Sent Events."""
+
+    async def test_streams_deltas_then_done(self, client):
+        response, events = await chat(client, "s1", "Tell me about Notch")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        deltas = [data["text"] for event, data in events if event == "delta"]
+        assert "".join(deltas) == ANSWER + " "
+        assert events[-1] == ("done", {"text": ANSWER + " "})
+
+    async def test_conversation_continues_in_the_session(self, client, model):
+        await chat(client, "s1", "Tell me about Notch")
+        await chat(client, "s1", "And more?")
+        first, second = model.requests
+        assert len(second) > len(first)
+        session = (await client.get("/sessions/s1")).json()
+        assert [m["role"] for m in session["messages"]] == [
+            "user",
+            "assistant",
+            "user",
+            "assistant",
+        ]
+
+    async def test_sessions_are_independent(self, client, model):
+        await chat(client, "s1", "Tell me about Notch")
+        await chat(client, "s2", "Tell me about Notch")
+        first, second = model.requests
+        assert len(first) == len(second)
+
+    async def test_catalogue_question_is_answered_locally(self, client, model):
+        _, events = await chat(client, "s1", "What services do you offer?")
+        assert "Custom Software Development" in events[-1][1]["text"]
+        assert model.requests == []
+
+    async def test_many_concurrent_sessions(self, client, model, service):
+        model.delay = 0.001
+        results = await asyncio.gather(
+            *(chat(client, f"s{n}", "Tell me about Notch") for n in range(50))
+        )
+        assert all(
+            events[-1] == ("done", {"text": ANSWER + " "}) for _, events in results
+        )
+        stats = service.stats()
+        assert (stats.completed, stats.active_turns) == (50, 0)
+
+    async def test_second_turn_in_a_busy_session_is_refused(self, client, model):
+        model.delay = 0.05
+        first = asyncio.create_task(chat(client, "s1", "Tell me about Notch"))
+        await asyncio.sleep(0.1)
+        response, _ = await chat(client, "s1", "Hello?")
+        assert response.status_code == 409
+        await first
+
+    async def test_full_server_asks_to_retry(self, client, model, service):
+        service.max_turns = 1
+        model.delay = 0.05
+        first = asyncio.create_task(chat(client, "s1", "Tell me about Notch"))
+        await asyncio.sleep(0.1)
+        response, _ = await chat(client, "s2", "Hello?")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        await first
+
+    async def test_disconnect_cancels_the_run(self, client, model, service):
+        model.delay = 0.2
+        async with client.stream(
+            "POST", "/sessions/s1/messages", json={"message": "Tell me about Notch"}
+        ) as response:
+            async for line in response.aiter_lines():
+                if line.startswith("event: delta"):
+                    break
+        for _ in range(100):
+            if model.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        assert model.cancelled == 1
+        assert service.stats().disconnected == 1
+        assert (await client.get("/sessions/s1")).json()["messages"] == []
+        # The session is free for the next turn
+        model.delay = 0
+        response, _ = await chat(client, "s1", "Tell me about Notch")
+        assert response.status_code == 200
+
+    async def test_model_error_is_reported_as_an_event(self, client, model):
+        model.error = RuntimeError("upstream unavailable")
+        response, events = await chat(client, "s1", "Tell me about Notch")
+        assert response.status_code == 200
+        ((event, data),) = events
+        assert event == "error"
+        assert "upstream unavailable" in data["detail"]
+
+    async def test_idle_stream_sends_keep_alives(self, client, model, service):
+        service.heartbeat = 0.01
+        model.delay = 0.05
+        response = await client.post(
+            "/sessions/s1/messages", json={"message": "Tell me about Notch"}
+        )
+        assert ": keep-alive" in response.text
+
+
+class TestSessionEndpoints:
+    """Test creating, reading and deleting sessions and bad requests."""
+
+    async def test_create_session(self, client):
+        response = await client.post("/sessions")
+        assert response.status_code == 201
+        assert len(response.json()["session_id"]) == 32
+
+    async def test_delete_session(self, client):
+        await chat(client, "s1", "Tell me about Notch")
+        assert (await client.delete("/sessions/s1")).status_code == 204
+        assert (await client.get("/sessions/s1")).json()["messages"] == []
+
+    @pytest.mark.parametrize(
+        "body", [b"not json", b"{}", b'{"message": "  "}', b'["Hello"]']
+    )
+    async def test_bad_message_body(self, client, body):
+        response = await client.post("/sessions/s1/messages", content=body)
+        assert response.status_code == 400
+        assert "detail" in response.json()
+
+    async def test_invalid_session_id(self, client):
+        response = await client.get("/sessions/" + "x" * 200)
+        assert response.status_code == 404
+
+    async def test_health(self, client, service):
+        health = (await client.get("/health")).json()
+        assert health["status"] == "ok"
+        assert health["knowledge_base"] == service.kb_watcher.current.version
@@ -0,0 +1,148 @@
+"""Unit tests for the catalogue intent router."""
+
+import pytest
+from pydantic_ai.messages import ModelRequest, SystemPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.responses import stream_turn
+from notch_chatbot.router import Intent, IntentRouter, classify
+
+
+class TestClassify:
+    """Test which messages are catalogue questions."""
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "What services do you offer?",
+            "list your services",
+            "Can you tell me about your services?",
+            "What kind of services does Notch provide?",
+            "Hi! What are your offerings?",
+        ],
+    )
+    def test_list_services(self, message):
+        assert classify(message) == Intent.LIST_SERVICES
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Which industries do you cover?",
+            "What industries do you serve",
+            "Which sectors do you have experience in?",
+        ],
+    )
+    def test_list_industries(self, message):
+        assert classify(message) == Intent.LIST_INDUSTRIES
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "What AI services do you offer?",
+            "Do you work with fintech?",
+            "What services does Notch not offer?",
+            "List your services and industries",
+            "Which services are best for a startup?",
+            "Tell me about Notch",
+            "",
+        ],
+    )
+    def test_anything_more_specific_goes_to_the_agent(self, message):
+        assert classify(message) is None
+
+
+class TestIntentRouter:
+    """Test the templated answers and counters."""
+
+    def test_services_answer_lists_every_service(self, kb):
+        answer = IntentRouter().answer("list your services", kb)
+        assert answer.startswith(f"We offer {len(kb.services)} services")
+        assert all(service.name in answer for service in kb.services)
+
+    def test_industries_answer_names_every_industry(self, kb):
+        answer = IntentRouter().answer("Which industries do you cover?", kb)
+        assert "workforce management" in answer
+        assert "SaaS" in answer
+        assert answer.count(".") <= 2
+
+    def test_stats(self, kb):
+        router = IntentRouter()
+        router.answer("list your services", kb)
+        router.answer("Which industries do you cover?", kb)
+        router.answer("Do you work with fintech?", kb)
+        stats = router.stats()
+        assert (stats.routed, stats.passed) == (2, 1)
+        assert stats.coverage == pytest.approx(2 / 3)
+        assert stats.by_intent == {"list_services": 1, "list_industries": 1}
+        assert 0 < stats.mean_latency < 0.01
+
+
+class TestRoutedTurns:
+    """Test routing in front of the agent."""
+
+    @pytest.fixture
+    def requests(self):
+        return []
+
+    @pytest.fixture
+    def agent(self, kb, requests, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+        async def stream_model(messages, info: AgentInfo):
+            requests.append(messages)
+            yield "From the model"
+
+        return create_notch_agent(kb, model=FunctionModel(stream_function=stream_model))
+
+    async def ask(self, agent, kb, router, message, history):
+        turn_history = []
+        chunks = [
+            chunk
+            async for chunk in stream_turn(
+                agent,
+                kb,
+                message,
+                history,
+                turn_history.extend,
+                router=router,
+                replay_delay=0,
+            )
+        ]
+        return "".join(chunks), turn_history
+
+    async def test_catalogue_question_skips_the_model(self, agent, kb, requests):
+        answer, history = await self.ask(
+            agent, kb, IntentRouter(), "What services do you offer?", []
+        )
+        assert requests == []
+        assert "Custom Software Development" in answer
+        assert history[-1].parts[0].content == answer
+
+    async def test_conversation_continues_with_the_system_prompt(
+        self, agent, kb, requests
+    ):
+        router = IntentRouter()
+        _, history = await self.ask(agent, kb, router, "list your services", [])
+        answer, history = await self.ask(
+            agent, kb, router, "Tell me more about MVPs", history
+        )
+        assert answer == "From the model"
+        (sent,) = requests
+        first = sent[0]
+        assert isinstance(first, ModelRequest)
+        assert isinstance(first.parts[0], SystemPromptPart)
+
+    async def test_later_catalogue_question_adds_no_system_prompt(
+        self, agent, kb, requests
+    ):
+        router = IntentRouter()
+        _, history = await self.ask(agent, kb, router, "Hello", [])
+        _, history = await self.ask(agent, kb, router, "list your services", history)
+        system_parts = [
+            part
+            for message in history
+            for part in message.parts
+            if isinstance(part, SystemPromptPart)
+        ]
+        assert len(system_parts) == 1
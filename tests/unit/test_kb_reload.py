@@ -0,0 +1,89 @@
+"""Unit tests for knowledge base hot reload."""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from notch_chatbot.reload import KnowledgeBaseWatcher
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Writable copy of the shipped data directory."""
+    target = tmp_path / "data"
+    shutil.copytree(DATA_DIR, target, ignore=shutil.ignore_patterns(".*"))
+    return target
+
+
+def _rename_first_service(data_dir: Path, name: str) -> None:
+    services_file = data_dir / "services.json"
+    services = json.loads(services_file.read_text(encoding="utf-8"))
+    services[0]["name"] = name
+    services_file.write_text(json.dumps(services), encoding="utf-8")
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = services_file.stat()
+    os.utime(services_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestKnowledgeBaseWatcher:
+    """Test change detection and atomic swapping."""
+
+    def test_no_change_keeps_instance(self, data_dir):
+        watcher = KnowledgeBaseWatcher(data_dir)
+        kb = watcher.current
+        assert watcher.check() is False
+        assert watcher.current is kb
+
+    def test_change_swaps_in_new_version(self, data_dir):
+        watcher = KnowledgeBaseWatcher(data_dir)
+        old = watcher.current
+
+        _rename_first_service(data_dir, "Renamed Service")
+        assert watcher.check() is True
+
+        new = watcher.current
+        assert new.services[0].name == "Renamed Service"
+        assert new.version != old.version
+        # A run that captured the old knowledge base still sees it unchanged
+        assert old.services[0].name != "Renamed Service"
+
+    def test_listeners_receive_new_knowledge_base(self, data_dir):
+        watcher = KnowledgeBaseWatcher(data_dir)
+        received = []
+        watcher.add_listener(received.append)
+
+        _rename_first_service(data_dir, "Renamed Service")
+        watcher.check()
+        assert received == [watcher.current]
+
+    def test_invalid_json_keeps_previous_version(self, data_dir):
+        watcher = KnowledgeBaseWatcher(data_dir)
+        kb = watcher.current
+
+        (data_dir / "services.json").write_text("[{", encoding="utf-8")
+        assert watcher.check() is False
+        assert watcher.current is kb
+
+        # Fixing the file is picked up on the next check
+        shutil.copy(DATA_DIR / "services.json", data_dir / "services.json")
+        _rename_first_service(data_dir, "Fixed")
+        assert watcher.check() is True
+        assert watcher.current.services[0].name == "Fixed"
+
+    def test_background_thread_picks_up_changes(self, data_dir):
+        watcher = KnowledgeBaseWatcher(data_dir, poll_interval=0.05)
+        watcher.start()
+        try:
+            _rename_first_service(data_dir, "Background")
+            deadline = time.monotonic() + 5
+            while watcher.current.services[0].name != "Background":
+                assert time.monotonic() < deadline, "reload not picked up"
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
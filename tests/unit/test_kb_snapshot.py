@@ -0,0 +1,68 @@
+"""Unit tests for the knowledge base snapshot cache."""
+
+import json
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from notch_chatbot.knowledge_base import SNAPSHOT_FILENAME, load_knowledge_base
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Writable copy of the shipped data directory."""
+    target = tmp_path / "data"
+    shutil.copytree(DATA_DIR, target, ignore=shutil.ignore_patterns(".*"))
+    return target
+
+
+class TestKnowledgeBaseSnapshot:
+    """Test snapshot write, reuse and invalidation."""
+
+    def test_first_load_writes_snapshot(self, data_dir):
+        kb = load_knowledge_base(data_dir)
+        assert (data_dir / SNAPSHOT_FILENAME).exists()
+        assert kb.version
+
+    def test_snapshot_load_skips_validation(self, data_dir):
+        cold = load_knowledge_base(data_dir)
+
+        with patch("notch_chatbot.knowledge_base.Service", side_effect=AssertionError):
+            warm = load_knowledge_base(data_dir)
+
+        assert warm.model_dump() == cold.model_dump()
+        assert warm.version == cold.version
+        assert warm.search_services(["okta"], 1) == cold.search_services(["okta"], 1)
+
+    def test_changed_data_file_rebuilds_snapshot(self, data_dir):
+        before = load_knowledge_base(data_dir)
+
+        services_file = data_dir / "services.json"
+        services = json.loads(services_file.read_text(encoding="utf-8"))
+        services[0]["name"] = "Renamed Service"
+        services_file.write_text(json.dumps(services), encoding="utf-8")
+
+        after = load_knowledge_base(data_dir)
+        assert after.services[0].name == "Renamed Service"
+        assert after.version != before.version
+
+    def test_corrupt_snapshot_is_ignored(self, data_dir):
+        load_knowledge_base(data_dir)
+        snapshot = data_dir / SNAPSHOT_FILENAME
+        snapshot.write_bytes(snapshot.read_bytes()[:-20])
+
+        kb = load_knowledge_base(data_dir)
+        assert len(kb.services) == 11
+
+    def test_snapshot_disabled(self, data_dir):
+        load_knowledge_base(data_dir, use_snapshot=False)
+        assert not (data_dir / SNAPSHOT_FILENAME).exists()
+
+    def test_missing_data_file(self, data_dir):
+        (data_dir / "use_cases.json").unlink()
+        with pytest.raises(FileNotFoundError):
+            load_knowledge_base(data_dir)
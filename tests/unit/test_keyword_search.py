@@ -0,0 +1,114 @@
+"""Unit tests for BM25 keyword search over the knowledge base."""
+
+from notch_chatbot.search import InvertedIndex, TfidfIndex, stem, tokenize
+from notch_chatbot.tools import (
+    find_services_by_keyword,
+    find_similar_case_studies,
+    find_use_cases_by_keyword,
+)
+
+
+class TestTokenize:
+    """Test text normalization."""
+
+    def test_lowercases_and_splits_on_punctuation(self):
+        assert tokenize("Node.js, UI/UX & Real-time") == [
+            "node",
+            "js",
+            "ui",
+            "ux",
+            "real",
+            "time",
+        ]
+
+    def test_empty_text(self):
+        assert tokenize("  ,. ") == []
+
+
+class TestInvertedIndex:
+    """Test BM25 ranking."""
+
+    def test_more_matching_terms_rank_higher(self):
+        index = InvertedIndex(["real estate", "real-time tracking", "tracking only"])
+        ranked = [pos for pos, _ in index.rank(["real-time tracking"], top_k=3)]
+        assert ranked[0] == 1
+        assert set(ranked) == {0, 1, 2}
+
+    def test_rare_terms_outweigh_common_terms(self):
+        index = InvertedIndex(["common rare", "common", "common", "common"])
+        ranked = index.rank(["common", "rare"], top_k=4)
+        assert ranked[0][0] == 0
+        assert ranked[0][1] > ranked[1][1]
+
+    def test_top_k_limits_results(self):
+        index = InvertedIndex(["alpha"] * 10)
+        assert len(index.rank(["alpha"], top_k=3)) == 3
+        assert index.rank(["alpha"], top_k=0) == []
+
+    def test_ties_keep_record_order(self):
+        index = InvertedIndex(["alpha", "beta", "alpha"])
+        assert [pos for pos, _ in index.rank(["alpha"], top_k=5)] == [0, 2]
+
+    def test_unknown_and_blank_keywords(self):
+        index = InvertedIndex(["alpha"])
+        assert index.rank(["omega", "  "], top_k=5) == []
+
+    def test_empty_index(self):
+        assert InvertedIndex([]).rank(["alpha"], top_k=5) == []
+
+
+class TestKeywordTools:
+    """Test the ranked keyword tools against the shipped data."""
+
+    def test_services_best_match_first(self, ctx):
+        results = find_services_by_keyword(ctx, ["okta", "identity"])
+        assert results
+        assert "okta" in results[0].search_text().lower()
+
+    def test_services_top_k(self, ctx):
+        assert len(find_services_by_keyword(ctx, ["development"], top_k=2)) == 2
+
+    def test_case_studies_best_match_first(self, ctx):
+        results = find_similar_case_studies(ctx, ["real-time tracking", "safety"])
+        assert results[0].id == "spotsie-iot-safety"
+
+    def test_use_cases_by_keyword(self, ctx):
+        results = find_use_cases_by_keyword(ctx, ["yaml"])
+        assert results[0].id == "ai-yaml-generation"
+
+    def test_keywords_are_case_insensitive(self, ctx):
+        assert find_services_by_keyword(ctx, ["OKTA"]) == find_services_by_keyword(
+            ctx, ["okta"]
+        )
+
+    def test_no_match(self, ctx):
+        assert find_services_by_keyword(ctx, ["blockchainzzz"]) == []
+
+
+class TestTfidfIndex:
+    """Test cosine-ranked similarity search."""
+
+    def test_stem_folds_word_variants(self):
+        assert stem("tracking") == stem("tracked") == stem("tracks") == "track"
+        assert stem("process") == "process"
+        assert stem("api") == "api"
+
+    def test_paraphrase_shares_terms(self):
+        index = TfidfIndex(
+            ["real-time location tracking for workers", "payroll reporting"]
+        )
+        ranked = index.rank(["warehouse tracking"], top_k=5)
+        assert [pos for pos, _ in ranked] == [0]
+
+    def test_identical_text_has_unit_similarity(self):
+        index = TfidfIndex(["invoice automation", "fleet telematics"])
+        position, similarity = index.rank(["fleet telematics"], top_k=1)[0]
+        assert position == 1
+        assert abs(similarity - 1.0) < 1e-9
+
+    def test_unknown_terms_return_nothing(self):
+        assert TfidfIndex(["alpha"]).rank(["omega"], top_k=5) == []
+
+    def test_similar_case_studies_match_paraphrase(self, ctx):
+        results = find_similar_case_studies(ctx, ["warehouse tracking"])
+        assert results[0].id == "spotsie-iot-safety"
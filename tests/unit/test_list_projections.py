@@ -0,0 +1,78 @@
+"""Unit tests for summary/detail listing tools and cursor pagination."""
+
+import pytest
+from pydantic_ai import ModelRetry
+
+from notch_chatbot.tools import (
+    get_all_case_studies,
+    get_case_study_details,
+    get_service_details,
+    list_all_services,
+)
+
+
+class TestListAllServices:
+    """Test the service summary listing."""
+
+    def test_first_page_is_compact_summary(self, ctx, kb):
+        page = list_all_services(ctx)
+        assert page.total == len(kb.services)
+        assert [s.id for s in page.items] == [s.id for s in kb.services]
+        assert page.next_cursor is None
+        assert set(page.items[0].model_dump()) == {
+            "id",
+            "name",
+            "category",
+            "short_description",
+        }
+
+    def test_cursor_pagination_walks_every_service_once(self, ctx, kb):
+        seen = []
+        cursor = None
+        while True:
+            page = list_all_services(ctx, cursor=cursor, limit=4)
+            assert len(page.items) <= 4
+            seen.extend(s.id for s in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == [s.id for s in kb.services]
+
+    def test_limit_is_clamped(self, ctx):
+        assert len(list_all_services(ctx, limit=0).items) == 1
+
+    def test_unknown_cursor_asks_model_to_retry(self, ctx):
+        with pytest.raises(ModelRetry):
+            list_all_services(ctx, cursor="no-such-service")
+
+
+class TestGetAllCaseStudies:
+    """Test the case study summary listing."""
+
+    def test_summary_fields(self, ctx, kb):
+        page = get_all_case_studies(ctx, limit=3)
+        assert page.total == len(kb.case_studies)
+        assert page.next_cursor == kb.case_studies[3].id
+        assert set(page.items[0].model_dump()) == {
+            "id",
+            "client_name",
+            "title",
+            "industry",
+        }
+
+    def test_second_page(self, ctx, kb):
+        first = get_all_case_studies(ctx, limit=3)
+        second = get_all_case_studies(ctx, cursor=first.next_cursor, limit=3)
+        assert [cs.id for cs in second.items] == [cs.id for cs in kb.case_studies[3:6]]
+
+
+class TestDetailTools:
+    """Test full-record lookups by ID."""
+
+    def test_service_details_in_request_order(self, ctx, kb):
+        ids = [kb.services[2].id, kb.services[0].id]
+        assert get_service_details(ctx, ids) == [kb.services[2], kb.services[0]]
+
+    def test_case_study_details_skip_unknown_ids(self, ctx, kb):
+        ids = ["missing", kb.case_studies[1].id]
+        assert get_case_study_details(ctx, ids) == [kb.case_studies[1]]
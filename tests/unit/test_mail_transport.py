@@ -0,0 +1,291 @@
+"""Unit tests for the email transports, against a stand-in SMTP relay."""
+
+import asyncio
+import base64
+import socket
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+import pytest
+
+from notch_chatbot import tools
+from notch_chatbot.mail import (
+    MailApiTransport,
+    SMTPTransport,
+    build_messages,
+    transport_from_env,
+)
+from notch_chatbot.outbox import DeliveryError, EmailOutbox, OutboxSender, OutboxStatus
+
+EMAIL = {
+    "personalizations": [
+        {
+            "to": [{"email": "jane@example.com", "name": "Jane Smith"}],
+            "bcc": [{"email": "sales@wearenotch.com"}],
+            "subject": "Your Project Proposal",
+        }
+    ],
+    "from": {"email": "proposals@wearenotch.com", "name": "Notch Team"},
+    "content": [{"type": "text/html", "value": "<p>Hello Jane</p>"}],
+    "attachments": [
+        {
+            "content": base64.b64encode(b"%PDF-1.4 proposal").decode(),
+            "filename": "proposal.pdf",
+            "type": "application/pdf",
+            "disposition": "attachment",
+        }
+    ],
+}
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Stand-in relay: enough ESMTP for smtplib, with scripted RCPT replies."""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.append(self.connection)
+        self.reply("220 stub ESMTP")
+        envelope = []
+        while line := self.rfile.readline():
+            verb, _, argument = line.decode().rstrip("\r\n").partition(" ")
+            verb = verb.upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-stub\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                server.logins.append(base64.b64decode(argument.split()[1]))
+                self.reply("235 Authenticated")
+            elif verb == "MAIL":
+                envelope = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                envelope.append(argument.partition(":")[2].strip("<>"))
+                self.reply(
+                    server.rcpt_replies.pop(0) if server.rcpt_replies else "250 OK"
+                )
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                server.messages.append(
+                    (envelope, message_from_bytes(data, policy=policy.default))
+                )
+                self.reply("250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.sockets = []
+        self.logins = []
+        self.messages = []
+        self.rcpt_replies = []
+
+    def drop_connections(self):
+        """Close every session from the relay's side, as an idle timeout would."""
+        with self.lock:
+            sockets, self.sockets = self.sockets, []
+        for sock in sockets:
+            sock.shutdown(socket.SHUT_RDWR)
+
+
+@pytest.fixture
+def relay():
+    server = StubSMTPServer()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(relay):
+    transport = SMTPTransport("127.0.0.1", relay.server_address[1], tls="none")
+    yield transport
+    transport.close()
+
+
+class TestBuildMessages:
+    """Test turning a mail API request body into MIME."""
+
+    def test_headers_body_and_attachment(self):
+        ((message, recipients),) = build_messages(EMAIL)
+        assert message["To"] == "Jane Smith <jane@example.com>"
+        assert message["From"] == "Notch Team <proposals@wearenotch.com>"
+        assert message["Subject"] == "Your Project Proposal"
+        assert "Bcc" not in message
+        assert recipients == ["jane@example.com", "sales@wearenotch.com"]
+        assert "<p>Hello Jane</p>" in message.get_body(("html",)).get_content()
+        (attachment,) = message.iter_attachments()
+        assert attachment.get_filename() == "proposal.pdf"
+        assert attachment.get_content() == b"%PDF-1.4 proposal"
+
+    def test_message_id_follows_idempotency_key(self):
+        ((first, _),) = build_messages(EMAIL, "offer-1")
+        ((again, _),) = build_messages(EMAIL, "offer-1")
+        ((other, _),) = build_messages(EMAIL, "offer-2")
+        assert first["Message-ID"] == again["Message-ID"] != other["Message-ID"]
+        assert first["Message-ID"].endswith("@wearenotch.com>")
+
+
+class TestSMTPTransport:
+    """Test the pooled SMTP backend."""
+
+    async def test_delivers_message(self, transport, relay):
+        await transport.send(EMAIL, "offer-1")
+        ((envelope, message),) = relay.messages
+        assert envelope == ["jane@example.com", "sales@wearenotch.com"]
+        assert message["Subject"] == "Your Project Proposal"
+        (attachment,) = message.iter_attachments()
+        assert attachment.get_content() == b"%PDF-1.4 proposal"
+
+    async def test_sequential_sends_reuse_one_session(self, transport, relay):
+        for _ in range(5):
+            await transport.send(EMAIL)
+        assert len(relay.messages) == 5
+        assert relay.connections == transport.connections_opened == 1
+
+    async def test_burst_opens_at_most_pool_size_sessions(self, transport, relay):
+        await asyncio.gather(*(transport.send(EMAIL) for _ in range(12)))
+        assert len(relay.messages) == 12
+        assert relay.connections <= transport.pool_size
+
+    async def test_logs_in_once_per_session(self, relay):
+        transport = SMTPTransport(
+            "127.0.0.1",
+            relay.server_address[1],
+            username="notch",
+            password="secret",
+            tls="none",
+        )
+        for _ in range(3):
+            await transport.send(EMAIL)
+        transport.close()
+        assert relay.logins == [b"\0notch\0secret"]
+
+    async def test_reconnects_when_relay_dropped_the_session(self, transport, relay):
+        await transport.send(EMAIL)
+        relay.drop_connections()
+        await transport.send(EMAIL)
+        assert len(relay.messages) == 2
+        assert relay.connections == 2
+
+    async def test_stale_session_is_replaced(self, relay):
+        transport = SMTPTransport(
+            "127.0.0.1", relay.server_address[1], tls="none", idle_timeout=0
+        )
+        await transport.send(EMAIL)
+        await transport.send(EMAIL)
+        transport.close()
+        assert relay.connections == 2
+
+    async def test_rejected_recipient_is_not_retryable(self, transport, relay):
+        relay.rcpt_replies = ["550 No such user", "550 No such user"]
+        with pytest.raises(DeliveryError, match="550") as error:
+            await transport.send(EMAIL)
+        assert not error.value.retryable
+
+    async def test_temporary_rejection_is_retryable(self, transport, relay):
+        relay.rcpt_replies = ["451 Try again later", "451 Try again later"]
+        with pytest.raises(DeliveryError) as error:
+            await transport.send(EMAIL)
+        assert error.value.retryable
+        await transport.send(EMAIL)
+        assert len(relay.messages) == 1
+
+    async def test_unreachable_relay_is_retryable(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        transport = SMTPTransport("127.0.0.1", port, tls="none", timeout=1)
+        with pytest.raises(DeliveryError, match="network error") as error:
+            await transport.send(EMAIL)
+        assert error.value.retryable
+        transport.close()
+
+    async def test_close_ends_sessions_and_reconnects_on_use(self, transport, relay):
+        await transport.send(EMAIL)
+        transport.close()
+        await transport.send(EMAIL)
+        assert relay.connections == 2
+
+
+class TestTransportFromEnv:
+    """Test choosing the transport from the environment."""
+
+    def test_defaults_to_mail_api(self, monkeypatch):
+        monkeypatch.delenv("NOTCH_MAIL_TRANSPORT", raising=False)
+        assert isinstance(transport_from_env(), MailApiTransport)
+
+    def test_smtp(self, monkeypatch):
+        monkeypatch.setenv("NOTCH_MAIL_TRANSPORT", "smtp")
+        monkeypatch.setenv("NOTCH_SMTP_HOST", "relay.internal")
+        monkeypatch.setenv("NOTCH_SMTP_PORT", "2525")
+        monkeypatch.setenv("NOTCH_SMTP_POOL_SIZE", "4")
+        transport = transport_from_env()
+        assert isinstance(transport, SMTPTransport)
+        assert (transport.host, transport.port, transport.pool_size) == (
+            "relay.internal",
+            2525,
+            4,
+        )
+        assert transport.missing_config() is None
+
+    def test_smtp_requires_host(self, monkeypatch):
+        monkeypatch.setenv("NOTCH_MAIL_TRANSPORT", "smtp")
+        monkeypatch.delenv("NOTCH_SMTP_HOST", raising=False)
+        with pytest.raises(ValueError, match="NOTCH_SMTP_HOST"):
+            transport_from_env()
+
+    def test_unknown_transport(self, monkeypatch):
+        monkeypatch.setenv("NOTCH_MAIL_TRANSPORT", "pigeon")
+        with pytest.raises(ValueError, match="pigeon"):
+            transport_from_env()
+
+
+class TestOffersOverSMTP:
+    """Test offers sent through the SMTP transport."""
+
+    @pytest.fixture(autouse=True)
+    def _use_smtp(self, transport, monkeypatch):
+        monkeypatch.setattr(tools, "mail_transport", transport)
+        monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+
+    async def test_offer_is_sent_without_an_api_key(self, relay):
+        result = await tools.create_and_send_offer(
+            "Jane Smith", "jane@example.com", "Inventory app", "AI", "small"
+        )
+        assert "✓ Offer sent successfully to jane@example.com" in result
+        ((envelope, message),) = relay.messages
+        assert envelope == ["jane@example.com"]
+        (attachment,) = message.iter_attachments()
+        assert attachment.get_content().startswith(b"%PDF")
+
+    async def test_outbox_delivers_through_smtp(self, relay, transport, tmp_path):
+        outbox = EmailOutbox(tmp_path / "outbox.sqlite3")
+        sender = OutboxSender(outbox, tools.deliver_outbox_message, poll_interval=60)
+        await sender.start()
+        messages = [sender.enqueue(EMAIL, f"lead{n}@example.com") for n in range(4)]
+        await sender.stop()
+        assert all(
+            outbox.get(m.message_id).status == OutboxStatus.SENT for m in messages
+        )
+        assert len(relay.messages) == 4
+        assert relay.connections <= transport.pool_size
+        outbox.close()
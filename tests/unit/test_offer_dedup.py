@@ -0,0 +1,120 @@
+"""Unit tests for deduplication of repeated offers."""
+
+import asyncio
+
+import pytest
+
+from notch_chatbot import tools
+from notch_chatbot.dedup import OfferDeduplicator, offer_key
+
+OFFER = {
+    "client_name": "Jane Smith",
+    "client_email": "jane@example.com",
+    "project_description": "Inventory app with demand forecasting",
+    "services_list": "Custom Software Development, AI Engineering",
+    "project_scope": "medium",
+}
+
+
+class RecordingPool:
+    """Render pool that counts renders and can hold them until released."""
+
+    def __init__(self):
+        self.renders = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def run(self, func, *args):
+        self.renders += 1
+        await self.release.wait()
+        return func(*args)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = RecordingPool()
+    monkeypatch.setattr(tools, "pdf_render_pool", pool)
+    return pool
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Stand-in for the mail transport recording each email sent."""
+    emails = []
+
+    async def send(email_data, client_email, client_name, idempotency_key):
+        emails.append(client_email)
+        return f"Offer sent successfully to {client_email}! (#{len(emails)})", True
+
+    monkeypatch.setattr(tools, "_send_offer_email", send)
+    return emails
+
+
+class TestOfferKey:
+    """Test what makes two offers the same."""
+
+    def test_case_and_whitespace_are_ignored(self):
+        assert offer_key(
+            " Jane@Example.com", "Inventory  app\n", "AI", "Medium"
+        ) == offer_key("jane@example.com", "inventory app", "ai", "medium")
+
+    @pytest.mark.parametrize(
+        "changed",
+        [
+            {"client_email": "john@example.com"},
+            {"project_description": "A different project"},
+            {"services_list": "Cloud Migration"},
+            {"project_scope": "large"},
+        ],
+    )
+    def test_recipient_and_content_matter(self, changed):
+        fields = {k: v for k, v in OFFER.items() if k != "client_name"}
+        assert offer_key(**fields) != offer_key(**{**fields, **changed})
+
+
+class TestCreateAndSendOfferDedup:
+    """Test repeated create_and_send_offer calls."""
+
+    async def test_repeat_returns_first_result_without_rework(self, pool, sent):
+        first = await tools.create_and_send_offer(**OFFER)
+        second = await tools.create_and_send_offer(**OFFER)
+        assert second == first
+        assert pool.renders == 1
+        assert sent == ["jane@example.com"]
+
+    async def test_changed_offer_is_sent(self, pool, sent):
+        await tools.create_and_send_offer(**OFFER)
+        await tools.create_and_send_offer(**{**OFFER, "project_scope": "large"})
+        assert pool.renders == 2
+        assert len(sent) == 2
+
+    async def test_concurrent_repeats_share_one_send(self, pool, sent):
+        pool.release.clear()
+        calls = [asyncio.create_task(tools.create_and_send_offer(**OFFER))]
+        await asyncio.sleep(0)
+        calls.append(asyncio.create_task(tools.create_and_send_offer(**OFFER)))
+        await asyncio.sleep(0)
+        pool.release.set()
+        first, second = await asyncio.gather(*calls)
+        assert first == second
+        assert pool.renders == 1
+        assert len(sent) == 1
+
+    async def test_failed_offer_can_be_retried(self, pool, monkeypatch):
+        monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+        first = await tools.create_and_send_offer(**OFFER)
+        second = await tools.create_and_send_offer(**OFFER)
+        assert first.startswith("Error")
+        assert second == first
+        assert pool.renders == 2
+
+    async def test_repeat_after_window_is_sent_again(self, pool, sent, monkeypatch):
+        monkeypatch.setattr(tools, "offer_deduplicator", OfferDeduplicator(window=0))
+        await tools.create_and_send_offer(**OFFER)
+        await tools.create_and_send_offer(**OFFER)
+        assert pool.renders == 2
+        assert len(sent) == 2
+
+    def test_window_from_env(self, monkeypatch):
+        monkeypatch.setenv("NOTCH_OFFER_DEDUP_WINDOW", "120")
+        assert OfferDeduplicator.from_env().window == 120
@@ -0,0 +1,125 @@
+"""Unit tests for the render worker pool."""
+
+import asyncio
+import base64
+import threading
+import time
+
+import pytest
+
+from notch_chatbot import tools
+from notch_chatbot.rendering import RenderPool
+from notch_chatbot.tools import _generate_proposal_pdf, create_and_send_offer
+
+
+def _render_args():
+    return (
+        "Jane Smith",
+        "jane@example.com",
+        "Inventory platform",
+        "Custom Software Development",
+        "small",
+    )
+
+
+def _fail():
+    raise RuntimeError("render failed")
+
+
+class TestRenderPool:
+    """Test running work on the pool's workers."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = RenderPool(workers=2, max_pending=2)
+        yield pool
+        pool.shutdown()
+
+    async def test_runs_off_the_event_loop(self, pool):
+        loop_thread = threading.get_ident()
+        assert await pool.run(threading.get_ident) != loop_thread
+
+    async def test_passes_args_and_kwargs(self, pool):
+        assert await pool.run(int, "ff", base=16) == 255
+
+    async def test_exception_is_reraised(self, pool):
+        with pytest.raises(RuntimeError, match="render failed"):
+            await pool.run(_fail)
+
+    async def test_loop_keeps_running_during_render(self, pool):
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await pool.run(time.sleep, 0.2)
+        ticker.cancel()
+        assert ticks >= 5
+
+    async def test_pending_renders_are_bounded(self, pool):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def render():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        pool.workers = 8
+        await asyncio.gather(*(pool.run(render) for _ in range(8)))
+        assert peak == 2
+
+    async def test_restarts_after_shutdown(self, pool):
+        await pool.run(int, "1")
+        pool.shutdown()
+        assert await pool.run(int, "2") == 2
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("NOTCH_RENDER_EXECUTOR", "process")
+        monkeypatch.setenv("NOTCH_RENDER_WORKERS", "3")
+        monkeypatch.setenv("NOTCH_RENDER_QUEUE_SIZE", "5")
+        pool = RenderPool.from_env()
+        assert (pool.kind, pool.workers, pool.max_pending) == ("process", 3, 5)
+
+    def test_unknown_kind_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown render executor"):
+            RenderPool(kind="fiber")
+
+
+class TestProcessRenderPool:
+    """Test rendering proposals in worker processes."""
+
+    async def test_renders_proposal_pdf(self):
+        pool = RenderPool(kind="process", workers=1)
+        try:
+            pdf_base64 = await pool.run(_generate_proposal_pdf, *_render_args())
+        finally:
+            pool.shutdown()
+        assert base64.b64decode(pdf_base64).startswith(b"%PDF")
+
+
+class TestOfferUsesRenderPool:
+    """Test that offer creation renders on the pool."""
+
+    async def test_offer_pdf_is_rendered_on_the_pool(self, monkeypatch):
+        calls = []
+
+        class RecordingPool:
+            async def run(self, func, *args):
+                calls.append(func)
+                return func(*args)
+
+        monkeypatch.setattr(tools, "pdf_render_pool", RecordingPool())
+        monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+        result = await create_and_send_offer(*_render_args())
+        assert calls == [_generate_proposal_pdf]
+        assert "SENDGRID_API_KEY not configured" in result
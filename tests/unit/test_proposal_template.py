@@ -0,0 +1,135 @@
+"""Unit tests for the proposal PDF template."""
+
+import re
+import zlib
+from datetime import date
+
+import pytest
+
+from notch_chatbot import proposal
+from notch_chatbot.proposal import (
+    BODY_FONT,
+    DISCLAIMER_FONT,
+    DISCLAIMER_TEXT,
+    MUTED_COLOR,
+    PRICING_NOTE,
+    TEAM_TEXT,
+    TEXT_COLOR,
+    ProposalTemplate,
+    _new_document,
+    _wrap,
+    _write_section,
+    default_template,
+)
+
+PROPOSAL_DATE = date(2025, 11, 4)
+
+
+def page_contents(pdf_bytes: bytes) -> list[bytes]:
+    """Decompressed content streams of a rendered PDF."""
+    contents = []
+    for stream in re.findall(rb"stream\r?\n(.*?)\r?\nendstream", pdf_bytes, re.S):
+        try:
+            contents.append(zlib.decompress(stream))
+        except zlib.error:
+            pass
+    return contents
+
+
+def render(template, scope="medium", description="Inventory platform"):
+    return template.render(
+        "Jane Smith",
+        "jane@example.com",
+        description,
+        "Custom Software Development, AI Engineering",
+        scope,
+        proposal_date=PROPOSAL_DATE,
+    )
+
+
+@pytest.fixture(scope="module")
+def template():
+    return ProposalTemplate()
+
+
+class TestCachedLines:
+    """Test that cached lines are written exactly as multi_cell writes them."""
+
+    @pytest.mark.parametrize(
+        ("font", "color", "text", "line_height"),
+        [
+            (BODY_FONT, TEXT_COLOR, TEAM_TEXT, 6),
+            (BODY_FONT, TEXT_COLOR, f"Starting from $15,000\n\n{PRICING_NOTE}", 6),
+            (DISCLAIMER_FONT, MUTED_COLOR, DISCLAIMER_TEXT, 5),
+        ],
+    )
+    @pytest.mark.parametrize("start_y", [40, 275])
+    def test_matches_multi_cell(self, font, color, text, line_height, start_y):
+        section = _wrap(_new_document(), font, color, text)
+        assert section.lines is not None
+
+        documents = []
+        for write in (
+            lambda pdf: pdf.multi_cell(0, line_height, text),
+            lambda pdf: _write_section(pdf, section, line_height),
+        ):
+            pdf = _new_document()
+            pdf.set_auto_page_break(auto=True, margin=15)
+            pdf.set_font(*font)
+            pdf.set_text_color(*color)
+            pdf.set_y(start_y)
+            write(pdf)
+            documents.append(pdf)
+
+        direct, cached = documents
+        assert len(cached.pages) == len(direct.pages)
+        for number in direct.pages:
+            assert cached.pages[number].contents == direct.pages[number].contents
+        assert (cached.x, cached.y) == (direct.x, direct.y)
+
+
+class TestProposalTemplate:
+    """Test rendering whole proposals."""
+
+    def test_renders_client_fields(self, template):
+        pdf_bytes = render(template)
+        assert pdf_bytes.startswith(b"%PDF")
+        (content,) = page_contents(pdf_bytes)
+        assert b"(Jane Smith)" in content
+        assert b"(jane@example.com)" in content
+        assert b"(Date: November 04, 2025)" in content
+        assert b"(Inventory platform)" in content
+
+    def test_pricing_follows_scope(self, template):
+        (content,) = page_contents(render(template, scope="Large"))
+        assert b"Starting from $100,000+" in content
+
+    def test_unknown_scope_is_priced_as_medium(self, template):
+        assert page_contents(render(template, scope="huge")) == page_contents(
+            render(template, scope="medium")
+        )
+
+    def test_long_description_breaks_pages(self, template):
+        contents = page_contents(render(template, description="Details. " * 800))
+        assert len(contents) > 1
+        assert b"www.wearenotch.com" in contents[-1]
+
+    def test_renders_are_independent(self, template):
+        first = render(template, scope="small")
+        render(template, description="Something else entirely")
+        assert page_contents(render(template, scope="small")) == page_contents(first)
+
+    @pytest.mark.parametrize(
+        ("scope", "description"),
+        [("small", "Inventory platform"), ("large", "Details. " * 800)],
+    )
+    def test_falls_back_to_multi_cell(self, template, monkeypatch, scope, description):
+        monkeypatch.setattr(proposal, "_CACHED_LINES", False)
+        fallback = ProposalTemplate()
+        assert fallback._team.lines is None
+        assert page_contents(render(fallback, scope, description)) == page_contents(
+            render(template, scope, description)
+        )
+
+    def test_default_template_is_shared(self):
+        assert default_template() is default_template()
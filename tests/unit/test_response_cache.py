@@ -0,0 +1,219 @@
+"""Unit tests for the first-turn response cache."""
+
+import asyncio
+import time
+
+import pytest
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.responses import (
+    FirstTurnCache,
+    is_cacheable,
+    normalize_message,
+    prompt_version,
+    stream_turn,
+)
+
+ANSWER = "We build custom software, AI systems and MVPs."
+PROMPT = "p1"
+
+
+def turn(question="What services do you offer?", answer=ANSWER):
+    return [
+        ModelRequest(parts=[UserPromptPart(question)]),
+        ModelResponse(parts=[TextPart(answer)]),
+    ]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = FirstTurnCache(tmp_path / "responses.sqlite3")
+    yield cache
+    cache.close()
+
+
+class CountingModel:
+    """Streams a fixed answer, counting calls."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def stream(self, messages, info: AgentInfo):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for word in ANSWER.split(" "):
+            yield word + " "
+
+
+@pytest.fixture
+def model():
+    return CountingModel()
+
+
+@pytest.fixture
+def agent(kb, model, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return create_notch_agent(kb, model=FunctionModel(stream_function=model.stream))
+
+
+async def ask(agent, kb, question, cache, history=()):
+    turn_history = []
+    chunks = [
+        chunk
+        async for chunk in stream_turn(
+            agent,
+            kb,
+            question,
+            list(history),
+            turn_history.extend,
+            cache,
+            replay_delay=0,
+        )
+    ]
+    return chunks, turn_history
+
+
+class TestNormalization:
+    """Test which questions count as the same."""
+
+    def test_case_punctuation_and_spacing_are_ignored(self):
+        assert normalize_message("What services do you offer?") == normalize_message(
+            "  what services   do you OFFER"
+        )
+
+    def test_different_words_differ(self):
+        assert normalize_message("Do you work with fintech?") != normalize_message(
+            "Do you work with healthcare?"
+        )
+
+    def test_only_knowledge_base_tools_are_cacheable(self):
+        lookup = [ModelResponse(parts=[ToolCallPart("list_all_services", {})])]
+        offer = [ModelResponse(parts=[ToolCallPart("create_and_send_offer", {})])]
+        assert is_cacheable(turn() + lookup)
+        assert not is_cacheable(turn() + offer)
+
+
+class TestFirstTurnCache:
+    """Test storage, eviction and persistence."""
+
+    def test_get_after_put(self, cache):
+        cache.put("What services do you offer?", "v1", PROMPT, ANSWER, turn(), 2.0)
+        cached = cache.get("what services do you offer", "v1", PROMPT)
+        assert cached.text == ANSWER
+        assert cached.latency == 2.0
+
+    def test_knowledge_base_version_is_part_of_the_key(self, cache):
+        cache.put("What services do you offer?", "v1", PROMPT, ANSWER, turn(), 2.0)
+        assert cache.get("What services do you offer?", "v2", PROMPT) is None
+
+    def test_prompt_version_is_part_of_the_key(self, cache):
+        cache.put("What services do you offer?", "v1", PROMPT, ANSWER, turn(), 2.0)
+        assert cache.get("What services do you offer?", "v1", "p2") is None
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = FirstTurnCache(tmp_path / "responses.sqlite3", max_entries=2)
+        cache.put("first", "v1", PROMPT, "1", turn("first"), 1.0)
+        cache.put("second", "v1", PROMPT, "2", turn("second"), 1.0)
+        cache.get("first", "v1", PROMPT)
+        cache.put("third", "v1", PROMPT, "3", turn("third"), 1.0)
+        assert cache.get("second", "v1", PROMPT) is None
+        assert cache.get("first", "v1", PROMPT).text == "1"
+        assert cache.stats().size == 2
+        cache.close()
+
+    def test_expired_entries_are_dropped(self, tmp_path, monkeypatch):
+        cache = FirstTurnCache(tmp_path / "responses.sqlite3", ttl=60)
+        cache.put("first", "v1", PROMPT, "1", turn("first"), 1.0)
+        later = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert cache.get("first", "v1", PROMPT) is None
+        cache.close()
+
+    def test_entries_survive_a_restart(self, tmp_path):
+        path = tmp_path / "responses.sqlite3"
+        cache = FirstTurnCache(path)
+        cache.put("What services do you offer?", "v1", PROMPT, ANSWER, turn(), 2.0)
+        cache.close()
+
+        reopened = FirstTurnCache(path)
+        assert reopened.get("What services do you offer?", "v1", PROMPT).text == ANSWER
+        reopened.close()
+
+    def test_restart_keeps_only_the_most_recently_used(self, tmp_path):
+        path = tmp_path / "responses.sqlite3"
+        cache = FirstTurnCache(path)
+        for question in ("first", "second", "third"):
+            cache.put(question, "v1", PROMPT, question, turn(question), 1.0)
+            time.sleep(0.001)
+        cache.get("first", "v1", PROMPT)
+        cache.close()
+
+        reopened = FirstTurnCache(path, max_entries=2)
+        assert reopened.get("second", "v1", PROMPT) is None
+        assert reopened.get("first", "v1", PROMPT) is not None
+        reopened.close()
+
+
+class TestStreamTurn:
+    """Test replaying cached answers in a conversation."""
+
+    async def test_repeated_opening_question_skips_the_model(
+        self, agent, kb, model, cache
+    ):
+        first, _ = await ask(agent, kb, "What services do you offer?", cache)
+        second, history = await ask(agent, kb, "what services do you offer", cache)
+        assert model.calls == 1
+        assert "".join(second) == "".join(first)
+        # Replayed as a stream, not one block
+        assert len(second) > 1
+        assert history[0].parts[-1].content == "what services do you offer"
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    async def test_replayed_history_continues_the_conversation(
+        self, agent, kb, model, cache
+    ):
+        await ask(agent, kb, "What services do you offer?", cache)
+        _, history = await ask(agent, kb, "What services do you offer?", cache)
+        await ask(agent, kb, "Tell me more", cache, history)
+        assert model.calls == 2
+
+    async def test_later_turns_are_not_cached(self, agent, kb, model, cache):
+        history = turn("Hi", "Hello!")
+        await ask(agent, kb, "What services do you offer?", cache, history)
+        await ask(agent, kb, "What services do you offer?", cache, history)
+        assert model.calls == 2
+        assert cache.stats().size == 0
+
+    async def test_saved_latency_is_reported(self, agent, kb, model, cache):
+        model.delay = 0.05
+        await ask(agent, kb, "What services do you offer?", cache)
+        await ask(agent, kb, "What services do you offer?", cache)
+        assert cache.stats().seconds_saved >= 0.04
+
+    async def test_answers_from_another_model_are_not_replayed(
+        self, agent, kb, model, cache
+    ):
+        other = create_notch_agent(
+            kb, model=FunctionModel(stream_function=model.stream, model_name="other")
+        )
+        assert prompt_version(other) != prompt_version(agent)
+        await ask(other, kb, "What services do you offer?", cache)
+        await ask(agent, kb, "What services do you offer?", cache)
+        assert model.calls == 2
+        await ask(agent, kb, "What services do you offer?", cache)
+        assert model.calls == 2
+
+    async def test_without_cache_the_agent_always_runs(self, agent, kb, model):
+        for _ in range(2):
+            await ask(agent, kb, "What services do you offer?", None)
+        assert model.calls == 2
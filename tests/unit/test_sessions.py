@@ -0,0 +1,142 @@
+"""Unit tests for the durable session store."""
+
+import sqlite3
+
+import pytest
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    UserPromptPart,
+)
+
+from notch_chatbot.sessions import SessionManager, SQLiteSessionStore
+
+
+def turn(text):
+    """Request/response pair for one turn."""
+    return [
+        ModelRequest(parts=[UserPromptPart(text)]),
+        ModelResponse(parts=[TextPart(f"re: {text}")]),
+    ]
+
+
+def display(text):
+    return [
+        {"role": "user", "content": text},
+        {"role": "assistant", "content": f"re: {text}"},
+    ]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "sessions.sqlite3"
+
+
+@pytest.fixture
+def store(db_path):
+    store = SQLiteSessionStore(db_path)
+    yield store
+    store.close()
+
+
+def history_rows(db_path, session_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT keep, history IS NOT NULL FROM session_turns "
+            "WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        ).fetchall()
+
+
+class TestSQLiteSessionStore:
+    """Test persistence and replay of turns."""
+
+    def test_unknown_session(self, store):
+        assert store.load("missing") is None
+
+    def test_turns_replay_in_order(self, store):
+        first, second = turn("one"), turn("two")
+        store.append_turn("s", display("one"), 0, first)
+        store.append_turn("s", display("two"), 2, second)
+
+        session = store.load("s")
+        assert session.messages == display("one") + display("two")
+        assert [m.parts[0].content for m in session.history] == [
+            "one",
+            "re: one",
+            "two",
+            "re: two",
+        ]
+
+    def test_rewritten_history_keeps_only_live_prefix(self, store):
+        store.append_turn("s", display("one"), 0, turn("one"))
+        store.append_turn("s", display("two"), 1, turn("two"))
+
+        history = store.load("s").history
+        assert [m.parts[0].content for m in history] == ["one", "two", "re: two"]
+
+    def test_sessions_are_isolated_and_deletable(self, store):
+        store.append_turn("a", display("a"), 0, turn("a"))
+        store.append_turn("b", display("b"), 0, turn("b"))
+        store.delete("a")
+        assert store.load("a") is None
+        assert store.load("b").messages == display("b")
+
+
+class TestSessionManager:
+    """Test the in-memory working set."""
+
+    def test_appends_only_new_messages(self, store, db_path):
+        manager = SessionManager(store)
+        history = turn("one")
+        manager.record_turn("s", display("one"), history)
+        history = history + turn("two")
+        manager.record_turn("s", display("two"), history)
+
+        assert history_rows(db_path, "s") == [(0, 1), (2, 1)]
+
+    def test_full_rewrite_drops_obsolete_history(self, store, db_path):
+        manager = SessionManager(store)
+        manager.record_turn("s", display("one"), turn("one"))
+        compacted = [
+            ModelRequest(parts=[SystemPromptPart("summary"), UserPromptPart("two")]),
+            ModelResponse(parts=[TextPart("re: two")]),
+        ]
+        manager.record_turn("s", display("two"), compacted)
+
+        assert history_rows(db_path, "s") == [(0, 0), (0, 1)]
+        reloaded = SessionManager(store).get("s")
+        assert reloaded.history == compacted
+        assert reloaded.messages == display("one") + display("two")
+
+    def test_survives_restart(self, db_path):
+        history = turn("one")
+        store = SQLiteSessionStore(db_path)
+        SessionManager(store).record_turn("s", display("one"), history)
+        store.close()
+
+        reopened = SQLiteSessionStore(db_path)
+        session = SessionManager(reopened).get("s")
+        assert session.messages == display("one")
+        assert session.history == history
+        reopened.close()
+
+    def test_idle_sessions_are_evicted_and_reloaded(self, store):
+        manager = SessionManager(store, ttl=60)
+        manager.record_turn("s", display("one"), turn("one"))
+        assert len(manager) == 1
+
+        manager.get("s").last_access -= 61
+        assert manager.evict_idle() == 1
+        assert len(manager) == 0
+
+        assert manager.get("s").messages == display("one")
+
+    def test_clear(self, store):
+        manager = SessionManager(store)
+        manager.record_turn("s", display("one"), turn("one"))
+        manager.clear("s")
+        assert manager.get("s").messages == []
+        assert store.load("s") is None
@@ -0,0 +1,138 @@
+"""Unit tests for the cross-session tool result cache."""
+
+import json
+
+import pytest
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from notch_chatbot.agent import create_notch_agent
+from notch_chatbot.cache import ToolResultCache, cached_tool
+from notch_chatbot.models import KnowledgeBase
+from notch_chatbot.tools import (
+    find_services_by_keyword,
+    get_expertise_description,
+    list_available_industries,
+)
+
+
+class TestToolResultCache:
+    """Test LRU behaviour and counters."""
+
+    def test_hit_after_miss(self):
+        cache = ToolResultCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return ["a"]
+
+        assert cache.get_or_compute("tool", {"x": 1}, "v1", compute) == '["a"]'
+        assert cache.get_or_compute("tool", {"x": 1}, "v1", compute) == '["a"]'
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_key_includes_arguments_and_version(self):
+        cache = ToolResultCache()
+        cache.get_or_compute("tool", {"x": 1}, "v1", lambda: 1)
+        cache.get_or_compute("tool", {"x": 2}, "v1", lambda: 2)
+        cache.get_or_compute("tool", {"x": 1}, "v2", lambda: 3)
+        cache.get_or_compute("other", {"x": 1}, "v1", lambda: 4)
+        assert cache.stats().misses == 4
+
+    def test_argument_order_is_normalized(self):
+        cache = ToolResultCache()
+        cache.get_or_compute("tool", {"a": 1, "b": 2}, "v1", lambda: 1)
+        cache.get_or_compute("tool", {"b": 2, "a": 1}, "v1", lambda: 1)
+        assert cache.stats().hits == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ToolResultCache(max_entries=2)
+        cache.get_or_compute("tool", {"x": 1}, "v", lambda: 1)
+        cache.get_or_compute("tool", {"x": 2}, "v", lambda: 2)
+        cache.get_or_compute("tool", {"x": 1}, "v", lambda: 1)  # refresh x=1
+        cache.get_or_compute("tool", {"x": 3}, "v", lambda: 3)  # evicts x=2
+
+        cache.get_or_compute("tool", {"x": 1}, "v", lambda: 1)
+        assert cache.stats().hits == 2
+        cache.get_or_compute("tool", {"x": 2}, "v", lambda: 2)
+        assert cache.stats().misses == 4
+
+    def test_clear(self):
+        cache = ToolResultCache()
+        cache.get_or_compute("tool", {}, "v", lambda: 1)
+        cache.clear()
+        assert cache.stats().size == 0
+
+
+class TestCachedTool:
+    """Test the tool wrapper."""
+
+    def test_returns_serialized_result(self, ctx):
+        cache = ToolResultCache()
+        tool = cached_tool(cache, find_services_by_keyword)
+
+        result = tool(ctx, ["okta"], top_k=1)
+        expected = find_services_by_keyword(ctx, ["okta"], top_k=1)
+        assert json.loads(result) == [s.model_dump(mode="json") for s in expected]
+
+        # Positional and keyword spelling of the same call share an entry
+        tool(ctx, keywords=["okta"], top_k=1)
+        assert cache.stats().hits == 1
+
+    def test_text_results_are_returned_as_they_are(self, ctx, kb):
+        cache = ToolResultCache()
+        tool = cached_tool(cache, get_expertise_description)
+        domain = next(iter(kb.expertise_domains))
+        for _ in range(2):
+            assert tool(ctx, domain) == kb.expertise_domains[domain]
+            assert tool(ctx, "no-such-domain") is None
+        assert cache.stats().hits == 2
+
+        unversioned = KnowledgeBase(**kb.model_dump(exclude={"version"}))
+        bypass = cached_tool(cache, get_expertise_description)
+        assert (
+            bypass(type(ctx)(deps=unversioned), domain) == kb.expertise_domains[domain]
+        )
+
+    def test_keeps_tool_name_and_docstring(self):
+        tool = cached_tool(ToolResultCache(), list_available_industries)
+        assert tool.__name__ == "list_available_industries"
+        assert tool.__doc__ == list_available_industries.__doc__
+
+    def test_unversioned_knowledge_base_bypasses_cache(self, ctx, kb):
+        cache = ToolResultCache()
+        unversioned = KnowledgeBase(**kb.model_dump(exclude={"version"}))
+        tool = cached_tool(cache, list_available_industries)
+        tool(type(ctx)(deps=unversioned))
+        assert cache.stats().misses == 0
+
+
+class TestAgentIntegration:
+    """Test the cache through a real agent run."""
+
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def test_cached_agent_sends_same_tool_output(self, kb):
+        def model(messages, info: AgentInfo):
+            last = messages[-1].parts[-1]
+            if isinstance(last, ToolReturnPart):
+                return ModelResponse(parts=[TextPart(last.model_response_str())])
+            return ModelResponse(
+                parts=[ToolCallPart("find_services_by_keyword", {"keywords": ["ai"]})]
+            )
+
+        cache = ToolResultCache()
+        cached_agent = create_notch_agent(kb, tool_cache=cache)
+        plain_agent = create_notch_agent(kb)
+
+        outputs = [
+            agent.run_sync("hi", deps=kb, model=FunctionModel(model)).output
+            for agent in (cached_agent, plain_agent, cached_agent)
+        ]
+        assert outputs[0] == outputs[1] == outputs[2]
+        assert cache.stats().hits == 1